@@ -0,0 +1,288 @@
+import collections
+import threading
+import time
+
+
+class FlightCall:
+    """A call run by SingleFlight, shared by every caller of the same key."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """ Coalesces concurrent identical calls: the first caller of a key runs the call, the callers
+    arriving while it is in flight wait for it and get the same result or the same exception.
+    """
+
+    def __init__(self) -> None:
+        self.calls = dict()  # Key: FlightCall in flight
+        self.lock = threading.Lock()
+
+    def do(self, key: tuple, fetch) -> tuple:
+        """ Runs fetch, or waits for the call of the same key already in flight
+
+        Args:
+            key (tuple): The key identifying the call
+            fetch (callable): The call to run
+
+        Returns:
+            tuple: The value, and whether this caller ran the call
+        """
+
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = FlightCall()
+
+        if leader:
+            try:
+                call.value = fetch()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+
+        return call.value, leader
+
+
+class TTLCache:
+    """ Cache shared by the Model accessors.
+    Every entry is keyed by the name of the endpoint and the arguments of the call, expires after the
+    time to live of its endpoint and the least recently used entries are evicted once the cache is full.
+    Endpoints with a stale time to live are refreshed in the background: shortly before they expire, and
+    after they expire the old value is still served while the new one is fetched.
+    Concurrent misses of the same entry share a single fetch.
+
+    Args:
+        max_size (int): How many entries the cache holds. Default: 1024
+        ttls (dict): The time to live in seconds of each endpoint. Default: None
+        default_ttl (float): The time to live of the endpoints not in ttls. Default: 120
+        stale_ttls (dict): How many seconds after expiring an entry of each endpoint can still be served. Default: None
+        refresh_ahead (float): The fraction of the time to live before the expiration when the background refresh starts. Default: 0.2
+    """
+
+    def __init__(self, max_size: int = 1024, ttls: dict = None, default_ttl: float = 120, stale_ttls: dict = None, refresh_ahead: float = 0.2) -> None:
+        self.max_size = max_size
+        self.ttls = ttls or dict()
+        self.default_ttl = default_ttl
+        self.stale_ttls = stale_ttls or dict()
+        self.refresh_ahead = refresh_ahead
+
+        self.entries = collections.OrderedDict()  # (endpoint, args): (value, expiration, stale expiration)
+        self.refreshing = set()  # Keys being refreshed in the background
+        self.generations = collections.Counter()  # Bumped by invalidate, so late refreshes are dropped
+        self.flight = SingleFlight()
+        self.lock = threading.Lock()
+
+        # Counters by endpoint
+        self.hits = collections.Counter()
+        self.stale_hits = collections.Counter()
+        self.misses = collections.Counter()
+        self.coalesced = collections.Counter()
+        self.evictions = collections.Counter()
+
+    def get(self, endpoint: str, args: tuple = ()) -> tuple:
+        """ Looks up an entry
+
+        Args:
+            endpoint (str): The name of the endpoint
+            args (tuple): The arguments of the call. Default: ()
+
+        Returns:
+            tuple: Whether the entry was found and not expired, and its value
+        """
+
+        key = (endpoint, args)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses[endpoint] += 1
+                return False, None
+
+            # Mark the entry as the most recently used
+            self.entries.move_to_end(key)
+            self.hits[endpoint] += 1
+
+            return True, entry[0]
+
+    def set(self, endpoint: str, args: tuple, value) -> None:
+        """ Stores an entry, evicting the least recently used ones if the cache is full
+
+        Args:
+            endpoint (str): The name of the endpoint
+            args (tuple): The arguments of the call
+            value (any): The value to store
+        """
+
+        with self.lock:
+            self._set((endpoint, args), value)
+
+    def _set(self, key: tuple, value) -> None:
+        """ Stores an entry, the caller holds the lock
+
+        Args:
+            key (tuple): The endpoint and the arguments of the entry
+            value (any): The value to store
+        """
+
+        endpoint = key[0]
+        expiration = time.monotonic() + self.ttls.get(endpoint, self.default_ttl)
+        stale_expiration = expiration + self.stale_ttls.get(endpoint, 0)
+
+        self.entries[key] = (value, expiration, stale_expiration)
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_size:
+            (evicted_endpoint, _), _ = self.entries.popitem(last=False)
+            self.evictions[evicted_endpoint] += 1
+
+    def _set_if_current(self, key: tuple, value, generation: int) -> bool:
+        """ Stores an entry only if its endpoint was not invalidated since the fetch started.
+        The check and the store share the lock, so an invalidate can not run between them
+
+        Args:
+            key (tuple): The endpoint and the arguments of the entry
+            value (any): The value to store
+            generation (int): The generation of the endpoint when the fetch started
+
+        Returns:
+            bool: Whether the value was stored
+        """
+
+        with self.lock:
+            if self.generations[key[0]] != generation:
+                return False
+
+            self._set(key, value)
+            return True
+
+    def get_or_set(self, endpoint: str, args: tuple, fetch) -> object:
+        """ Returns the cached value, calling fetch and storing its result on a miss.
+        Values close to expiring, or expired but still within the stale time to live, are returned
+        right away and refreshed in the background.
+
+        Args:
+            endpoint (str): The name of the endpoint
+            args (tuple): The arguments of the call
+            fetch (callable): Returns the fresh value
+
+        Returns:
+            any: The value
+        """
+
+        key = (endpoint, args)
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None and now < entry[2]:
+                value, expiration, _ = entry
+                self.entries.move_to_end(key)
+
+                if now < expiration:
+                    self.hits[endpoint] += 1
+                    # Only the endpoints that can be served stale are refreshed ahead
+                    refresh = endpoint in self.stale_ttls and now >= expiration - ttl * self.refresh_ahead
+                else:
+                    self.stale_hits[endpoint] += 1
+                    refresh = True
+
+                # A single refresh per key at a time
+                if refresh and key not in self.refreshing:
+                    self.refreshing.add(key)
+                    threading.Thread(target=self._refresh, args=(key, fetch, self.generations[endpoint]), daemon=True).start()
+
+                return value
+
+            self.misses[endpoint] += 1
+            generation = self.generations[endpoint]
+
+        # Concurrent misses of the same key wait for the first one. The generation is part of the key,
+        # so a caller arriving after an invalidate does not join a fetch started before it
+        value, leader = self.flight.do(key + (generation,), fetch)
+        if leader:
+            # Drop the value if the endpoint was invalidated meanwhile, it may predate the change
+            self._set_if_current(key, value, generation)
+        else:
+            with self.lock:
+                self.coalesced[endpoint] += 1
+
+        return value
+
+    def _refresh(self, key: tuple, fetch, generation: int) -> None:
+        """ Fetches a value in the background, the old value stays cached if the fetch fails
+
+        Args:
+            key (tuple): The endpoint and the arguments of the entry
+            fetch (callable): Returns the fresh value
+            generation (int): The generation of the endpoint when the refresh started
+        """
+
+        try:
+            value = fetch()
+
+            # Drop the value if the endpoint was invalidated meanwhile, it may predate the change
+            self._set_if_current(key, value, generation)
+        except Exception:
+            pass
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def invalidate(self, endpoint: str, args: tuple = None) -> None:
+        """ Drops the entries of an endpoint, e.g. after an action that changes them
+
+        Args:
+            endpoint (str): The name of the endpoint
+            args (tuple): The arguments of the entry to drop, every entry of the endpoint if None. Default: None
+        """
+
+        with self.lock:
+            self.generations[endpoint] += 1
+
+            if args is not None:
+                self.entries.pop((endpoint, args), None)
+                return
+
+            for key in [key for key in self.entries if key[0] == endpoint]:
+                del self.entries[key]
+
+    def stats(self) -> dict:
+        """ Returns the size of the cache and the counters of each endpoint
+
+        Returns:
+            dict: The statistics of the cache
+        """
+
+        with self.lock:
+            endpoints = set(self.hits) | set(self.stale_hits) | set(self.misses) | set(self.evictions)
+
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "endpoints": {
+                    endpoint: {
+                        "hits": self.hits[endpoint],
+                        "stale_hits": self.stale_hits[endpoint],
+                        "misses": self.misses[endpoint],
+                        "coalesced": self.coalesced[endpoint],
+                        "evictions": self.evictions[endpoint]
+                    }
+                    for endpoint in sorted(endpoints)
+                }
+            }
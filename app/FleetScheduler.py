@@ -0,0 +1,190 @@
+import concurrent.futures
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """ Converts a SpaceTraders timestamp to seconds since the epoch
+
+    Args:
+        timestamp (str): The timestamp, e.g. 2023-12-20T23:53:45.000Z
+
+    Returns:
+        float: The seconds since the epoch
+    """
+
+    return datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+def ready_time(response: dict) -> float:
+    """ Returns when a ship can act again, from a ship or from the response of a ship action.
+    Both carry the cooldown and the navigation of the ship: the ship is ready once the cooldown
+    expired and it arrived at its destination.
+
+    Args:
+        response (dict): The response from SpaceTraders
+
+    Returns:
+        float: The seconds since the epoch when the ship is ready, now if it already is
+    """
+
+    data = response.get("data", response)
+    times = [time.time()]
+
+    cooldown = data.get("cooldown")
+    if cooldown is not None and cooldown.get("expiration") is not None:
+        times.append(parse_timestamp(cooldown["expiration"]))
+
+    nav = data.get("nav")
+    if nav is not None and nav["status"] == "IN_TRANSIT":
+        times.append(parse_timestamp(nav["route"]["arrival"]))
+
+    return max(times)
+
+
+class FleetScheduler:
+    """ Runs the task of every ship as soon as the ship can act.
+    The ships wait in a priority queue ordered by the time they are ready, taken from the cooldown and the
+    arrival time in the response of their last action. The scheduler sleeps till the first ship is ready,
+    so there is no polling, and the tasks run in a thread pool through a single client, sharing its rate limit.
+
+    A task is called with the client and the symbol of the ship, and returns the response of the action it made.
+    Returning None takes the ship off the schedule.
+
+    Args:
+        api (SpaceTraders): The client shared by the tasks
+        workers (int): How many tasks can run at the same time. Default: 8
+        error_delay (float): Seconds to wait before running a task again after it raised. Default: 60
+        listener (callable): Called with the symbol of the ship and the response of every task, e.g. FleetState.apply. Default: None
+    """
+
+    def __init__(self, api, workers: int = 8, error_delay: float = 60, listener=None) -> None:
+        self.api = api
+        self.error_delay = error_delay
+        self.listener = listener
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+        self.queue = list()         # (ready time, sequence, ship symbol, version)
+        self.tasks = dict()         # Ship symbol: task
+        self.versions = dict()      # Ship symbol: version of its last assignment, older queue entries are skipped
+        self.sequence = itertools.count()  # Breaks the ties of the queue
+        self.condition = threading.Condition()
+        self.stopped = False
+
+    def assign(self, ship: str, task, ready_at: float = None) -> None:
+        """ Gives a task to a ship, replacing its previous task
+
+        Args:
+            ship (str): The symbol of the ship
+            task (callable): The task, called with the client and the symbol of the ship
+            ready_at (float): The seconds since the epoch when the ship is ready. Default: now
+        """
+
+        with self.condition:
+            self.tasks[ship] = task
+            self.versions[ship] = self.versions.get(ship, 0) + 1
+            self._schedule(ship, ready_at or time.time(), self.versions[ship])
+
+    def remove(self, ship: str) -> None:
+        """ Takes a ship off the schedule
+
+        Args:
+            ship (str): The symbol of the ship
+        """
+
+        with self.condition:
+            self.tasks.pop(ship, None)
+            self.versions[ship] = self.versions.get(ship, 0) + 1
+            self.condition.notify_all()
+
+    def _schedule(self, ship: str, ready_at: float, version: int) -> None:
+        """ Queues a ship, the caller holds the condition
+
+        Args:
+            ship (str): The symbol of the ship
+            ready_at (float): The seconds since the epoch when the ship is ready
+            version (int): The version of the assignment
+        """
+
+        heapq.heappush(self.queue, (ready_at, next(self.sequence), ship, version))
+
+        # Wake up the loop, the new ship may be the first one ready
+        self.condition.notify_all()
+
+    def run(self) -> None:
+        """Dispatches the tasks till stop is called. Run it in its own thread."""
+
+        with self.condition:
+            while not self.stopped:
+                if len(self.queue) == 0:
+                    self.condition.wait()
+                    continue
+
+                ready_at, _, ship, version = self.queue[0]
+
+                # Sleep till the first ship is ready, or till a new ship is queued
+                delay = ready_at - time.time()
+                if delay > 0:
+                    self.condition.wait(timeout=delay)
+                    continue
+
+                heapq.heappop(self.queue)
+
+                # Skip the entries of removed or reassigned ships
+                if self.versions.get(ship) != version or ship not in self.tasks:
+                    continue
+
+                self.executor.submit(self._dispatch, ship, self.tasks[ship], version)
+
+    def _dispatch(self, ship: str, task, version: int) -> None:
+        """ Runs the task of a ship and queues the ship again for when it is ready
+
+        Args:
+            ship (str): The symbol of the ship
+            task (callable): The task of the ship
+            version (int): The version of the assignment
+        """
+
+        ready_at = None
+        try:
+            response = task(self.api, ship)
+            if response is not None:
+                ready_at = ready_time(response)
+
+                if self.listener is not None:
+                    self.listener(ship, response)
+        except Exception:
+            # Try again later, the error may be temporary
+            ready_at = time.time() + self.error_delay
+
+        with self.condition:
+            # The ship was removed or given another task meanwhile
+            if self.versions.get(ship) != version:
+                return
+
+            # The task is done with the ship
+            if ready_at is None:
+                self.tasks.pop(ship, None)
+                self.condition.notify_all()
+                return
+
+            self._schedule(ship, ready_at, version)
+
+    def wait_idle(self) -> None:
+        """Blocks until no ship has a task left."""
+
+        with self.condition:
+            while len(self.tasks) > 0:
+                self.condition.wait()
+
+    def stop(self) -> None:
+        """Stops the loop, the tasks already running are completed."""
+
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+        self.executor.shutdown(wait=True)
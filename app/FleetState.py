@@ -0,0 +1,151 @@
+import threading
+import time
+
+from app.FleetScheduler import parse_timestamp
+
+RECONCILE_INTERVAL = 300  # Seconds the local copy of the fleet is trusted before it is read again from SpaceTraders
+
+# Parts of a ship that the responses of the ship actions carry, e.g. navigate_ship returns nav and fuel
+SHIP_FIELDS = ["nav", "fuel", "cargo", "cooldown", "crew", "frame", "reactor", "engine", "modules", "mounts"]
+
+
+class FleetState:
+    """ Local copy of the ships of the agent, patched with the nav, fuel, cargo and cooldown in the responses
+    of the ship actions, so reading the state of the fleet makes no API call.
+    The copy is replaced with the ships read from SpaceTraders once it is older than the reconcile interval,
+    to catch what the responses do not carry. The ships are never changed in place: a patch replaces the ship
+    with a new dict, so the ships returned stay consistent.
+
+    Args:
+        reconcile_interval (float): Seconds before the copy is stale. Default: RECONCILE_INTERVAL
+    """
+
+    def __init__(self, reconcile_interval: float = RECONCILE_INTERVAL) -> None:
+        self.reconcile_interval = reconcile_interval
+
+        self.ships = dict()     # Ship symbol: ship
+        self.reconciled = None  # Seconds since the epoch of the last full read, None before the first one
+        self.patches = 0        # Responses applied since the last full read
+        self.lock = threading.Lock()
+
+    def stale(self, now: float = None) -> bool:
+        """ Returns whether the copy has to be read again from SpaceTraders
+
+        Args:
+            now (float): The current time in seconds since the epoch. Default: now
+
+        Returns:
+            bool: True before the first read and once the reconcile interval passed
+        """
+
+        now = time.time() if now is None else now
+
+        return self.reconciled is None or now - self.reconciled >= self.reconcile_interval
+
+    def replace(self, ships: list) -> None:
+        """ Replaces the copy with the ships read from SpaceTraders, as returned by get_my_ships
+
+        Args:
+            ships (list): Every ship of the agent
+        """
+
+        with self.lock:
+            self.ships = {ship["symbol"]: ship for ship in ships}
+            self.reconciled = time.time()
+            self.patches = 0
+
+    def apply(self, ship: str, response: dict) -> None:
+        """ Patches a ship with the response of one of its actions.
+        The response of purchase_ship carries the whole new ship, the other ones only some parts of it
+
+        Args:
+            ship (str): The symbol of the ship
+            response (dict): The response from SpaceTraders
+        """
+
+        data = response.get("data", response)
+        if not isinstance(data, dict):
+            return
+
+        with self.lock:
+            if isinstance(data.get("ship"), dict):
+                self.ships[data["ship"]["symbol"]] = data["ship"]
+                self.patches += 1
+                return
+
+            # Ships not read yet are left to the next reconciliation
+            if ship not in self.ships:
+                return
+
+            patch = {field: data[field] for field in SHIP_FIELDS if field in data}
+            if len(patch) > 0:
+                self.ships[ship] = {**self.ships[ship], **patch}
+                self.patches += 1
+
+    def get(self, ship: str) -> dict:
+        """ Returns a ship, with the navigation of a finished flight already moved to the destination
+
+        Args:
+            ship (str): The symbol of the ship
+
+        Returns:
+            dict: The ship, None if it is not known
+        """
+
+        with self.lock:
+            data = self.ships.get(ship)
+
+        return None if data is None else self.arrive(data)
+
+    def all(self) -> list:
+        """ Returns every ship, with the navigation of the finished flights already moved to their destination
+
+        Returns:
+            list: The ships
+        """
+
+        with self.lock:
+            ships = list(self.ships.values())
+
+        return [self.arrive(ship) for ship in ships]
+
+    def arrive(self, ship: dict) -> dict:
+        """ Returns a ship as SpaceTraders would after its flight: in orbit of the destination once the arrival time passed
+
+        Args:
+            ship (dict): The ship
+
+        Returns:
+            dict: The ship, a new dict if it arrived
+        """
+
+        nav = ship.get("nav")
+        if nav is None or nav["status"] != "IN_TRANSIT" or parse_timestamp(nav["route"]["arrival"]) > time.time():
+            return ship
+
+        destination = nav["route"].get("destination")
+        if destination is None:
+            return ship
+
+        return {
+            **ship,
+            "nav": {
+                **nav,
+                "status": "IN_ORBIT",
+                "systemSymbol": destination.get("systemSymbol", nav["systemSymbol"]),
+                "waypointSymbol": destination["symbol"]
+            }
+        }
+
+    def stats(self) -> dict:
+        """ Returns how current the copy is
+
+        Returns:
+            dict: The number of ships, the seconds since the last full read and the responses applied since
+        """
+
+        return {
+            "ships": len(self.ships),
+            "age": None if self.reconciled is None else time.time() - self.reconciled,
+            "patches": self.patches
+        }
@@ -0,0 +1,147 @@
+import multiprocessing
+import multiprocessing.managers
+import os
+import threading
+
+import app.SpaceTradersAPI as SpaceTradersAPI
+from app.FleetScheduler import FleetScheduler
+
+# The rate limiter of the account, it only lives in the coordinator process
+COORDINATOR_RATE_LIMITER = None
+COORDINATOR_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> SpaceTradersAPI.RateLimiter:
+    """ Returns the rate limiter of the account, called in the coordinator process
+
+    Returns:
+        RateLimiter: The rate limiter shared by the workers
+    """
+
+    global COORDINATOR_RATE_LIMITER
+
+    with COORDINATOR_LOCK:
+        if COORDINATOR_RATE_LIMITER is None:
+            COORDINATOR_RATE_LIMITER = SpaceTradersAPI.RateLimiter()
+
+    return COORDINATOR_RATE_LIMITER
+
+
+class Coordinator(multiprocessing.managers.BaseManager):
+    """ Process handing out the request slots of the account to the workers.
+    Only the reservation crosses the process boundary: the workers wait for their slot locally.
+    """
+
+
+Coordinator.register("rate_limiter", callable=get_rate_limiter, exposed=("reserve", "penalize"))
+
+
+class SharedRateLimiter(SpaceTradersAPI.RateLimiter):
+    """ Rate limiter of a worker, reserving the slots from the coordinator so that the workers
+    together never go over the rate limit of the account.
+
+    Args:
+        proxy (BaseProxy): The rate limiter of the coordinator
+    """
+
+    def __init__(self, proxy) -> None:
+        # The proxy opens a connection per thread, so the worker threads can share it
+        self.proxy = proxy
+
+    def reserve(self) -> float:
+        """ Reserves a request slot from the coordinator
+
+        Returns:
+            float: The seconds to wait before the slot can be used
+        """
+
+        return self.proxy.reserve()
+
+    def penalize(self, seconds: float) -> None:
+        """ Tells the coordinator that the server answered with a 429, every worker waits
+
+        Args:
+            seconds (float): The seconds the server asked to wait
+        """
+
+        self.proxy.penalize(seconds)
+
+
+def split_ships(ships: list, processes: int) -> list:
+    """ Splits the ships evenly between the workers
+
+    Args:
+        ships (list): The symbols of the ships
+        processes (int): The number of workers
+
+    Returns:
+        list: The symbols of the ships of each worker, workers without ships are left out
+    """
+
+    return [ships[i::processes] for i in range(processes) if len(ships[i::processes]) > 0]
+
+
+def worker(address: tuple, authkey: bytes, token: str, ships: list, task, threads: int) -> None:
+    """ Drives some ships of the fleet, run in its own process
+
+    Args:
+        address (tuple): The address of the coordinator
+        authkey (bytes): The key of the coordinator
+        token (str): The token of the agent
+        ships (list): The symbols of the ships of this worker
+        task (callable): The task given to every ship, must be defined at module level
+        threads (int): How many tasks can run at the same time in this worker
+    """
+
+    coordinator = Coordinator(address=address, authkey=authkey)
+    coordinator.connect()
+
+    api = SpaceTradersAPI.SpaceTraders(token, rate_limiter=SharedRateLimiter(coordinator.rate_limiter()))
+    scheduler = FleetScheduler(api, workers=threads)
+
+    for ship in ships:
+        scheduler.assign(ship, task)
+
+    threading.Thread(target=scheduler.run, daemon=True).start()
+
+    # Done once every ship finished its task
+    scheduler.wait_idle()
+    scheduler.stop()
+
+
+def run_fleet(token: str, ships: list, task, processes: int = None, threads: int = 8) -> None:
+    """ Drives a fleet from several processes sharing the rate limit of the account.
+    A coordinator process owns the rate limiter, the ships are split between the worker processes
+    and each worker runs its own FleetScheduler. Blocks until every ship finished its task.
+
+    Args:
+        token (str): The token of the agent
+        ships (list): The symbols of the ships
+        task (callable): The task given to every ship, called with the client and the symbol of the ship.
+            It is sent to the workers, so it must be defined at module level
+        processes (int): The number of worker processes. Default: the number of CPUs
+        threads (int): How many tasks can run at the same time in each worker. Default: 8
+    """
+
+    processes = processes or os.cpu_count()
+
+    authkey = os.urandom(16)
+    coordinator = Coordinator(address=("127.0.0.1", 0), authkey=authkey)
+    coordinator.start()
+
+    try:
+        workers = [
+            multiprocessing.Process(
+                target=worker,
+                args=(coordinator.address, authkey, token, chunk, task, threads)
+            )
+            for chunk in split_ships(ships, processes)
+        ]
+
+        for process in workers:
+            process.start()
+
+        for process in workers:
+            process.join()
+    finally:
+        coordinator.shutdown()
@@ -0,0 +1,132 @@
+import numpy as np
+
+
+def categorical(values: list) -> tuple:
+    """ Encodes repeated strings as small integer codes
+
+    Args:
+        values (list): The strings
+
+    Returns:
+        tuple: The distinct strings, sorted, and the code of each value in them
+    """
+
+    categories, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+
+    return categories, codes.astype(np.min_scalar_type(max(0, len(categories) - 1)))
+
+
+class GalaxyColumns:
+    """ Read-only columnar copy of the galaxy, for the queries that scan every system.
+    Each field is a NumPy array with an entry per system, sorted by symbol: the coordinates are
+    integers and the types and the sectors are codes into their list of distinct names.
+    The waypoints are stored the same way, grouped by system: the waypoints of the system at position i
+    are the slice waypoint_offsets[i]:waypoint_offsets[i + 1] of the waypoint arrays.
+
+    Args:
+        systems (list): (symbol, sector, type, x, y) of each system, sorted by symbol
+        waypoints (list): (system, symbol, type, x, y) of each waypoint, sorted by system
+    """
+
+    def __init__(self, systems: list, waypoints: list) -> None:
+        symbols, sectors, types, x, y = zip(*systems) if len(systems) > 0 else ([], [], [], [], [])
+
+        self.symbols = np.asarray(symbols, dtype=str)
+        self.sector_names, self.sectors = categorical(sectors)
+        self.type_names, self.types = categorical(types)
+        self.x = np.asarray(x, dtype=np.int32)
+        self.y = np.asarray(y, dtype=np.int32)
+
+        systems, symbols, types, x, y = zip(*waypoints) if len(waypoints) > 0 else ([], [], [], [], [])
+        systems = np.asarray(systems, dtype=str)
+
+        # Skip the waypoints of unknown systems, they would end up in the slice of another system
+        known = np.isin(systems, self.symbols)
+
+        self.waypoint_symbols = np.asarray(symbols, dtype=str)[known]
+        self.waypoint_type_names, self.waypoint_types = categorical(np.asarray(types, dtype=str)[known])
+        self.waypoint_x = np.asarray(x, dtype=np.int32)[known]
+        self.waypoint_y = np.asarray(y, dtype=np.int32)[known]
+        self.waypoint_offsets = np.append(
+            np.searchsorted(systems[known], self.symbols, side="left"),
+            np.count_nonzero(known)
+        ).astype(np.int64)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def position(self, symbol: str) -> int:
+        """ Returns the position of a system in the arrays
+
+        Args:
+            symbol (str): The symbol of the system
+
+        Returns:
+            int: The position, None if the system is not known
+        """
+
+        position = int(np.searchsorted(self.symbols, symbol))
+        if position < len(self.symbols) and self.symbols[position] == symbol:
+            return position
+
+        return None
+
+    def waypoints(self, symbol: str) -> list:
+        """ Returns the waypoints of a system
+
+        Args:
+            symbol (str): The symbol of the system
+
+        Returns:
+            list: The symbol, type and coordinates of each waypoint
+        """
+
+        position = self.position(symbol)
+        if position is None:
+            return list()
+
+        start, end = self.waypoint_offsets[position], self.waypoint_offsets[position + 1]
+
+        return [
+            {"symbol": waypoint, "type": str(self.waypoint_type_names[code]), "x": int(x), "y": int(y)}
+            for waypoint, code, x, y in zip(
+                self.waypoint_symbols[start:end].tolist(),
+                self.waypoint_types[start:end],
+                self.waypoint_x[start:end],
+                self.waypoint_y[start:end]
+            )
+        ]
+
+    def replace_waypoints(self, symbol: str, waypoints: list) -> None:
+        """ Replaces the waypoints of a system, as returned by get_system_waypoints, without loading the galaxy again
+
+        Args:
+            symbol (str): The symbol of the system
+            waypoints (list): The waypoints of the system
+        """
+
+        position = self.position(symbol)
+        if position is None:
+            return
+
+        start, end = self.waypoint_offsets[position], self.waypoint_offsets[position + 1]
+        waypoints = sorted(waypoints, key=lambda waypoint: waypoint["symbol"])
+        types = np.asarray([waypoint["type"] for waypoint in waypoints], dtype=str)
+
+        # New types get a code, the codes stay sorted like the names
+        names = np.union1d(self.waypoint_type_names, types)
+        codes = np.searchsorted(names, self.waypoint_type_names)[self.waypoint_types]
+        dtype = np.min_scalar_type(max(0, len(names) - 1))
+
+        def splice(column: np.ndarray, values: np.ndarray) -> np.ndarray:
+            return np.concatenate([column[:start], values, column[end:]])
+
+        self.waypoint_symbols = splice(self.waypoint_symbols, np.asarray([waypoint["symbol"] for waypoint in waypoints], dtype=str))
+        self.waypoint_types = splice(codes, np.searchsorted(names, types)).astype(dtype)
+        self.waypoint_type_names = names
+        self.waypoint_x = splice(self.waypoint_x, np.asarray([waypoint["x"] for waypoint in waypoints], dtype=np.int32))
+        self.waypoint_y = splice(self.waypoint_y, np.asarray([waypoint["y"] for waypoint in waypoints], dtype=np.int32))
+
+        offsets = self.waypoint_offsets.copy()
+        offsets[position + 1:] += len(waypoints) - (end - start)
+        self.waypoint_offsets = offsets
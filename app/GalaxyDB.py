@@ -0,0 +1,422 @@
+import sqlite3
+import json
+import os
+import time
+import typing
+
+GALAXY_DB_PATH = os.path.join("data", "galaxy.db")
+IMPORT_BATCH = 1000  # Systems inserted per transaction while importing a galaxy file
+READ_CHUNK = 2 ** 16  # Characters read at a time from a galaxy file
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS systems (
+    symbol TEXT PRIMARY KEY,
+    sector TEXT NOT NULL,
+    type TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS systems_type ON systems (type);
+CREATE INDEX IF NOT EXISTS systems_sector ON systems (sector);
+CREATE INDEX IF NOT EXISTS systems_coordinates ON systems (x, y);
+
+CREATE TABLE IF NOT EXISTS waypoints (
+    symbol TEXT PRIMARY KEY,
+    system TEXT NOT NULL,
+    type TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    y INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waypoints_system ON waypoints (system);
+CREATE INDEX IF NOT EXISTS waypoints_type ON waypoints (type);
+
+-- Inverted index of the traits, filled system by system by the WaypointIndexer
+CREATE TABLE IF NOT EXISTS waypoint_traits (
+    trait TEXT NOT NULL,
+    waypoint TEXT NOT NULL,
+    system TEXT NOT NULL,
+    PRIMARY KEY (trait, waypoint)
+);
+CREATE INDEX IF NOT EXISTS waypoint_traits_system ON waypoint_traits (system);
+
+CREATE TABLE IF NOT EXISTS indexed_systems (
+    symbol TEXT PRIMARY KEY,
+    updated REAL NOT NULL
+);
+
+-- Aggregates kept current by the triggers below, so reading them does not depend on the size of the galaxy
+CREATE TABLE IF NOT EXISTS stats (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+
+CREATE TRIGGER IF NOT EXISTS systems_insert AFTER INSERT ON systems BEGIN
+    INSERT INTO stats VALUES ('count', 'systems', 1) ON CONFLICT DO UPDATE SET value = value + 1;
+    INSERT INTO stats VALUES ('system_type', NEW.type, 1) ON CONFLICT DO UPDATE SET value = value + 1;
+    INSERT INTO stats VALUES ('sector', NEW.sector, 1) ON CONFLICT DO UPDATE SET value = value + 1;
+    INSERT INTO stats VALUES ('bounds', 'x_min', NEW.x) ON CONFLICT DO UPDATE SET value = MIN(value, excluded.value);
+    INSERT INTO stats VALUES ('bounds', 'x_max', NEW.x) ON CONFLICT DO UPDATE SET value = MAX(value, excluded.value);
+    INSERT INTO stats VALUES ('bounds', 'y_min', NEW.y) ON CONFLICT DO UPDATE SET value = MIN(value, excluded.value);
+    INSERT INTO stats VALUES ('bounds', 'y_max', NEW.y) ON CONFLICT DO UPDATE SET value = MAX(value, excluded.value);
+END;
+
+-- Bounds only grow: systems are replaced with the same coordinates, never moved
+CREATE TRIGGER IF NOT EXISTS systems_delete AFTER DELETE ON systems BEGIN
+    UPDATE stats SET value = value - 1 WHERE (kind, key) IN (('count', 'systems'), ('system_type', OLD.type), ('sector', OLD.sector));
+    DELETE FROM stats WHERE kind != 'bounds' AND value = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS waypoints_insert AFTER INSERT ON waypoints BEGIN
+    INSERT INTO stats VALUES ('count', 'waypoints', 1) ON CONFLICT DO UPDATE SET value = value + 1;
+    INSERT INTO stats VALUES ('waypoint_type', NEW.type, 1) ON CONFLICT DO UPDATE SET value = value + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS waypoints_delete AFTER DELETE ON waypoints BEGIN
+    UPDATE stats SET value = value - 1 WHERE (kind, key) IN (('count', 'waypoints'), ('waypoint_type', OLD.type));
+    DELETE FROM stats WHERE kind != 'bounds' AND value = 0;
+END;
+"""
+
+
+def connect(path: str = GALAXY_DB_PATH) -> sqlite3.Connection:
+    """ Opens the galaxy database, creating the tables if they do not exist
+
+    Args:
+        path (str): The path of the database. Default: data/galaxy.db
+
+    Returns:
+        sqlite3.Connection: The connection to the database
+    """
+
+    # Create the data folder on the first run
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # The connection is shared by the Flask threads. A sqlite3.Connection is not safe for concurrent use,
+    # so the callers hold a lock around every query, see Model.GALAXY_LOCK
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.executescript(SCHEMA)
+
+    # INSERT OR REPLACE only fires the delete triggers with recursive triggers on
+    connection.execute("PRAGMA recursive_triggers = ON")
+
+    # Databases created before the stats table existed have systems but no stats
+    if connection.execute("SELECT COUNT(*) FROM stats").fetchone()[0] == 0:
+        rebuild_stats(connection)
+
+    return connection
+
+
+def rebuild_stats(connection: sqlite3.Connection) -> None:
+    """ Computes the aggregates from scratch, the triggers keep them current afterwards
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+    """
+
+    with connection:
+        connection.execute("DELETE FROM stats")
+        connection.execute("INSERT INTO stats SELECT 'count', 'systems', COUNT(*) FROM systems HAVING COUNT(*) > 0")
+        connection.execute("INSERT INTO stats SELECT 'count', 'waypoints', COUNT(*) FROM waypoints HAVING COUNT(*) > 0")
+        connection.execute("INSERT INTO stats SELECT 'system_type', type, COUNT(*) FROM systems GROUP BY type")
+        connection.execute("INSERT INTO stats SELECT 'sector', sector, COUNT(*) FROM systems GROUP BY sector")
+        connection.execute("INSERT INTO stats SELECT 'waypoint_type', type, COUNT(*) FROM waypoints GROUP BY type")
+        connection.execute("""
+            INSERT INTO stats
+            SELECT 'bounds', 'x_min', MIN(x) FROM systems HAVING COUNT(*) > 0
+            UNION ALL SELECT 'bounds', 'x_max', MAX(x) FROM systems HAVING COUNT(*) > 0
+            UNION ALL SELECT 'bounds', 'y_min', MIN(y) FROM systems HAVING COUNT(*) > 0
+            UNION ALL SELECT 'bounds', 'y_max', MAX(y) FROM systems HAVING COUNT(*) > 0
+        """)
+
+
+def insert_systems(connection: sqlite3.Connection, systems: list) -> None:
+    """ Inserts or replaces the systems and their waypoints
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        systems (list): The systems as returned by SpaceTraders
+    """
+
+    with connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO systems (symbol, sector, type, x, y, data) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (system["symbol"], system["sectorSymbol"], system["type"], system["x"], system["y"], json.dumps(system, separators=(",", ":")))
+                for system in systems
+            ]
+        )
+
+        # Drop the waypoints of the replaced systems, the new data lists the current ones
+        connection.executemany(
+            "DELETE FROM waypoints WHERE system = ?",
+            [(system["symbol"],) for system in systems]
+        )
+
+        connection.executemany(
+            "INSERT OR REPLACE INTO waypoints (symbol, system, type, x, y) VALUES (?, ?, ?, ?, ?)",
+            [
+                (waypoint["symbol"], system["symbol"], waypoint["type"], waypoint["x"], waypoint["y"])
+                for system in systems
+                for waypoint in system.get("waypoints", [])
+            ]
+        )
+
+
+def read_systems(path: str) -> typing.Iterator[dict]:
+    """ Streams the systems of a galaxy file written by DownloadGalaxy.
+    The file is read a chunk at a time and the systems are decoded one by one, so neither
+    the text of the file nor the whole list of systems is ever held in memory
+
+    Args:
+        path (str): The path of the galaxy file
+
+    Yields:
+        dict: The systems, in the order of the file
+    """
+
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    end_of_file = False
+
+    with open(path, "r") as f:
+        while True:
+            # Skip the brackets of the list and the separators between the systems
+            while position < len(buffer) and buffer[position] in "[, \t\r\n":
+                position += 1
+
+            if position < len(buffer) and buffer[position] == "]":
+                return
+
+            try:
+                system, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The system is cut at the end of the chunk, read the next one
+                if end_of_file:
+                    if buffer[position:].strip() == "":
+                        return
+                    raise
+
+                chunk = f.read(READ_CHUNK)
+                end_of_file = chunk == ""
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield system
+
+
+def import_json(connection: sqlite3.Connection, path: str) -> None:
+    """ Imports a galaxy file written by DownloadGalaxy into the database, streaming it in batches.
+    The aggregates are updated by the triggers in the same pass
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        path (str): The path of the galaxy file
+    """
+
+    batch = list()
+    for system in read_systems(path):
+        batch.append(system)
+
+        if len(batch) == IMPORT_BATCH:
+            insert_systems(connection, batch)
+            batch = list()
+
+    if len(batch) > 0:
+        insert_systems(connection, batch)
+
+
+def insert_waypoint_traits(connection: sqlite3.Connection, system: str, waypoints: list) -> None:
+    """ Replaces the waypoints of a system with the ones returned by get_system_waypoints, indexes their
+    traits and marks the system as indexed
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        system (str): The symbol of the system
+        waypoints (list): The waypoints of the system
+    """
+
+    with connection:
+        connection.execute("DELETE FROM waypoints WHERE system = ?", (system,))
+        connection.execute("DELETE FROM waypoint_traits WHERE system = ?", (system,))
+
+        connection.executemany(
+            "INSERT OR REPLACE INTO waypoints (symbol, system, type, x, y) VALUES (?, ?, ?, ?, ?)",
+            [(waypoint["symbol"], system, waypoint["type"], waypoint["x"], waypoint["y"]) for waypoint in waypoints]
+        )
+
+        connection.executemany(
+            "INSERT OR IGNORE INTO waypoint_traits (trait, waypoint, system) VALUES (?, ?, ?)",
+            [
+                (trait["symbol"], waypoint["symbol"], system)
+                for waypoint in waypoints
+                for trait in waypoint.get("traits", [])
+            ]
+        )
+
+        connection.execute("INSERT OR REPLACE INTO indexed_systems (symbol, updated) VALUES (?, ?)", (system, time.time()))
+
+
+def get_indexed_systems(connection: sqlite3.Connection) -> set:
+    """ Returns the systems whose waypoint traits are indexed
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        set: The symbols of the systems
+    """
+
+    return {row[0] for row in connection.execute("SELECT symbol FROM indexed_systems")}
+
+
+def get_indexed_waypoints(connection: sqlite3.Connection) -> tuple:
+    """ Returns the waypoints of the indexed systems and their traits, to load the inverted index in memory
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        tuple: (symbol, system, type, x, y) of each waypoint, and (trait, waypoint) of each trait
+    """
+
+    waypoints = connection.execute(
+        "SELECT w.symbol, w.system, w.type, w.x, w.y FROM waypoints w JOIN indexed_systems i ON w.system = i.symbol"
+    ).fetchall()
+    traits = connection.execute("SELECT trait, waypoint FROM waypoint_traits").fetchall()
+
+    return waypoints, traits
+
+
+def find_waypoints(connection: sqlite3.Connection, traits: list = None, types: list = None) -> list:
+    """ Returns the waypoints having every trait and one of the types, using the inverted indexes.
+    Only the waypoints of the indexed systems have traits
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        traits (list): The traits the waypoints must all have. Default: None
+        types (list): The types the waypoints can be of. Default: None
+
+    Returns:
+        list: (symbol, system, type, x, y) of each waypoint
+    """
+
+    traits = sorted(set(traits or []))
+    types = sorted(set(types or []))
+
+    conditions = list()
+    arguments = list()
+
+    if len(types) > 0:
+        conditions.append(f"type IN ({', '.join('?' * len(types))})")
+        arguments.extend(types)
+
+    if len(traits) > 0:
+        conditions.append(f"symbol IN (SELECT waypoint FROM waypoint_traits WHERE trait IN ({', '.join('?' * len(traits))}) GROUP BY waypoint HAVING COUNT(*) = ?)")
+        arguments.extend(traits)
+        arguments.append(len(traits))
+
+    query = "SELECT symbol, system, type, x, y FROM waypoints"
+    if len(conditions) > 0:
+        query += " WHERE " + " AND ".join(conditions)
+
+    return connection.execute(query, arguments).fetchall()
+
+
+def get_stats(connection: sqlite3.Connection, kind: str) -> dict:
+    """ Returns the aggregates of a kind: count, system_type, sector, waypoint_type or bounds
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        kind (str): The kind of aggregate
+
+    Returns:
+        dict: The aggregates by key
+    """
+
+    return dict(connection.execute("SELECT key, value FROM stats WHERE kind = ?", (kind,)))
+
+
+def count_systems(connection: sqlite3.Connection) -> int:
+    """ Counts the systems in the database
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        int: The number of systems
+    """
+
+    return get_stats(connection, "count").get("systems", 0)
+
+
+def get_system_rows(connection: sqlite3.Connection) -> list:
+    """ Returns the fields of every system needed by GalaxyColumns, sorted by symbol
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        list: (symbol, sector, type, x, y) of each system
+    """
+
+    return connection.execute("SELECT symbol, sector, type, x, y FROM systems ORDER BY symbol").fetchall()
+
+
+def get_waypoint_rows(connection: sqlite3.Connection) -> list:
+    """ Returns the fields of every waypoint needed by GalaxyColumns, sorted by system
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        list: (system, symbol, type, x, y) of each waypoint
+    """
+
+    return connection.execute("SELECT system, symbol, type, x, y FROM waypoints ORDER BY system, symbol").fetchall()
+
+
+def get_waypoint_coordinates(connection: sqlite3.Connection, symbols: list) -> dict:
+    """ Returns the coordinates of some waypoints
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        symbols (list): The symbols of the waypoints
+
+    Returns:
+        dict: Waypoint symbol: (x, y), unknown waypoints are left out
+    """
+
+    symbols = list(symbols)
+    coordinates = dict()
+
+    # Stay below the limit of parameters of a query
+    for start in range(0, len(symbols), IMPORT_BATCH):
+        batch = symbols[start:start + IMPORT_BATCH]
+        coordinates.update(
+            (row[0], (row[1], row[2]))
+            for row in connection.execute(f"SELECT symbol, x, y FROM waypoints WHERE symbol IN ({', '.join('?' * len(batch))})", batch)
+        )
+
+    return coordinates
+
+
+def get_system(connection: sqlite3.Connection, symbol: str) -> dict:
+    """ Returns a system by its symbol
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        symbol (str): The symbol of the system
+
+    Returns:
+        dict: The system, None if it is not in the database
+    """
+
+    row = connection.execute("SELECT data FROM systems WHERE symbol = ?", (symbol,)).fetchone()
+
+    return json.loads(row[0]) if row is not None else None
@@ -0,0 +1,122 @@
+import collections
+import threading
+
+
+def diff(old: dict, new: dict) -> dict:
+    """ Compares two states keyed by id
+
+    Args:
+        old (dict): The previous state
+        new (dict): The current state
+
+    Returns:
+        dict: The changed or added items by id, and the ids of the removed items
+    """
+
+    return {
+        "changed": {key: value for key, value in new.items() if old.get(key) != value},
+        "removed": [key for key in old if key not in new]
+    }
+
+
+class LiveUpdates:
+    """ Polls SpaceTraders in the background and pushes what changed to the subscribed clients.
+    Every topic is polled once per round no matter how many clients subscribed to it, and only
+    the changed items are sent to the room of the topic as a <topic>_delta event.
+
+    Args:
+        sources (dict): Topic: function returning the current state of the topic, as a dict keyed by id
+        emit (callable): Sends an event to a room, e.g. socketio.emit
+        sleep (callable): Waits between the polling rounds, e.g. socketio.sleep
+        interval (float): Seconds between the polling rounds. Default: 15
+    """
+
+    def __init__(self, sources: dict, emit, sleep, interval: float = 15) -> None:
+        self.sources = sources
+        self.emit = emit
+        self.sleep = sleep
+        self.interval = interval
+
+        self.states = dict()                     # Topic: last state sent
+        self.sessions = dict()                   # Client session id: subscribed topics
+        self.subscribers = collections.Counter()  # Topic: number of subscribed clients
+        self.lock = threading.Lock()
+        self.poll_locks = {topic: threading.Lock() for topic in sources}  # One poll of a topic at a time
+
+    def run(self) -> None:
+        """Polls the topics with at least a subscriber, forever. Start it as a background task."""
+
+        while True:
+            for topic in self.sources:
+                if self.subscribers[topic] > 0:
+                    self.poll(topic)
+
+            self.sleep(self.interval)
+
+    def poll(self, topic: str, push: bool = True) -> None:
+        """ Reads the current state of a topic and pushes the changes
+
+        Args:
+            topic (str): The topic to poll
+            push (bool): Whether to push the changes to the room of the topic. Default: True
+        """
+
+        # The source may take a while with the retries, only the swap of the state holds the lock
+        with self.poll_locks[topic]:
+            try:
+                state = self.sources[topic]()
+            except Exception:
+                # Keep the last state, the next round tries again
+                return
+
+            with self.lock:
+                delta = diff(self.states.get(topic, dict()), state)
+                self.states[topic] = state
+
+        if push and (len(delta["changed"]) > 0 or len(delta["removed"]) > 0):
+            self.emit(f"{topic}_delta", delta, to=topic)
+
+    def subscribe(self, session_id: str, topic: str) -> dict:
+        """ Registers a client to a topic, the caller joins the client to the room of the topic first
+
+        Args:
+            session_id (str): The session id of the client
+            topic (str): The topic
+
+        Returns:
+            dict: The current state of the topic, to render before the deltas arrive
+        """
+
+        if topic not in self.sources:
+            return dict()
+
+        with self.lock:
+            # The state left by earlier subscribers is old once nobody is subscribed
+            first = self.subscribers[topic] == 0
+
+            topics = self.sessions.setdefault(session_id, set())
+            if topic not in topics:
+                topics.add(topic)
+                self.subscribers[topic] += 1
+
+            missing = topic not in self.states
+
+        # The first subscriber waits for a poll, and so does every subscriber arriving before a state was read:
+        # the deltas only carry what changes. The changes are pushed too, the clients reading the old state
+        # while the poll runs are already in the room
+        if first or missing:
+            self.poll(topic)
+
+        with self.lock:
+            return self.states.get(topic, dict())
+
+    def unsubscribe(self, session_id: str) -> None:
+        """ Removes a client from every topic, e.g. when it disconnects
+
+        Args:
+            session_id (str): The session id of the client
+        """
+
+        with self.lock:
+            for topic in self.sessions.pop(session_id, set()):
+                self.subscribers[topic] -= 1
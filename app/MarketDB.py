@@ -0,0 +1,324 @@
+import sqlite3
+import os
+import time
+
+from app.FleetScheduler import parse_timestamp
+
+MARKET_DB_PATH = os.path.join("data", "market.db")
+RAW_RETENTION = 2 * 24 * 3600      # Seconds every observation is kept for, older ones are averaged by hour
+HOURLY_RETENTION = 30 * 24 * 3600  # Seconds the hourly averages are kept for
+HOUR = 3600
+
+SCHEMA = """
+-- Every price seen, from get_market and from the transactions of purchase_cargo and sell_cargo
+CREATE TABLE IF NOT EXISTS prices (
+    waypoint TEXT NOT NULL,
+    good TEXT NOT NULL,
+    time REAL NOT NULL,
+    source TEXT NOT NULL,
+    supply TEXT,
+    activity TEXT,
+    trade_volume INTEGER,
+    purchase_price INTEGER,
+    sell_price INTEGER
+);
+CREATE INDEX IF NOT EXISTS prices_good ON prices (good, time);
+CREATE INDEX IF NOT EXISTS prices_waypoint ON prices (waypoint, good, time);
+CREATE INDEX IF NOT EXISTS prices_time ON prices (time);
+
+-- The observations older than RAW_RETENTION, one row per hour
+CREATE TABLE IF NOT EXISTS prices_hourly (
+    waypoint TEXT NOT NULL,
+    good TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    observations INTEGER NOT NULL,
+    purchase_min INTEGER,
+    purchase_max INTEGER,
+    purchase_avg REAL,
+    sell_min INTEGER,
+    sell_max INTEGER,
+    sell_avg REAL,
+    purchase_observations INTEGER NOT NULL DEFAULT 0,  -- The observations with a purchase price, the weight of purchase_avg
+    sell_observations INTEGER NOT NULL DEFAULT 0,      -- The observations with a sell price, the weight of sell_avg
+    PRIMARY KEY (waypoint, good, hour)
+);
+CREATE INDEX IF NOT EXISTS prices_hourly_good ON prices_hourly (good, hour);
+
+-- The last observation of each good at each market
+CREATE TABLE IF NOT EXISTS market_goods (
+    waypoint TEXT NOT NULL,
+    good TEXT NOT NULL,
+    time REAL NOT NULL,
+    type TEXT,
+    supply TEXT,
+    activity TEXT,
+    trade_volume INTEGER,
+    purchase_price INTEGER,
+    sell_price INTEGER,
+    PRIMARY KEY (waypoint, good)
+);
+CREATE INDEX IF NOT EXISTS market_goods_good ON market_goods (good);
+"""
+
+# Columns added to prices_hourly after its first version, with the value of the rows averaged before
+HOURLY_MIGRATIONS = {
+    "purchase_observations": "CASE WHEN purchase_avg IS NULL THEN 0 ELSE observations END",
+    "sell_observations": "CASE WHEN sell_avg IS NULL THEN 0 ELSE observations END"
+}
+
+GOOD_COLUMNS = ["waypoint", "good", "time", "type", "supply", "activity", "trade_volume", "purchase_price", "sell_price"]
+
+
+def connect(path: str = MARKET_DB_PATH) -> sqlite3.Connection:
+    """ Opens the market database, creating the tables if they do not exist
+
+    Args:
+        path (str): The path of the database. Default: data/market.db
+
+    Returns:
+        sqlite3.Connection: The connection to the database
+    """
+
+    # Create the data folder on the first run
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # The connection is shared by the Flask threads and the fleet. A sqlite3.Connection is not safe for concurrent use,
+    # so the callers hold a lock around every query, see Model.MARKET_LOCK
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.executescript(SCHEMA)
+    migrate(connection)
+
+    return connection
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """ Adds the columns of HOURLY_MIGRATIONS to a database created before them
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+    """
+
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(prices_hourly)")}
+
+    with connection:
+        for column, value in HOURLY_MIGRATIONS.items():
+            if column not in columns:
+                connection.execute(f"ALTER TABLE prices_hourly ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+                connection.execute(f"UPDATE prices_hourly SET {column} = {value}")
+
+
+def insert_prices(connection: sqlite3.Connection, rows: list) -> None:
+    """ Stores some observations and updates the last price of their goods
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        rows (list): A dict per observation with the keys of GOOD_COLUMNS and the source
+    """
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO prices (waypoint, good, time, source, supply, activity, trade_volume, purchase_price, sell_price) "
+            "VALUES (:waypoint, :good, :time, :source, :supply, :activity, :trade_volume, :purchase_price, :sell_price)",
+            rows
+        )
+
+        # A transaction only carries one of the prices, the other ones are kept.
+        # Observations older than the stored one do not replace it
+        connection.executemany(
+            f"INSERT INTO market_goods ({', '.join(GOOD_COLUMNS)}) VALUES ({', '.join(':' + column for column in GOOD_COLUMNS)}) "
+            "ON CONFLICT DO UPDATE SET "
+            "time = excluded.time, "
+            + ", ".join(f"{column} = COALESCE(excluded.{column}, {column})" for column in GOOD_COLUMNS[3:])
+            + " WHERE excluded.time >= time",
+            rows
+        )
+
+
+def record_market(connection: sqlite3.Connection, market: dict, now: float = None) -> int:
+    """ Stores the prices of a market, as returned by get_market.
+    The prices are only there while a ship is at the market, otherwise nothing is stored
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        market (dict): The market
+        now (float): When the market was seen, in seconds since the epoch. Default: now
+
+    Returns:
+        int: The number of goods stored
+    """
+
+    now = time.time() if now is None else now
+
+    rows = [
+        {
+            "waypoint": market["symbol"],
+            "good": good["symbol"],
+            "time": now,
+            "source": "market",
+            "type": good.get("type"),
+            "supply": good.get("supply"),
+            "activity": good.get("activity"),
+            "trade_volume": good.get("tradeVolume"),
+            "purchase_price": good.get("purchasePrice"),
+            "sell_price": good.get("sellPrice")
+        }
+        for good in market.get("tradeGoods", [])
+    ]
+
+    if len(rows) > 0:
+        insert_prices(connection, rows)
+
+    return len(rows)
+
+
+def record_transaction(connection: sqlite3.Connection, transaction: dict) -> None:
+    """ Stores the price of a transaction, as returned by purchase_cargo and sell_cargo
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        transaction (dict): The transaction
+    """
+
+    purchase = transaction["type"] == "PURCHASE"
+
+    insert_prices(connection, [{
+        "waypoint": transaction["waypointSymbol"],
+        "good": transaction["tradeSymbol"],
+        "time": parse_timestamp(transaction["timestamp"]),
+        "source": transaction["type"].lower(),
+        "type": None,
+        "supply": None,
+        "activity": None,
+        "trade_volume": None,
+        "purchase_price": transaction["pricePerUnit"] if purchase else None,
+        "sell_price": None if purchase else transaction["pricePerUnit"]
+    }])
+
+
+def compact(connection: sqlite3.Connection, now: float = None) -> None:
+    """ Averages by hour the observations older than RAW_RETENTION and drops the hours older than HOURLY_RETENTION.
+    Only whole hours are averaged, so an hour is averaged once
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        now (float): The current time in seconds since the epoch. Default: now
+    """
+
+    now = time.time() if now is None else now
+    cutoff = (now - RAW_RETENTION) // HOUR * HOUR
+
+    with connection:
+        # Late observations of an hour already averaged are merged into it. A transaction only carries one of
+        # the prices, so each average is weighted by the observations of its own price
+        connection.execute(f"""
+            INSERT INTO prices_hourly (
+                waypoint, good, hour, observations, purchase_observations, sell_observations,
+                purchase_min, purchase_max, purchase_avg, sell_min, sell_max, sell_avg
+            )
+            SELECT waypoint, good, CAST(time / {HOUR} AS INTEGER) * {HOUR}, COUNT(*), COUNT(purchase_price), COUNT(sell_price),
+                MIN(purchase_price), MAX(purchase_price), AVG(purchase_price),
+                MIN(sell_price), MAX(sell_price), AVG(sell_price)
+            FROM prices WHERE time < ?
+            GROUP BY 1, 2, 3
+            ON CONFLICT DO UPDATE SET
+                observations = observations + excluded.observations,
+                purchase_observations = purchase_observations + excluded.purchase_observations,
+                sell_observations = sell_observations + excluded.sell_observations,
+                purchase_min = COALESCE(MIN(purchase_min, excluded.purchase_min), purchase_min, excluded.purchase_min),
+                purchase_max = COALESCE(MAX(purchase_max, excluded.purchase_max), purchase_max, excluded.purchase_max),
+                purchase_avg = COALESCE((purchase_avg * purchase_observations + excluded.purchase_avg * excluded.purchase_observations) / (purchase_observations + excluded.purchase_observations), purchase_avg, excluded.purchase_avg),
+                sell_min = COALESCE(MIN(sell_min, excluded.sell_min), sell_min, excluded.sell_min),
+                sell_max = COALESCE(MAX(sell_max, excluded.sell_max), sell_max, excluded.sell_max),
+                sell_avg = COALESCE((sell_avg * sell_observations + excluded.sell_avg * excluded.sell_observations) / (sell_observations + excluded.sell_observations), sell_avg, excluded.sell_avg)
+        """, (cutoff,))
+
+        connection.execute("DELETE FROM prices WHERE time < ?", (cutoff,))
+        connection.execute("DELETE FROM prices_hourly WHERE hour < ?", (now - HOURLY_RETENTION,))
+
+
+def get_market_goods(connection: sqlite3.Connection, waypoint: str) -> list:
+    """ Returns the last prices of the goods of a market
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        waypoint (str): The symbol of the market
+
+    Returns:
+        list: The row of each good, with the columns of GOOD_COLUMNS
+    """
+
+    return connection.execute(
+        f"SELECT {', '.join(GOOD_COLUMNS)} FROM market_goods WHERE waypoint = ? ORDER BY good",
+        (waypoint,)
+    ).fetchall()
+
+
+def get_good_markets(connection: sqlite3.Connection, good: str) -> list:
+    """ Returns the last prices of a good at every market trading it
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        good (str): The symbol of the good
+
+    Returns:
+        list: The row of each market, with the columns of GOOD_COLUMNS
+    """
+
+    return connection.execute(
+        f"SELECT {', '.join(GOOD_COLUMNS)} FROM market_goods WHERE good = ? ORDER BY waypoint",
+        (good,)
+    ).fetchall()
+
+
+def get_prices(connection: sqlite3.Connection) -> list:
+    """ Returns the last prices of every good at every market
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+
+    Returns:
+        list: (waypoint, good, purchase price, sell price, trade volume) of each good at each market
+    """
+
+    return connection.execute("SELECT waypoint, good, purchase_price, sell_price, trade_volume FROM market_goods").fetchall()
+
+
+def get_sell_prices(connection: sqlite3.Connection, system: str) -> dict:
+    """ Returns the best last price each good sells for in a system
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        system (str): The symbol of the system
+
+    Returns:
+        dict: Good symbol: highest sell price
+    """
+
+    return dict(connection.execute(
+        "SELECT good, MAX(sell_price) FROM market_goods WHERE waypoint LIKE ? AND sell_price IS NOT NULL GROUP BY good",
+        (system + "-%",)
+    ).fetchall())
+
+
+def get_price_history(connection: sqlite3.Connection, waypoint: str, good: str, since: float = 0) -> list:
+    """ Returns the prices of a good at a market over time: the hourly averages, then every recent observation
+
+    Args:
+        connection (sqlite3.Connection): The connection to the database
+        waypoint (str): The symbol of the market
+        good (str): The symbol of the good
+        since (float): The oldest time to return, in seconds since the epoch. Default: 0
+
+    Returns:
+        list: (time, purchase price, sell price, observations) of each point, oldest first
+    """
+
+    return connection.execute("""
+        SELECT hour, purchase_avg, sell_avg, observations FROM prices_hourly
+        WHERE waypoint = ? AND good = ? AND hour >= ?
+        UNION ALL
+        SELECT time, purchase_price, sell_price, 1 FROM prices
+        WHERE waypoint = ? AND good = ? AND time >= ?
+        ORDER BY 1
+    """, (waypoint, good, since, waypoint, good, since)).fetchall()
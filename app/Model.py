@@ -1,13 +1,57 @@
 import app.SpaceTradersAPI as SpaceTradersAPI
+import app.GalaxyDB as GalaxyDB
+import app.MarketDB as MarketDB
+from app.SpatialIndex import SpatialIndex
+from app.GalaxyColumns import GalaxyColumns
+from app.RoutePlanner import RoutePlanner, system_symbol
+from app.Cache import TTLCache
+from app.FleetScheduler import FleetScheduler
+from app.FleetState import FleetState
+from app.WaypointIndexer import WaypointIndex, WaypointIndexer
+from app.TradeSolver import TradeSolver
+from app.SurveyManager import SurveyManager
 from Config import *
-import json
+import numpy as np
+import os
+import threading
 import time
 
+GALAXY_JSON_PATH = os.path.join("data", "galaxy.json")
+
 API = None
-AGENT = None
-GALAXY_DATA = None
-CONTRACTS = None
-WAYPOINTS = dict()
+GALAXY_DB = None
+GALAXY_LOCK = threading.Lock()  # The connection is shared by the Flask threads and the indexer listener, one query at a time
+GALAXY_COLUMNS = None
+GALAXY_COLUMNS_COUNTS = None  # The counts of systems and waypoints of the database when the columns were loaded
+SPATIAL_INDEX = None
+ROUTE_PLANNER = RoutePlanner()
+FLEET_SCHEDULER = None
+FLEET_STATE = FleetState()
+FLEET_LOCK = threading.Lock()  # Only one thread reads the fleet again when the local copy is stale
+WAYPOINT_INDEX = None
+WAYPOINT_INDEXER = None
+MARKET_DB = None
+SURVEY_MANAGER = SurveyManager()
+MARKET_LOCK = threading.Lock()  # The fleet threads record prices while the web app reads them
+MARKET_COMPACTED = 0            # When the price history was last compacted
+MARKET_COMPACT_INTERVAL = 3600
+TRADE_SOLVER = None             # Built from the last prices, dropped when a price is recorded
+
+# Cache shared by the accessors, with the time to live in seconds of each endpoint
+CACHE = TTLCache(
+    max_size=1024,
+    ttls={
+        "agent": 120,
+        "contracts": 120,
+        "waypoints": 3600
+    },
+    # The agent and the contracts are served stale while they are refreshed in the background,
+    # so page loads never wait for SpaceTraders once they are cached
+    stale_ttls={
+        "agent": 600,
+        "contracts": 600
+    }
+)
 
 def init() -> None:
     """Initializes the API."""
@@ -16,22 +60,22 @@ def init() -> None:
 
     API = SpaceTradersAPI.SpaceTraders(TOKEN)
 
-def get_agent() -> dict:
-    """Logs into SpaceTraders and returns the response."""
+def get_agent(force_update: bool = False) -> dict:
+    """ Logs into SpaceTraders and returns the response.
 
-    global API, AGENT
+    Args:
+        force_update (bool): Forces the agent to be updated
 
-    # Check if the agent has already been cached
-    if AGENT is not None:
-        # Check if the agent is relatively new
-        if time.time() - AGENT[1] < 120:
-            return AGENT[0]
+    Returns:
+        dict: Response from SpaceTraders
+    """
 
-    result = API.get_my_agent()
+    global API, CACHE
 
-    AGENT = (result["data"], time.time())
+    if force_update:
+        CACHE.invalidate("agent")
 
-    return AGENT[0]
+    return CACHE.get_or_set("agent", (), lambda: API.get_my_agent()["data"])
 
 def get_contracts(force_update: bool = False) -> dict:
     """ Gets the contracts from SpaceTraders and returns the response.
@@ -43,19 +87,142 @@ def get_contracts(force_update: bool = False) -> dict:
         dict: Response from SpaceTraders
     """
 
-    global API, CONTRACTS
+    global API, CACHE
+
+    if force_update:
+        CACHE.invalidate("contracts")
+
+    return CACHE.get_or_set("contracts", (), lambda: API.get_contracts()["data"])
+
+def get_ships(force_update: bool = False) -> list:
+    """ Gets every ship of the agent from the local copy of the fleet, patched with the responses of the ship actions.
+    The copy is read again from SpaceTraders once it is older than FLEET_STATE.reconcile_interval.
+
+    Args:
+        force_update (bool): Forces the ships to be read again from SpaceTraders
+
+    Returns:
+        list: The ships
+    """
+
+    global API, FLEET_STATE, FLEET_LOCK
+
+    with FLEET_LOCK:
+        if force_update or FLEET_STATE.stale():
+            FLEET_STATE.replace(list(API.iter_my_ships()))
+
+    return FLEET_STATE.all()
+
+def get_ship(symbol: str) -> dict:
+    """ Gets a ship of the agent from the local copy of the fleet.
+
+    Args:
+        symbol (str): The symbol of the ship
+
+    Returns:
+        dict: The ship, None if the agent has no such ship
+    """
+
+    global FLEET_STATE
+
+    # Ships bought elsewhere show up with the reconciliation
+    get_ships()
+
+    return FLEET_STATE.get(symbol)
+
+def apply_ship_response(ship: str, response: dict) -> None:
+    """ Patches the local copy of a ship with the response of one of its actions.
+    Call it with the responses of the ship actions made with the client directly.
+
+    Args:
+        ship (str): The symbol of the ship
+        response (dict): The response from SpaceTraders
+    """
+
+    global FLEET_STATE
+
+    FLEET_STATE.apply(ship, response)
+
+def dock_ship(ship: str) -> dict:
+    """ Docks a ship at its waypoint.
+
+    Args:
+        ship (str): The symbol of the ship
+
+    Returns:
+        dict: The navigation of the ship
+    """
+
+    global API
 
-    # Check if the contracts have already been cached
-    if CONTRACTS is not None and not force_update:
-        # Check if the contracts are relatively new
-        if time.time() - CONTRACTS[1] < 120:
-            return CONTRACTS[0]
+    result = API.dock_ship(ship)
+    apply_ship_response(ship, result)
 
-    result = API.get_contracts()
+    return result["data"]
 
-    CONTRACTS = (result["data"], time.time())
+def orbit_ship(ship: str) -> dict:
+    """ Puts a ship in orbit of its waypoint.
 
-    return CONTRACTS[0]
+    Args:
+        ship (str): The symbol of the ship
+
+    Returns:
+        dict: The navigation of the ship
+    """
+
+    global API
+
+    result = API.orbit_ship(ship)
+    apply_ship_response(ship, result)
+
+    return result["data"]
+
+def refuel_ship(ship: str) -> dict:
+    """ Refuels a ship docked at a market and stores the price of the fuel.
+
+    Args:
+        ship (str): The symbol of the ship
+
+    Returns:
+        dict: The agent, the fuel of the ship and the transaction
+    """
+
+    global API, CACHE
+
+    result = API.refuel_ship(ship)
+    apply_ship_response(ship, result)
+    record_transaction(result["data"]["transaction"])
+
+    # The credits changed
+    CACHE.invalidate("agent")
+
+    return result["data"]
+
+def get_ship_states(force_update: bool = False) -> dict:
+    """ Gets the navigation, fuel and cooldown of every ship.
+
+    Args:
+        force_update (bool): Forces the ships to be updated
+
+    Returns:
+        dict: The state of each ship by symbol
+    """
+
+    states = dict()
+
+    for ship in get_ships(force_update=force_update):
+        # The remaining seconds change on every read, the expiration is enough to tell a new cooldown
+        cooldown = {key: value for key, value in ship["cooldown"].items() if key != "remainingSeconds"}
+
+        states.update({
+            ship["symbol"]: {
+                "nav": ship["nav"],
+                "fuel": ship["fuel"],
+                "cooldown": cooldown
+            }
+        })
+
+    return states
 
 def accept_contract(contract_id: str) -> dict:
     """ Accepts a contract and returns the response.
@@ -67,67 +234,199 @@ def accept_contract(contract_id: str) -> dict:
         dict: Response from SpaceTraders
     """
 
-    global API
+    global API, CACHE
 
     result = API.accept_contract(contract_id)
 
-    get_contracts(force_update=True)
+    # Accepting changes the contract and pays the agent upfront
+    CACHE.invalidate("contracts")
+    CACHE.invalidate("agent")
 
     return result
 
 
 def load_galaxy_data() -> None:
-    """Loads the galaxy data from SpaceTraders and saves it to a file."""
+    """Opens the galaxy database, importing the galaxy file the first time."""
+
+    global GALAXY_DB, GALAXY_LOCK
+
+    with GALAXY_LOCK:
+        # Return if the database is already open
+        if GALAXY_DB is None:
+            GALAXY_DB = GalaxyDB.connect()
+
+            # Import the galaxy downloaded before the database existed
+            if GalaxyDB.count_systems(GALAXY_DB) == 0 and os.path.exists(GALAXY_JSON_PATH):
+                GalaxyDB.import_json(GALAXY_DB, GALAXY_JSON_PATH)
+
+
+def load_galaxy_columns() -> None:
+    """ Loads the columnar copy of the galaxy, used by the queries that scan every system.
+    The copy is loaded again when the counts kept by the database changed, e.g. after DownloadGalaxy.
+    """
+
+    global GALAXY_DB, GALAXY_LOCK, GALAXY_COLUMNS, GALAXY_COLUMNS_COUNTS, SPATIAL_INDEX
+
+    load_galaxy_data()
+
+    with GALAXY_LOCK:
+        # The counts are kept current by the triggers of the database, reading them is cheap
+        counts = GalaxyDB.get_stats(GALAXY_DB, "count")
+
+        # Return if the columns are loaded and current
+        if GALAXY_COLUMNS is None or counts != GALAXY_COLUMNS_COUNTS:
+            GALAXY_COLUMNS = GalaxyColumns(GalaxyDB.get_system_rows(GALAXY_DB), GalaxyDB.get_waypoint_rows(GALAXY_DB))
+            GALAXY_COLUMNS_COUNTS = counts
+
+            # The spatial index is built from the columns
+            SPATIAL_INDEX = None
+
+
+def invalidate_galaxy_columns() -> None:
+    """Drops the columnar copy of the galaxy and the spatial index, e.g. after the waypoints of a system were replaced."""
+
+    global GALAXY_COLUMNS, SPATIAL_INDEX
+
+    GALAXY_COLUMNS = None
+    SPATIAL_INDEX = None
+
+
+def load_spatial_index() -> None:
+    """Builds the spatial index over the coordinates of the systems."""
 
-    global GALAXY_DATA
+    global GALAXY_COLUMNS, SPATIAL_INDEX
 
-    # Return the cached data if it exists
-    if GALAXY_DATA is None:
-        with open("data/galaxy.json", "r") as f:
-            GALAXY_DATA = json.loads(f.read())
+    load_galaxy_columns()
+
+    # Return if the index is already built
+    if SPATIAL_INDEX is None:
+        SPATIAL_INDEX = SpatialIndex(GALAXY_COLUMNS.symbols.tolist(), GALAXY_COLUMNS.x, GALAXY_COLUMNS.y)
 
 
 def get_galaxy_data() -> dict:
-    """Gets the galaxy data from SpaceTraders and returns the response."""
+    """Gets the galaxy data from the galaxy database and returns the response."""
 
-    global GALAXY_DATA
+    global GALAXY_DB, GALAXY_LOCK
 
-    # Return the cached data if it exists
+    # Open the database if needed
     load_galaxy_data()
 
     data = dict()
-    
-    data.update({
-        "system_count": len(GALAXY_DATA),
-        "star_by_type": dict()
-    })
-
-    for system in GALAXY_DATA:
-        data["star_by_type"].update({
-            system["type"]: data["star_by_type"].get(system["type"], 0) + 1
+
+    # The aggregates are kept current by the database, nothing is computed here
+    with GALAXY_LOCK:
+        counts = GalaxyDB.get_stats(GALAXY_DB, "count")
+
+        data.update({
+            "system_count": counts.get("systems", 0),
+            "star_by_type": GalaxyDB.get_stats(GALAXY_DB, "system_type"),
+            "systems_by_sector": GalaxyDB.get_stats(GALAXY_DB, "sector"),
+            "bounds": GalaxyDB.get_stats(GALAXY_DB, "bounds"),
+            "waypoint_count": counts.get("waypoints", 0),
+            "waypoints_by_type": GalaxyDB.get_stats(GALAXY_DB, "waypoint_type")
         })
 
     return data
 
 def get_systems() -> list:
-    """ Gets the galaxy data from SpaceTraders and returns the response.
+    """ Gets the symbols of the systems from the columnar copy of the galaxy.
 
     Returns:
-        list: List of systems
+        list: List of systems, sorted by symbol
+
+    """
+
+    global GALAXY_COLUMNS
+
+    # Load the columns if needed
+    load_galaxy_columns()
+
+    return GALAXY_COLUMNS.symbols.tolist()
+
+def get_system(symbol: str) -> dict:
+    """ Gets a system from the galaxy database.
+
+    Args:
+        symbol (str): The symbol of the system
 
+    Returns:
+        dict: The system, None if it is not known
     """
 
-    global GALAXY_DATA
+    global GALAXY_DB, GALAXY_LOCK
 
-    # Return the cached data if it exists
+    # Open the database if needed
     load_galaxy_data()
 
-    data = list()
-    
-    for system in sorted(GALAXY_DATA, key=lambda x: x["symbol"]):
-        data.append(system["symbol"])
+    with GALAXY_LOCK:
+        return GalaxyDB.get_system(GALAXY_DB, symbol)
 
-    return data
+def get_nearest_systems(system: str, count: int = 10) -> list:
+    """ Gets the systems nearest to a system.
+
+    Args:
+        system (str): The symbol of the system to start from
+        count (int): How many systems to return
+
+    Returns:
+        list: The nearest systems with their distance, nearest first
+    """
+
+    global SPATIAL_INDEX
+
+    # Build the index if needed
+    load_spatial_index()
+
+    coordinates = SPATIAL_INDEX.coordinates(system)
+    if coordinates is None:
+        return list()
+
+    # The system itself is the nearest one, skip it
+    systems = SPATIAL_INDEX.nearest(*coordinates, count + 1)
+
+    return [found for found in systems if found["symbol"] != system][:count]
+
+def get_systems_in_radius(system: str, radius: float) -> list:
+    """ Gets the systems within a radius from a system.
+
+    Args:
+        system (str): The symbol of the system at the center
+        radius (float): The radius
+
+    Returns:
+        list: The systems with their distance, nearest first
+    """
+
+    global SPATIAL_INDEX
+
+    # Build the index if needed
+    load_spatial_index()
+
+    coordinates = SPATIAL_INDEX.coordinates(system)
+    if coordinates is None:
+        return list()
+
+    return SPATIAL_INDEX.in_radius(*coordinates, radius)
+
+def get_systems_in_area(x_min: int, y_min: int, x_max: int, y_max: int) -> list:
+    """ Gets the systems inside a rectangle.
+
+    Args:
+        x_min (int): The left edge of the rectangle
+        y_min (int): The bottom edge of the rectangle
+        x_max (int): The right edge of the rectangle
+        y_max (int): The top edge of the rectangle
+
+    Returns:
+        list: The systems inside the rectangle
+    """
+
+    global SPATIAL_INDEX
+
+    # Build the index if needed
+    load_spatial_index()
+
+    return SPATIAL_INDEX.in_area(x_min, y_min, x_max, y_max)
 
 def get_waypoints(trait: str, system: str) -> dict:
     """ Gets the waypoints from SpaceTraders and returns the response.
@@ -140,19 +439,557 @@ def get_waypoints(trait: str, system: str) -> dict:
         dict: Response from SpaceTraders
     """
 
-    global API, WAYPOINTS
+    global API, CACHE
 
-    # Check if the waypoints have already been cached
-    if system in WAYPOINTS:
-        return WAYPOINTS[system]
-
-    result = API.get_system_waypoints(
+    # Read every page, not only the first one
+    return CACHE.get_or_set("waypoints", (system, trait), lambda: list(API.iter_system_waypoints(
         systemSymbol=system,
+        type=None,
         traits=trait
+    )))
+
+def get_cache_stats() -> dict:
+    """ Gets the hit, miss and eviction counters of the cache.
+
+    Returns:
+        dict: The statistics of the cache
+    """
+
+    global CACHE
+
+    return CACHE.stats()
+
+def get_metrics() -> dict:
+    """ Gets the latency, status code and traffic metrics of the requests sent to SpaceTraders.
+
+    Returns:
+        dict: The metrics by operation, the rate limit budget left and the statistics of the cache and of the local copy of the fleet
+    """
+
+    global API, CACHE, FLEET_STATE
+
+    metrics = API.metrics.snapshot()
+    metrics["cache"] = CACHE.stats()
+    metrics["fleet"] = FLEET_STATE.stats()
+
+    return metrics
+
+def load_route_system(system: str) -> None:
+    """ Adds the waypoints and the jump gate connections of a system to the route planner.
+
+    Args:
+        system (str): The symbol of the system
+    """
+
+    global API, ROUTE_PLANNER
+
+    # Return if the system is already known
+    if ROUTE_PLANNER.has_system(system):
+        return
+
+    waypoints = list(API.iter_system_waypoints(
+        systemSymbol=system,
+        type=None,
+        traits=None
+    ))
+
+    ROUTE_PLANNER.add_waypoints(waypoints)
+
+    for waypoint in waypoints:
+        if waypoint["type"] == "JUMP_GATE":
+            result = API.get_jump_gate(
+                systemSymbol=system,
+                waypointSymbol=waypoint["symbol"]
+            )
+
+            ROUTE_PLANNER.add_jump_gate(waypoint["symbol"], result["data"]["connections"])
+
+def get_route(origin: str, destination: str, fuel_capacity: int, engine_speed: int = 30, optimize: str = "time") -> list:
+    """ Plans a route between two waypoints, the ship is expected to leave with a full tank.
+
+    Args:
+        origin (str): The symbol of the waypoint to start from
+        destination (str): The symbol of the waypoint to reach
+        fuel_capacity (int): The fuel capacity of the ship
+        engine_speed (int): The speed of the ship's engine
+        optimize (str): What to minimize: time or fuel
+
+    Returns:
+        list: The steps of the route, None if the destination can not be reached
+    """
+
+    global ROUTE_PLANNER
+
+    # The planner only knows the systems it was given
+    load_route_system(system_symbol(origin))
+    load_route_system(system_symbol(destination))
+
+    return ROUTE_PLANNER.plan(origin, destination, fuel_capacity, engine_speed, optimize)
+
+def start_fleet_scheduler(workers: int = 8) -> FleetScheduler:
+    """ Starts the fleet scheduler in the background, tasks are then given to the ships with FLEET_SCHEDULER.assign
+
+    Args:
+        workers (int): How many tasks can run at the same time. Default: 8
+
+    Returns:
+        FleetScheduler: The scheduler
+    """
+
+    global API, FLEET_SCHEDULER
+
+    if FLEET_SCHEDULER is None:
+        FLEET_SCHEDULER = FleetScheduler(API, workers=workers, listener=apply_ship_response)
+        threading.Thread(target=FLEET_SCHEDULER.run, daemon=True).start()
+
+    return FLEET_SCHEDULER
+
+def load_waypoint_index() -> None:
+    """Loads the inverted index of the waypoint traits from the galaxy database."""
+
+    global GALAXY_DB, GALAXY_LOCK, WAYPOINT_INDEX
+
+    # Return if the index is already loaded
+    if WAYPOINT_INDEX is None:
+        load_galaxy_data()
+
+        with GALAXY_LOCK:
+            WAYPOINT_INDEX = WaypointIndex(*GalaxyDB.get_indexed_waypoints(GALAXY_DB))
+
+def system_indexed(system: str, waypoints: list) -> None:
+    """ Brings the copies of the galaxy in memory up to date once the indexer replaced the waypoints of a system.
+
+    Args:
+        system (str): The symbol of the system
+        waypoints (list): The waypoints of the system
+    """
+
+    global GALAXY_DB, GALAXY_LOCK, GALAXY_COLUMNS, GALAXY_COLUMNS_COUNTS, WAYPOINT_INDEX
+
+    WAYPOINT_INDEX.add_system(system, waypoints)
+
+    # Patch the columns in place, loading the whole galaxy again for every system would be too slow.
+    # The indexer writes with a connection of its own, the shared one is only read here on its thread
+    with GALAXY_LOCK:
+        if GALAXY_COLUMNS is not None:
+            GALAXY_COLUMNS.replace_waypoints(system, waypoints)
+            GALAXY_COLUMNS_COUNTS = GalaxyDB.get_stats(GALAXY_DB, "count")
+
+def start_waypoint_indexer(interval: float = 1) -> WaypointIndexer:
+    """ Starts indexing the waypoint traits of every system with waypoints in the background, nearest to the headquarters first.
+
+    Args:
+        interval (float): Seconds to wait between two systems. Default: 1
+
+    Returns:
+        WaypointIndexer: The indexer
+    """
+
+    global API, GALAXY_COLUMNS, WAYPOINT_INDEX, WAYPOINT_INDEXER
+
+    if WAYPOINT_INDEXER is None:
+        load_galaxy_columns()
+        load_waypoint_index()
+
+        # Systems without waypoints have nothing to index
+        has_waypoints = np.diff(GALAXY_COLUMNS.waypoint_offsets) > 0
+        symbols = GALAXY_COLUMNS.symbols[has_waypoints]
+        x, y = GALAXY_COLUMNS.x[has_waypoints], GALAXY_COLUMNS.y[has_waypoints]
+
+        # Nearest to the headquarters first
+        headquarters = GALAXY_COLUMNS.position(system_symbol(get_agent()["headquarters"]))
+        if headquarters is not None:
+            distances = np.hypot(x - float(GALAXY_COLUMNS.x[headquarters]), y - float(GALAXY_COLUMNS.y[headquarters]))
+            symbols = symbols[np.argsort(distances, kind="stable")]
+
+        WAYPOINT_INDEXER = WaypointIndexer(API, symbols.tolist(), listener=system_indexed, interval=interval)
+        threading.Thread(target=WAYPOINT_INDEXER.run, daemon=True).start()
+
+    return WAYPOINT_INDEXER
+
+def search_waypoints(traits: list = None, types: list = None, origin: str = None, limit: int = 50) -> list:
+    """ Searches the waypoints of the whole galaxy in the local index, no call is made to SpaceTraders.
+    Only the systems already indexed are searched by trait.
+
+    Args:
+        traits (list): The traits the waypoints must all have, e.g. ["MARKETPLACE", "SHIPYARD"]
+        types (list): The types the waypoints can be of, e.g. ["ASTEROID"]
+        origin (str): The symbol of the system to measure the distances from. Default: the system of the headquarters
+        limit (int): How many waypoints to return. Default: 50
+
+    Returns:
+        list: The waypoints with the distance of their system, nearest first
+    """
+
+    global GALAXY_DB, GALAXY_LOCK, GALAXY_COLUMNS, WAYPOINT_INDEX
+
+    # Refuse to list every waypoint of the galaxy
+    if not traits and not types:
+        return list()
+
+    load_galaxy_columns()
+    load_waypoint_index()
+
+    # The traits are intersected in memory, the types alone are looked up in the database
+    if traits:
+        rows = WAYPOINT_INDEX.find(traits, types)
+    else:
+        with GALAXY_LOCK:
+            rows = GalaxyDB.find_waypoints(GALAXY_DB, None, types)
+    if len(rows) == 0:
+        return list()
+
+    if origin is None:
+        origin = system_symbol(get_agent()["headquarters"])
+
+    # Distance between the system of each waypoint and the origin, unknown systems last
+    distances = np.full(len(rows), np.inf)
+    center = GALAXY_COLUMNS.position(origin)
+    if center is not None:
+        systems = np.asarray([row[1] for row in rows], dtype=str)
+        positions = np.minimum(np.searchsorted(GALAXY_COLUMNS.symbols, systems), len(GALAXY_COLUMNS) - 1)
+        known = GALAXY_COLUMNS.symbols[positions] == systems
+
+        distances[known] = np.hypot(
+            GALAXY_COLUMNS.x[positions[known]] - float(GALAXY_COLUMNS.x[center]),
+            GALAXY_COLUMNS.y[positions[known]] - float(GALAXY_COLUMNS.y[center])
+        )
+
+    order = np.argsort(distances, kind="stable")[:limit]
+
+    return [
+        {
+            "symbol": rows[i][0],
+            "system": rows[i][1],
+            "type": rows[i][2],
+            "x": rows[i][3],
+            "y": rows[i][4],
+            "distance": float(distances[i]) if np.isfinite(distances[i]) else None
+        }
+        for i in order.tolist()
+    ]
+
+def load_market_data() -> None:
+    """Opens the market database."""
+
+    global MARKET_DB, MARKET_LOCK
+
+    with MARKET_LOCK:
+        # Return if the database is already open
+        if MARKET_DB is None:
+            MARKET_DB = MarketDB.connect()
+
+def compact_market_data() -> None:
+    """Averages by hour the old prices and drops the oldest ones, at most once every MARKET_COMPACT_INTERVAL seconds."""
+
+    global MARKET_DB, MARKET_COMPACTED
+
+    if time.time() - MARKET_COMPACTED > MARKET_COMPACT_INTERVAL:
+        MARKET_COMPACTED = time.time()
+        MarketDB.compact(MARKET_DB)
+
+def record_market(market: dict) -> None:
+    """ Stores the prices of a market returned by get_market. Call it with the responses of the fleet too.
+
+    Args:
+        market (dict): The market
+    """
+
+    global MARKET_DB, MARKET_LOCK, TRADE_SOLVER
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        MarketDB.record_market(MARKET_DB, market)
+        compact_market_data()
+
+        # The trades are found again with the new prices
+        TRADE_SOLVER = None
+
+def record_transaction(transaction: dict) -> None:
+    """ Stores the price of a transaction returned by purchase_cargo or sell_cargo. Call it with the responses of the fleet too.
+
+    Args:
+        transaction (dict): The transaction
+    """
+
+    global MARKET_DB, MARKET_LOCK, TRADE_SOLVER
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        MarketDB.record_transaction(MARKET_DB, transaction)
+        compact_market_data()
+
+        # The trades are found again with the new prices
+        TRADE_SOLVER = None
+
+def get_market(system: str, waypoint: str) -> dict:
+    """ Gets a market from SpaceTraders and stores its prices.
+
+    Args:
+        system (str): The symbol of the system
+        waypoint (str): The symbol of the market
+
+    Returns:
+        dict: The market
+    """
+
+    global API
+
+    market = API.get_market(system, waypoint)["data"]
+    record_market(market)
+
+    return market
+
+def purchase_cargo(ship: str, symbol: str, units: int) -> dict:
+    """ Purchases cargo with a ship docked at a market and stores the price paid.
+
+    Args:
+        ship (str): The symbol of the ship
+        symbol (str): The symbol of the good
+        units (int): The units of the good, at most the trade volume of the market
+
+    Returns:
+        dict: The agent, the cargo of the ship and the transaction
+    """
+
+    global API, CACHE
+
+    result = API.purchase_cargo(ship, body={"symbol": symbol, "units": units})
+    apply_ship_response(ship, result)
+    record_transaction(result["data"]["transaction"])
+
+    # The credits changed
+    CACHE.invalidate("agent")
+
+    return result["data"]
+
+def sell_cargo(ship: str, symbol: str, units: int) -> dict:
+    """ Sells cargo with a ship docked at a market and stores the price received.
+
+    Args:
+        ship (str): The symbol of the ship
+        symbol (str): The symbol of the good
+        units (int): The units of the good, at most the trade volume of the market
+
+    Returns:
+        dict: The agent, the cargo of the ship and the transaction
+    """
+
+    global API, CACHE
+
+    result = API.sell_cargo(ship, body={"symbol": symbol, "units": units})
+    apply_ship_response(ship, result)
+    record_transaction(result["data"]["transaction"])
+
+    # The credits changed
+    CACHE.invalidate("agent")
+
+    return result["data"]
+
+def get_market_prices(waypoint: str) -> list:
+    """ Gets the last known prices of the goods of a market, no call is made to SpaceTraders.
+
+    Args:
+        waypoint (str): The symbol of the market
+
+    Returns:
+        list: The last observation of each good
+    """
+
+    global MARKET_DB, MARKET_LOCK
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        rows = MarketDB.get_market_goods(MARKET_DB, waypoint)
+
+    return [dict(zip(MarketDB.GOOD_COLUMNS, row)) for row in rows]
+
+def get_good_prices(good: str) -> list:
+    """ Gets the last known prices of a good at every market trading it, no call is made to SpaceTraders.
+
+    Args:
+        good (str): The symbol of the good, e.g. IRON_ORE
+
+    Returns:
+        list: The last observation at each market
+    """
+
+    global MARKET_DB, MARKET_LOCK
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        rows = MarketDB.get_good_markets(MARKET_DB, good)
+
+    return [dict(zip(MarketDB.GOOD_COLUMNS, row)) for row in rows]
+
+def get_price_history(waypoint: str, good: str, since: float = 0) -> list:
+    """ Gets the prices of a good at a market over time, no call is made to SpaceTraders.
+
+    Args:
+        waypoint (str): The symbol of the market
+        good (str): The symbol of the good
+        since (float): The oldest time to return, in seconds since the epoch. Default: 0
+
+    Returns:
+        list: The prices, oldest first. The points older than MarketDB.RAW_RETENTION are hourly averages
+    """
+
+    global MARKET_DB, MARKET_LOCK
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        rows = MarketDB.get_price_history(MARKET_DB, waypoint, good, since)
+
+    return [
+        {"time": row[0], "purchase_price": row[1], "sell_price": row[2], "observations": row[3]}
+        for row in rows
+    ]
+
+def get_trade_routes(ship: str, count: int = 10, mode: str = "CRUISE") -> list:
+    """ Finds the most profitable trades for a ship in its system, from the last known prices.
+
+    Args:
+        ship (str): The symbol of the ship
+        count (int): How many trades to return. Default: 10
+        mode (str): The flight mode: BURN, CRUISE, DRIFT. Default: CRUISE
+
+    Returns:
+        list: The trades, the most profit per second first
+    """
+
+    global GALAXY_DB, GALAXY_LOCK, MARKET_DB, MARKET_LOCK, TRADE_SOLVER
+
+    # Unknown ships have no trades
+    ship = get_ship(ship)
+    if ship is None:
+        return list()
+
+    origin = ship["nav"]["waypointSymbol"]
+
+    load_galaxy_data()
+    load_market_data()
+
+    # Build the solver once per change of the prices, under the lock so a price recorded meanwhile drops it
+    with MARKET_LOCK:
+        if TRADE_SOLVER is None:
+            prices = MarketDB.get_prices(MARKET_DB)
+            with GALAXY_LOCK:
+                coordinates = GalaxyDB.get_waypoint_coordinates(GALAXY_DB, {row[0] for row in prices})
+            TRADE_SOLVER = TradeSolver(prices, coordinates)
+
+        solver = TRADE_SOLVER
+
+    # The ship may not be at a market
+    with GALAXY_LOCK:
+        position = GalaxyDB.get_waypoint_coordinates(GALAXY_DB, {origin}).get(origin)
+
+    return solver.routes(
+        origin,
+        cargo_capacity=ship["cargo"]["capacity"],
+        engine_speed=ship["engine"]["speed"],
+        fuel_capacity=ship["fuel"]["capacity"],
+        mode=mode,
+        count=count,
+        position=position
     )
 
-    WAYPOINTS.update({
-        system: result["data"]
-    })
+def get_sell_prices(system: str) -> dict:
+    """ Gets the best last known price each good sells for in a system, no call is made to SpaceTraders.
+
+    Args:
+        system (str): The symbol of the system
+
+    Returns:
+        dict: Good symbol: highest sell price
+    """
+
+    global MARKET_DB, MARKET_LOCK
+
+    load_market_data()
+
+    with MARKET_LOCK:
+        return MarketDB.get_sell_prices(MARKET_DB, system)
+
+def create_survey(ship: str) -> dict:
+    """ Surveys the waypoint of a ship and keeps the surveys for the extractions.
+
+    Args:
+        ship (str): The symbol of the ship, with a surveyor mount
+
+    Returns:
+        dict: The cooldown of the ship and the surveys
+    """
+
+    global API, SURVEY_MANAGER
+
+    result = API.create_survey(ship)
+    apply_ship_response(ship, result)
+    SURVEY_MANAGER.add(result["data"]["surveys"])
+
+    return result["data"]
+
+def extract(ship: str, waypoint: str) -> dict:
+    """ Extracts resources with the most valuable survey of the waypoint, priced with the markets of its system.
+
+    Args:
+        ship (str): The symbol of the ship, in orbit of the waypoint
+        waypoint (str): The symbol of the waypoint
+
+    Returns:
+        dict: The cooldown of the ship, the extraction and the cargo
+    """
+
+    global API, SURVEY_MANAGER
+
+    result = SURVEY_MANAGER.extract(API, ship, waypoint, get_sell_prices(system_symbol(waypoint)))
+    apply_ship_response(ship, result)
+
+    return result["data"]
+
+def start_surveying(ship: str) -> None:
+    """ Makes a ship survey its waypoint every time its cooldown expires.
+
+    Args:
+        ship (str): The symbol of the ship, with a surveyor mount
+    """
+
+    global FLEET_SCHEDULER, SURVEY_MANAGER
+
+    def survey(api, symbol: str) -> dict:
+        result = api.create_survey(symbol)
+        SURVEY_MANAGER.add(result["data"]["surveys"])
+
+        return result
+
+    start_fleet_scheduler()
+    FLEET_SCHEDULER.assign(ship, survey)
+
+def start_mining(ship: str, waypoint: str) -> None:
+    """ Makes a ship extract at a waypoint every time its cooldown expires, with the best survey available, till its hold is full.
+
+    Args:
+        ship (str): The symbol of the ship, in orbit of the waypoint
+        waypoint (str): The symbol of the waypoint
+    """
+
+    global FLEET_SCHEDULER, SURVEY_MANAGER
+
+    def mine(api, symbol: str) -> dict:
+        result = SURVEY_MANAGER.extract(api, symbol, waypoint, get_sell_prices(system_symbol(waypoint)))
+
+        # The cargo has to be sold before extracting again. Stopping skips the listener of the scheduler,
+        # so the local copy of the ship is patched here with the last extraction
+        cargo = result["data"]["cargo"]
+        if cargo["units"] >= cargo["capacity"]:
+            apply_ship_response(symbol, result)
+            return None
+
+        return result
 
-    return result["data"]
\ No newline at end of file
+    start_fleet_scheduler()
+    FLEET_SCHEDULER.assign(ship, mine)
@@ -0,0 +1,260 @@
+import functools
+import heapq
+import math
+import threading
+
+# Flight modes: (travel time multiplier, fuel burnt per unit of distance)
+FLIGHT_MODES = {
+    "BURN": (12.5, 2),
+    "CRUISE": (25, 1),
+    "DRIFT": (250, 0),
+}
+
+# Flight modes tried by each optimization, the search keeps the best mix of them
+OPTIMIZATIONS = {
+    "time": ["BURN", "CRUISE", "DRIFT"],
+    "fuel": ["CRUISE", "DRIFT"],
+}
+
+JUMP_COOLDOWN = 60  # Estimated seconds spent jumping between two gates
+
+
+def system_symbol(waypoint: str) -> str:
+    """ Returns the symbol of the system of a waypoint
+
+    Args:
+        waypoint (str): The symbol of the waypoint, e.g. X1-DF55-20250Z
+
+    Returns:
+        str: The symbol of the system, e.g. X1-DF55
+    """
+
+    return waypoint.rsplit("-", 1)[0]
+
+
+def flight_cost(distance: float, mode: str, engine_speed: int) -> tuple:
+    """ Returns the fuel and the seconds needed to fly a distance, using the formulas of SpaceTraders
+
+    Args:
+        distance (float): The distance between the waypoints
+        mode (str): The flight mode: BURN, CRUISE, DRIFT
+        engine_speed (int): The speed of the ship's engine
+
+    Returns:
+        tuple: The fuel burnt and the travel time in seconds
+    """
+
+    multiplier, fuel_rate = FLIGHT_MODES[mode]
+
+    # Orbitals of the same planet share the coordinates and cost no fuel
+    if distance == 0:
+        fuel = 0
+    elif fuel_rate == 0:
+        fuel = 1
+    else:
+        fuel = max(1, round(distance)) * fuel_rate
+
+    time = round(round(max(1, distance)) * (multiplier / engine_speed) + 15)
+
+    return fuel, time
+
+
+class RoutePlanner:
+    """ Plans the fastest, or the most fuel efficient, route between two waypoints.
+    The graph is made of the known waypoints: ships navigate between waypoints of the same system,
+    refuel to full at every marketplace and jump between connected jump gates.
+    Routes are cached by origin, destination, fuel capacity, engine speed and optimization.
+
+    Args:
+        cache_size (int): How many routes are cached. Default: 4096
+    """
+
+    def __init__(self, cache_size: int = 4096) -> None:
+        self.waypoints = dict()   # Symbol: (x, y, has_marketplace), x and y are None for gates known only by a connection
+        self.systems = dict()     # System symbol: symbols of its waypoints
+        self.jump_gates = dict()  # Gate symbol: symbols of the connected gates
+
+        self.cached_plan = functools.lru_cache(maxsize=cache_size)(self._plan)
+        self.lock = threading.Lock()  # The Socket.IO workers add waypoints while others plan routes
+
+    def has_system(self, system: str) -> bool:
+        """ Returns whether the waypoints of a system are known
+
+        Args:
+            system (str): The symbol of the system
+
+        Returns:
+            bool: True if the waypoints were added
+        """
+
+        with self.lock:
+            return any(self.waypoints[waypoint][0] is not None for waypoint in self.systems.get(system, []))
+
+    def add_waypoints(self, waypoints: list) -> None:
+        """ Adds waypoints to the graph, as returned by get_system_waypoints
+
+        Args:
+            waypoints (list): The waypoints
+        """
+
+        with self.lock:
+            for waypoint in waypoints:
+                has_marketplace = any(trait["symbol"] == "MARKETPLACE" for trait in waypoint.get("traits", []))
+
+                self.waypoints[waypoint["symbol"]] = (waypoint["x"], waypoint["y"], has_marketplace)
+                self.systems.setdefault(waypoint["systemSymbol"], set()).add(waypoint["symbol"])
+
+            # The cached routes may be missing the new waypoints
+            self.cached_plan.cache_clear()
+
+    def add_jump_gate(self, symbol: str, connections: list) -> None:
+        """ Adds the connections of a jump gate to the graph, as returned by get_jump_gate
+
+        Args:
+            symbol (str): The symbol of the jump gate
+            connections (list): The symbols of the connected jump gates
+        """
+
+        with self.lock:
+            for gate in [symbol] + connections:
+                # Gates of unknown systems can only be jumped through
+                if gate not in self.waypoints:
+                    self.waypoints[gate] = (None, None, False)
+                    self.systems.setdefault(system_symbol(gate), set()).add(gate)
+
+            self.jump_gates.setdefault(symbol, set()).update(connections)
+
+            # Jumps work both ways
+            for gate in connections:
+                self.jump_gates.setdefault(gate, set()).add(symbol)
+
+            self.cached_plan.cache_clear()
+
+    def plan(self, origin: str, destination: str, fuel_capacity: int, engine_speed: int = 30, optimize: str = "time") -> list:
+        """ Plans a route, or returns it from the cache.
+        The ship is expected to leave with a full tank, a fuel capacity of 0 means the ship does not use fuel.
+
+        Args:
+            origin (str): The symbol of the waypoint to start from
+            destination (str): The symbol of the waypoint to reach
+            fuel_capacity (int): The fuel capacity of the ship
+            engine_speed (int): The speed of the ship's engine. Default: 30
+            optimize (str): What to minimize: time or fuel. Default: time
+
+        Returns:
+            list: The steps of the route, None if the destination can not be reached
+        """
+
+        # The graph does not change while the route is searched
+        with self.lock:
+            steps = self.cached_plan(origin, destination, fuel_capacity, engine_speed, optimize)
+
+        # The cached steps are shared, every caller gets its own copy
+        return None if steps is None else [dict(step) for step in steps]
+
+    def _plan(self, origin: str, destination: str, fuel_capacity: int, engine_speed: int = 30, optimize: str = "time") -> list:
+        """ Plans a route, use plan to get the cached result. The caller holds the lock
+
+        Args:
+            origin (str): The symbol of the waypoint to start from
+            destination (str): The symbol of the waypoint to reach
+            fuel_capacity (int): The fuel capacity of the ship
+            engine_speed (int): The speed of the ship's engine. Default: 30
+            optimize (str): What to minimize: time or fuel. Default: time
+
+        Returns:
+            tuple: The steps of the route, None if the destination can not be reached
+        """
+
+        if origin not in self.waypoints or destination not in self.waypoints:
+            return None
+
+        modes = OPTIMIZATIONS[optimize]
+
+        # The labels are (waypoint, fuel left), the costs are compared as (time, fuel) or (fuel, time)
+        start = (origin, fuel_capacity)
+        costs = {start: (0, 0)}
+        previous = dict()
+        queue = [((0, 0), start)]
+
+        while len(queue) > 0:
+            cost, label = heapq.heappop(queue)
+            waypoint, fuel = label
+
+            if waypoint == destination:
+                return self._steps(previous, label)
+
+            # Skip the labels reached again with a lower cost
+            if cost > costs[label]:
+                continue
+
+            moves = list()
+
+            # Jump to the connected gates
+            for gate in self.jump_gates.get(waypoint, []):
+                moves.append((gate, "JUMP", 0, JUMP_COOLDOWN, 0))
+
+            # Navigate to the waypoints of the same system worth stopping at
+            x, y, _ = self.waypoints[waypoint]
+            if x is not None:
+                for target in self.systems[system_symbol(waypoint)]:
+                    target_x, target_y, has_marketplace = self.waypoints[target]
+                    if target == waypoint or target_x is None:
+                        continue
+                    if target != destination and not has_marketplace and target not in self.jump_gates:
+                        continue
+
+                    distance = math.hypot(target_x - x, target_y - y)
+
+                    # Try every flight mode the fuel left allows: a faster leg now may leave
+                    # too little fuel for a later one, so the search over the fuel left picks the best mix
+                    for mode in modes:
+                        burnt, time = flight_cost(distance, mode, engine_speed)
+                        if fuel_capacity == 0:
+                            burnt = 0
+                        if burnt <= fuel:
+                            moves.append((target, mode, distance, time, burnt))
+
+            for target, mode, distance, time, burnt in moves:
+                # Refuel to full at every marketplace
+                fuel_left = fuel - burnt
+                if self.waypoints[target][2]:
+                    fuel_left = fuel_capacity
+
+                if optimize == "time":
+                    new_cost = (cost[0] + time, cost[1] + burnt)
+                else:
+                    new_cost = (cost[0] + burnt, cost[1] + time)
+
+                new_label = (target, fuel_left)
+                if new_label not in costs or new_cost < costs[new_label]:
+                    costs[new_label] = new_cost
+                    previous[new_label] = (label, {
+                        "waypoint": target,
+                        "mode": mode,
+                        "distance": distance,
+                        "fuel": burnt,
+                        "time": time,
+                        "refuel": self.waypoints[target][2] and target != destination
+                    })
+                    heapq.heappush(queue, (new_cost, new_label))
+
+        return None
+
+    def _steps(self, previous: dict, label: tuple) -> list:
+        """ Walks back from the destination to rebuild the steps of a route
+
+        Args:
+            previous (dict): The label each label was reached from, with the step taken
+            label (tuple): The label of the destination
+
+        Returns:
+            tuple: The steps of the route, in order
+        """
+
+        steps = list()
+        while label in previous:
+            label, step = previous[label]
+            steps.append(step)
+
+        return tuple(steps[::-1])
@@ -4,24 +4,440 @@
 # API Author: Joel Brubaker (joel@spacetraders.io)
 #
 
+import asyncio
+import bisect
+import collections
+import concurrent.futures
+import datetime
+import functools
+import json
+import math
+import random
 import requests
+import threading
+import time
+import typing
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class RateLimiter:
+    '''
+    Client side copy of the SpaceTraders rate limit.
+    Requests are taken from a sustained bucket that refills at a steady rate, when it is empty
+    they are taken from a burst bucket that slowly refills over the burst window.
+    When both buckets are empty the caller reserves the next free slot and waits for it, so
+    concurrent callers queue up in order instead of being answered with a 429.
+
+    Args:
+        rate (float): Sustained requests per second. Default: 2
+        burst (int): Requests that can be made on top of the sustained rate. Default: 30
+        burst_time (float): Seconds needed to refill the burst bucket. Default: 60
+    '''
+
+    def __init__(self, rate: float = 2, burst: int = 30, burst_time: float = 60) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.burst_time = burst_time
+
+        # Both buckets start full, the sustained one can hold a single request
+        self.tokens = 1.0
+        self.burst_tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        '''
+        Adds the tokens earned since the last update to both buckets
+        '''
+
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+
+        self.tokens = min(1.0, self.tokens + elapsed * self.rate)
+        self.burst_tokens = min(self.burst, self.burst_tokens + elapsed * self.burst / self.burst_time)
+
+    def reserve(self) -> float:
+        '''
+        Reserves a request slot
+
+        Returns:
+            float: The seconds to wait before the slot can be used
+        '''
+
+        with self.lock:
+            self._refill()
+
+            # Use the sustained bucket first
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            # Then the burst bucket, but only if nobody is already queued
+            if self.tokens >= 0 and self.burst_tokens >= 1:
+                self.burst_tokens -= 1
+                return 0.0
+
+            # Queue behind the callers that already reserved a slot
+            self.tokens -= 1
+            return -self.tokens / self.rate
+
+    def penalize(self, seconds: float) -> None:
+        '''
+        Empties both buckets so that the next reservation waits for the given seconds.
+        Used when the server answers with a 429 anyway, e.g. because another process shares the account
+
+        Args:
+            seconds (float): The seconds the server asked to wait
+        '''
+
+        with self.lock:
+            self._refill()
+            self.burst_tokens = 0.0
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    def acquire(self) -> None:
+        '''
+        Blocks until a request can be sent
+        '''
+
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def async_acquire(self) -> None:
+        '''
+        Waits until a request can be sent without blocking the event loop
+        '''
+
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# The rate limiter shared by every client in this process
+RATE_LIMITER = RateLimiter()
+
+
+# Status codes worth retrying, the server did not handle the request (429) or failed while handling it (5xx)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30) -> float:
+    '''
+    Exponential backoff with full jitter, so retrying clients do not hit the server all at once
+
+    Args:
+        attempt (int): The number of retries already made
+        base (float): The delay of the first retry. Default: 0.5
+        cap (float): The maximum delay. Default: 30
+
+    Returns:
+        float: The seconds to wait before the next retry
+    '''
+
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(headers: dict) -> float:
+    '''
+    Reads how long the server asked to wait from the Retry-After or the rate limit reset headers
+
+    Args:
+        headers (dict): The headers of the response
+
+    Returns:
+        float: The seconds to wait, None if the server did not say
+    '''
+
+    if 'Retry-After' in headers:
+        try:
+            return max(0.0, float(headers['Retry-After']))
+        except ValueError:
+            pass
+
+    if 'X-RateLimit-Reset' in headers:
+        try:
+            reset = datetime.datetime.fromisoformat(headers['X-RateLimit-Reset'].replace('Z', '+00:00'))
+            return max(0.0, (reset - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+        except ValueError:
+            pass
+
+    return None
+
+
+# Upper bounds in seconds of the latency histogram buckets, slower requests fall in the last bucket
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Rate limit headers kept from the last response
+RATE_LIMIT_HEADERS = ('X-RateLimit-Type', 'X-RateLimit-Limit-Sustained', 'X-RateLimit-Limit-Burst', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')
+
+
+def body_size(kwargs: dict) -> int:
+    '''
+    Returns the size of the body of a request
+
+    Args:
+        kwargs (dict): The arguments of the request
+
+    Returns:
+        int: The size in bytes
+    '''
+
+    if kwargs.get('json') is not None:
+        return len(json.dumps(kwargs['json']).encode())
+
+    data = kwargs.get('data')
+    if data is None:
+        return 0
+
+    return len(data.encode() if isinstance(data, str) else data)
+
+
+class Metrics:
+    '''
+    Metrics of the requests sent by the clients, by operation: a latency histogram, the count of each
+    status code and the bytes sent and received. Every attempt is recorded, so the retries and the 429s show up.
+    The rate limit headers of the last response tell how much of the budget is left.
+
+    Args:
+        buckets (tuple): The upper bounds in seconds of the latency histogram buckets. Default: LATENCY_BUCKETS
+    '''
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.operations = dict()  # Operation: its metrics
+        self.rate_limit = dict()  # The rate limit headers of the last response
+        self.lock = threading.Lock()
+
+    def record(self, operation: str, status, seconds: float, bytes_out: int = 0, bytes_in: int = 0, headers: dict = None) -> None:
+        '''
+        Records a request
+
+        Args:
+            operation (str): The operation, e.g. get_my_agent
+            status (int): The status code of the response, error if no response was received
+            seconds (float): How long the request took
+            bytes_out (int): The size of the body sent. Default: 0
+            bytes_in (int): The size of the body received. Default: 0
+            headers (dict): The headers of the response. Default: None
+        '''
+
+        with self.lock:
+            metrics = self.operations.get(operation)
+            if metrics is None:
+                metrics = self.operations[operation] = {
+                    'requests': 0,
+                    'latency_sum': 0.0,
+                    'latency_buckets': [0] * (len(self.buckets) + 1),
+                    'status_codes': collections.Counter(),
+                    'bytes_out': 0,
+                    'bytes_in': 0,
+                }
+
+            metrics['requests'] += 1
+            metrics['latency_sum'] += seconds
+            metrics['latency_buckets'][bisect.bisect_left(self.buckets, seconds)] += 1
+            metrics['status_codes'][str(status)] += 1
+            metrics['bytes_out'] += bytes_out
+            metrics['bytes_in'] += bytes_in
+
+            if headers is not None and 'X-RateLimit-Remaining' in headers:
+                self.rate_limit = {header: headers[header] for header in RATE_LIMIT_HEADERS if header in headers}
+                self.rate_limit['Updated'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def snapshot(self) -> dict:
+        '''
+        Returns a copy of the metrics, the histogram buckets are keyed by their upper bound
+
+        Returns:
+            dict: The metrics by operation and the last rate limit headers
+        '''
+
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+
+        with self.lock:
+            return {
+                'operations': {
+                    operation: dict(metrics, latency_buckets=dict(zip(bounds, metrics['latency_buckets'])), status_codes=dict(metrics['status_codes']))
+                    for operation, metrics in sorted(self.operations.items())
+                },
+                'rate_limit': dict(self.rate_limit),
+            }
+
+
+# The metrics shared by every client in this process
+METRICS = Metrics()
+
+
+def paginate(fetch, limit: int, workers: int = 1) -> typing.Iterator[dict]:
+    '''
+    Yields every entry of a paginated endpoint.
+    The total from the first page tells how many pages there are, the following pages are fetched in
+    background threads while the current one is consumed, so the caller rarely waits for the network.
+
+    Args:
+        fetch (callable): The method of the endpoint, called with page and limit
+        limit (int): The entries to request per page
+        workers (int): How many pages are fetched at the same time. Default: 1
+
+    Returns:
+        Iterator[dict]: The entries of every page
+    '''
+
+    first = fetch(page=1, limit=limit)
+    pages = math.ceil(first['meta']['total'] / limit)
+
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = collections.deque()
+    next_page = 2
+    try:
+        # Keep the next pages in flight
+        while next_page <= pages and len(futures) < max(1, workers):
+            futures.append(executor.submit(fetch, page=next_page, limit=limit))
+            next_page += 1
+
+        yield from first['data']
+
+        while futures:
+            result = futures.popleft().result()
+
+            if next_page <= pages:
+                futures.append(executor.submit(fetch, page=next_page, limit=limit))
+                next_page += 1
+
+            yield from result['data']
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def async_paginate(fetch, limit: int, workers: int = 1) -> typing.AsyncIterator[dict]:
+    '''
+    Same as paginate, but for the coroutines of AsyncSpaceTraders: the next pages are fetched by tasks
+
+    Args:
+        fetch (callable): The coroutine of the endpoint, called with page and limit
+        limit (int): The entries to request per page
+        workers (int): How many pages are fetched at the same time. Default: 1
+
+    Returns:
+        AsyncIterator[dict]: The entries of every page
+    '''
+
+    first = await fetch(page=1, limit=limit)
+    pages = math.ceil(first['meta']['total'] / limit)
+
+    tasks = collections.deque()
+    next_page = 2
+    try:
+        # Keep the next pages in flight
+        while next_page <= pages and len(tasks) < max(1, workers):
+            tasks.append(asyncio.ensure_future(fetch(page=next_page, limit=limit)))
+            next_page += 1
+
+        for entry in first['data']:
+            yield entry
+
+        while tasks:
+            result = await tasks.popleft()
+
+            if next_page <= pages:
+                tasks.append(asyncio.ensure_future(fetch(page=next_page, limit=limit)))
+                next_page += 1
+
+            for entry in result['data']:
+                yield entry
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
 class SpaceTraders:
-    def __init__(self, token: str) -> None:
+    def __init__(self, token: str, rate_limiter: RateLimiter = None, max_retries: int = 3, max_retry_wait: float = 60, metrics: Metrics = None) -> None:
         self.token = token  # The token used to authenticate the user
         self.url = 'https://api.spacetraders.io/v2'  # The url of the server
+        self.rate_limiter = rate_limiter or RATE_LIMITER  # Every request waits for its turn here
+        self.metrics = metrics or METRICS  # Every request is recorded here
+        self.max_retries = max_retries  # How many times a failed request is sent again
+        self.max_retry_wait = max_retry_wait  # How many seconds a request can spend waiting between retries
 
         # The session used to make requests and prepare the session methods for better readability
         self.session = requests.Session()
-        self._get = self.session.get
-        self._post = self.session.post
-        self._patch = self.session.patch
+        self._get = functools.partial(self._request, 'get')
+        self._post = functools.partial(self._request, 'post')
+        self._patch = functools.partial(self._request, 'patch')
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json',
             'Authorization': f'Bearer {self.token}',
         })
 
+    def _request(self, method: str, url: str, idempotent: bool = True, operation: str = 'unknown', **kwargs) -> requests.Response:
+        '''
+        Waits for the rate limiter and sends the request.
+        Rate limited requests (429) are always retried after the delay asked by the server, since the server did not run them.
+        Server and connection errors are retried with a jittered exponential backoff, but only if the endpoint is idempotent.
+        Every call can retry at most max_retries times and wait at most max_retry_wait seconds.
+        Every attempt is recorded in the metrics.
+
+        Args:
+            method (str): The http method: get, post, patch
+            url (str): The url of the endpoint
+            idempotent (bool): Whether the request can be sent again after a server or connection error. Default: True
+            operation (str): The name of the operation, used by the metrics. Default: unknown
+
+        Returns:
+            requests.Response: The response from the server
+        '''
+
+        bytes_out = body_size(kwargs)
+        attempt = 0
+        waited = 0.0
+        while True:
+            self.rate_limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.metrics.record(operation, 'error', time.perf_counter() - start, bytes_out)
+
+                # Only a connect timeout is sure to have never reached the server
+                if not idempotent and not isinstance(e, requests.ConnectTimeout):
+                    raise
+                error, response = e, None
+                delay = backoff_delay(attempt)
+            else:
+                self.metrics.record(operation, response.status_code, time.perf_counter() - start, bytes_out, len(response.content), response.headers)
+
+                if response.status_code == 429:
+                    delay = retry_after(response.headers)
+                    if delay is None:
+                        delay = backoff_delay(attempt)
+                elif response.status_code in RETRY_STATUS_CODES and idempotent:
+                    delay = backoff_delay(attempt)
+                else:
+                    return response
+
+            # Give up once the retry budget of this call is spent
+            if attempt >= self.max_retries or waited + delay > self.max_retry_wait:
+                if response is None:
+                    raise error
+                return response
+
+            attempt += 1
+            waited += delay
+
+            if response is not None and response.status_code == 429:
+                # Hold back every client sharing the rate limiter, the next acquire waits for the reset
+                self.rate_limiter.penalize(delay)
+            else:
+                time.sleep(delay)
+
     def get_status(
         self
     ) -> dict:
@@ -38,7 +454,7 @@ class SpaceTraders:
         url = self.url + f'/'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_status')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -76,7 +492,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_agents')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -85,6 +501,28 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_agents(
+        self,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_agents, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_agents),
+            limit=20,
+            workers=workers
+        )
+
+
     def get_agent(
         self,
         agentSymbol: str = 'FEBA66'
@@ -104,7 +542,7 @@ class SpaceTraders:
         url = self.url + f'/agents/{agentSymbol}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_agent')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -142,7 +580,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_factions')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -151,6 +589,28 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_factions(
+        self,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_factions, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_factions),
+            limit=20,
+            workers=workers
+        )
+
+
     def get_faction(
         self,
         factionSymbol: str
@@ -170,7 +630,7 @@ class SpaceTraders:
         url = self.url + f'/factions/{factionSymbol}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_faction')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -194,7 +654,7 @@ class SpaceTraders:
         url = self.url + f'/my/agent'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_my_agent')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -232,7 +692,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_contracts')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -241,6 +701,28 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_contracts(
+        self,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_contracts, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_contracts),
+            limit=20,
+            workers=workers
+        )
+
+
     def get_contract(
         self,
         contractId: str
@@ -260,7 +742,7 @@ class SpaceTraders:
         url = self.url + f'/my/contracts/{contractId}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_contract')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -290,7 +772,7 @@ class SpaceTraders:
         url = self.url + f'/my/contracts/{contractId}/accept'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='accept_contract')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -301,7 +783,8 @@ class SpaceTraders:
 
     def deliver_contract(
         self,
-        contractId: str
+        contractId: str,
+        body: dict
     ) -> dict:
         '''
         Deliver cargo to a contract.
@@ -312,6 +795,7 @@ class SpaceTraders:
 
         Args:
             contractId (str): The ID of the contract.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -322,7 +806,7 @@ class SpaceTraders:
         url = self.url + f'/my/contracts/{contractId}/deliver'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='deliver_contract')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -350,7 +834,7 @@ class SpaceTraders:
         url = self.url + f'/my/contracts/{contractId}/fulfill'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='fulfill_contract')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -388,7 +872,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_my_ships')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -397,14 +881,40 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_my_ships(
+        self,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_my_ships, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_my_ships),
+            limit=20,
+            workers=workers
+        )
+
+
     def purchase_ship(
-        self
+        self,
+        body: dict
     ) -> dict:
         '''
         Purchase a ship from a Shipyard. In order to use this function, a ship under your agent's ownership must be in a waypoint that has the `Shipyard` trait, and the Shipyard must sell the type of the desired ship.
         
         Shipyards typically offer ship types, which are predefined templates of ships that have dedicated roles. A template comes with a preset of an engine, a reactor, and a frame. It may also include a few modules and mounts.
 
+        Args:
+            body (dict): The body of the request, sent as json
+
         Returns:
             dict: The response from the server
         '''
@@ -414,7 +924,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='purchase_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -442,7 +952,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_my_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -470,7 +980,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/cargo'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_my_ship_cargo')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -502,7 +1012,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/chart'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='create_chart')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -534,7 +1044,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/cooldown'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_ship_cooldown')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -566,7 +1076,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/dock'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=True, operation='dock_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -598,7 +1108,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/extract'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='extract_resources')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -609,7 +1119,8 @@ class SpaceTraders:
 
     def extract_resources_with_survey(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Use a survey when extracting resources from a waypoint. This endpoint requires a survey as the payload, which allows your ship to extract specific yields.
@@ -618,6 +1129,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -628,7 +1140,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/extract/survey'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='extract_resources_with_survey')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -639,13 +1151,15 @@ class SpaceTraders:
 
     def jettison(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Jettison cargo from your ship's cargo hold.
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -656,7 +1170,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/jettison'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='jettison')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -667,7 +1181,8 @@ class SpaceTraders:
 
     def jump_ship(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Jump your ship instantly to a target connected waypoint. The ship must be in orbit to execute a jump.
@@ -676,6 +1191,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -686,7 +1202,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/jump'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='jump_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -714,7 +1230,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/mounts'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_mounts')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -725,7 +1241,8 @@ class SpaceTraders:
 
     def install_mount(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Install a mount on a ship.
@@ -736,6 +1253,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -746,7 +1264,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/mounts/install'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='install_mount')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -757,7 +1275,8 @@ class SpaceTraders:
 
     def remove_mount(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Remove a mount from a ship.
@@ -768,6 +1287,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -778,7 +1298,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/mounts/remove'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='remove_mount')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -806,7 +1326,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/nav'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_ship_nav')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -817,7 +1337,8 @@ class SpaceTraders:
 
     def patch_ship_nav(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Update the nav configuration of a ship.
@@ -826,6 +1347,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -836,7 +1358,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/nav'
 
         # Make the request
-        response = self._patch(url=url)
+        response = self._patch(url=url, json=body, idempotent=True, operation='patch_ship_nav')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -847,7 +1369,8 @@ class SpaceTraders:
 
     def navigate_ship(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Navigate to a target destination. The ship must be in orbit to use this function. The destination waypoint must be within the same system as the ship's current location. Navigating will consume the necessary fuel from the ship's manifest based on the distance to the target waypoint.
@@ -858,6 +1381,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -868,7 +1392,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/navigate'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='navigate_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -902,7 +1426,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/negotiate/contract'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='negotiateContract')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -934,7 +1458,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/orbit'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=True, operation='orbit_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -945,7 +1469,8 @@ class SpaceTraders:
 
     def purchase_cargo(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Purchase cargo from a market.
@@ -958,6 +1483,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -968,7 +1494,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/purchase'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='purchase_cargo')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -979,7 +1505,8 @@ class SpaceTraders:
 
     def ship_refine(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Attempt to refine the raw materials on your ship. The request will only succeed if your ship is capable of refining at the time of the request. In order to be able to refine, a ship must have goods that can be refined and have installed a `Refinery` module that can refine it.
@@ -988,6 +1515,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The symbol of the ship.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -998,7 +1526,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/refine'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='ship_refine')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1009,7 +1537,8 @@ class SpaceTraders:
 
     def refuel_ship(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict = None
     ) -> dict:
         '''
         Refuel your ship by buying fuel from the local market.
@@ -1022,6 +1551,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json. Default: None
 
         Returns:
             dict: The response from the server
@@ -1032,7 +1562,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/refuel'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='refuel_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1064,7 +1594,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/scan/ships'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='create_ship_ship_scan')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1094,7 +1624,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/scan/systems'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='create_ship_system_scan')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1126,7 +1656,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/scan/waypoints'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='create_ship_waypoint_scan')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1137,13 +1667,15 @@ class SpaceTraders:
 
     def sell_cargo(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Sell cargo in your ship to a market that trades this cargo. The ship must be docked in a waypoint that has the `Marketplace` trait in order to use this function.
 
         Args:
             shipSymbol (str): Symbol of a ship.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -1154,7 +1686,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/sell'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='sell_cargo')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1184,7 +1716,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/siphon'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='siphon_resources')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1220,7 +1752,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/survey'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, idempotent=False, operation='create_survey')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1231,7 +1763,8 @@ class SpaceTraders:
 
     def transfer_cargo(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Transfer cargo between ships.
@@ -1242,6 +1775,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The transferring ship's symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -1252,7 +1786,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/transfer'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='transfer_cargo')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1263,7 +1797,8 @@ class SpaceTraders:
 
     def warp_ship(
         self,
-        shipSymbol: str
+        shipSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Warp your ship to a target destination in another system. The ship must be in orbit to use this function and must have the `Warp Drive` module installed. Warping will consume the necessary fuel from the ship's manifest.
@@ -1272,6 +1807,7 @@ class SpaceTraders:
 
         Args:
             shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -1282,7 +1818,7 @@ class SpaceTraders:
         url = self.url + f'/my/ships/{shipSymbol}/warp'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='warp_ship')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1292,7 +1828,8 @@ class SpaceTraders:
 
 
     def register(
-        self
+        self,
+        body: dict
     ) -> dict:
         '''
         Creates a new agent and ties it to an account. 
@@ -1306,6 +1843,9 @@ class SpaceTraders:
         
         If you are new to SpaceTraders, It is recommended to register with the COSMIC faction, a faction that is well connected to the rest of the universe. After registering, you should try our interactive [quickstart guide](https://docs.spacetraders.io/quickstart/new-game) which will walk you through basic API requests in just a few minutes.
 
+        Args:
+            body (dict): The body of the request, sent as json
+
         Returns:
             dict: The response from the server
         '''
@@ -1315,7 +1855,7 @@ class SpaceTraders:
         url = self.url + f'/register'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='register')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1353,7 +1893,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_systems')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1362,6 +1902,28 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_systems(
+        self,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_systems, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_systems),
+            limit=20,
+            workers=workers
+        )
+
+
     def get_system(
         self,
         systemSymbol: str = 'X1-OE'
@@ -1381,7 +1943,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_system')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1429,7 +1991,7 @@ class SpaceTraders:
         }
 
         # Make the request
-        response = self._get(url=url, params=params)
+        response = self._get(url=url, params=params, idempotent=True, operation='get_system_waypoints')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1438,6 +2000,34 @@ class SpaceTraders:
         return response.json()
 
 
+    def iter_system_waypoints(
+        self,
+        systemSymbol: str,
+        type: str,
+        traits: str,
+        workers: int = 1
+    ) -> typing.Iterator[dict]:
+        '''
+        Iterates over every entry of get_system_waypoints, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            systemSymbol (str): The system symbol
+            type (str): Filter waypoints by type.
+            traits (str): Filter waypoints by one or more traits.
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            Iterator[dict]: The entries of every page
+        '''
+
+        return paginate(
+            functools.partial(self.get_system_waypoints, systemSymbol=systemSymbol, type=type, traits=traits),
+            limit=20,
+            workers=workers
+        )
+
+
     def get_waypoint(
         self,
         systemSymbol: str,
@@ -1461,7 +2051,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_waypoint')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1491,7 +2081,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/construction'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_construction')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1503,7 +2093,8 @@ class SpaceTraders:
     def supply_construction(
         self,
         systemSymbol: str,
-        waypointSymbol: str
+        waypointSymbol: str,
+        body: dict
     ) -> dict:
         '''
         Supply a construction site with the specified good. Requires a waypoint with a property of `isUnderConstruction` to be true.
@@ -1513,6 +2104,7 @@ class SpaceTraders:
         Args:
             systemSymbol (str): The system symbol
             waypointSymbol (str): The waypoint symbol
+            body (dict): The body of the request, sent as json
 
         Returns:
             dict: The response from the server
@@ -1523,7 +2115,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/construction/supply'
 
         # Make the request
-        response = self._post(url=url)
+        response = self._post(url=url, json=body, idempotent=False, operation='supply_construction')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1555,7 +2147,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/jump-gate'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_jump_gate')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1587,7 +2179,7 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/market'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_market')
 
         # Check if the request was successful
         response.raise_for_status()
@@ -1617,7 +2209,1950 @@ class SpaceTraders:
         url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/shipyard'
 
         # Make the request
-        response = self._get(url=url)
+        response = self._get(url=url, idempotent=True, operation='get_shipyard')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+class AsyncResponse:
+    '''
+    The parts of an aiohttp response used by the generated methods.
+    The body is read right away so that the connection can go back to the pool.
+
+    Args:
+        response (aiohttp.ClientResponse): The response from the server
+        body (bytes): The body of the response
+    '''
+
+    def __init__(self, response, body: bytes) -> None:
+        self.status_code = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+        self.request_info = response.request_info
+        self.history = response.history
+        self.body = body
+
+    def raise_for_status(self) -> None:
+        '''
+        Raises an aiohttp.ClientResponseError if the request was not successful
+        '''
+
+        if self.status_code >= 400:
+            raise aiohttp.ClientResponseError(
+                self.request_info,
+                self.history,
+                status=self.status_code,
+                message=self.reason,
+                headers=self.headers
+            )
+
+    def json(self) -> dict:
+        '''
+        Returns:
+            dict: The body of the response
+        '''
+
+        return json.loads(self.body)
+
+
+class AsyncSpaceTraders:
+    '''
+    Same methods as SpaceTraders, but every method is a coroutine.
+    Requests share a pool of connections, so many ships can be driven at once from a single event loop.
+    Use it as an async context manager, or call close() when done.
+    '''
+
+    def __init__(self, token: str, rate_limiter: RateLimiter = None, max_retries: int = 3, max_retry_wait: float = 60, connections: int = 20, metrics: Metrics = None) -> None:
+        if aiohttp is None:
+            raise ImportError('AsyncSpaceTraders needs aiohttp, install it with: pip install aiohttp')
+
+        self.token = token  # The token used to authenticate the user
+        self.url = 'https://api.spacetraders.io/v2'  # The url of the server
+        self.rate_limiter = rate_limiter or RATE_LIMITER  # Every request waits for its turn here
+        self.metrics = metrics or METRICS  # Every request is recorded here
+        self.max_retries = max_retries  # How many times a failed request is sent again
+        self.max_retry_wait = max_retry_wait  # How many seconds a request can spend waiting between retries
+        self.connections = connections  # How many connections the pool keeps open
+
+        # The session is created inside the event loop on the first request
+        self.session = None
+        self._get = functools.partial(self._request, 'get')
+        self._post = functools.partial(self._request, 'post')
+        self._patch = functools.partial(self._request, 'patch')
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {self.token}',
+        }
+
+    async def __aenter__(self) -> 'AsyncSpaceTraders':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        '''
+        Closes the session and its pooled connections
+        '''
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        '''
+        Returns:
+            aiohttp.ClientSession: The session, created on first use
+        '''
+
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.connections)
+            )
+
+        return self.session
+
+    async def _request(self, method: str, url: str, idempotent: bool = True, operation: str = 'unknown', **kwargs) -> AsyncResponse:
+        '''
+        Waits for the rate limiter and sends the request, retrying it like SpaceTraders._request does
+
+        Args:
+            method (str): The http method: get, post, patch
+            url (str): The url of the endpoint
+            idempotent (bool): Whether the request can be sent again after a server or connection error. Default: True
+            operation (str): The name of the operation, used by the metrics. Default: unknown
+
+        Returns:
+            AsyncResponse: The response from the server
+        '''
+
+        # aiohttp does not skip empty parameters like requests does
+        if 'params' in kwargs:
+            kwargs['params'] = {key: value for key, value in kwargs['params'].items() if value is not None}
+
+        bytes_out = body_size(kwargs)
+        attempt = 0
+        waited = 0.0
+        while True:
+            await self.rate_limiter.async_acquire()
+
+            start = time.perf_counter()
+            try:
+                async with self._get_session().request(method, url, **kwargs) as raw_response:
+                    response = AsyncResponse(raw_response, await raw_response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                self.metrics.record(operation, 'error', time.perf_counter() - start, bytes_out)
+
+                # Only a failed connection is sure to have never reached the server
+                if not idempotent and not isinstance(e, aiohttp.ClientConnectorError):
+                    raise
+                error, response = e, None
+                delay = backoff_delay(attempt)
+            else:
+                self.metrics.record(operation, response.status_code, time.perf_counter() - start, bytes_out, len(response.body), response.headers)
+
+                if response.status_code == 429:
+                    delay = retry_after(response.headers)
+                    if delay is None:
+                        delay = backoff_delay(attempt)
+                elif response.status_code in RETRY_STATUS_CODES and idempotent:
+                    delay = backoff_delay(attempt)
+                else:
+                    return response
+
+            # Give up once the retry budget of this call is spent
+            if attempt >= self.max_retries or waited + delay > self.max_retry_wait:
+                if response is None:
+                    raise error
+                return response
+
+            attempt += 1
+            waited += delay
+
+            if response is not None and response.status_code == 429:
+                # Hold back every client sharing the rate limiter, the next acquire waits for the reset
+                self.rate_limiter.penalize(delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def get_status(
+        self
+    ) -> dict:
+        '''
+        Return the status of the game server.
+        This also includes a few global elements, such as announcements, server reset dates and leaderboards.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_status')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_agents(
+        self,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Fetch agents details.
+
+        Args:
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/agents'
+
+        # Prepare the parameters
+        params = {
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_agents')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_agents(
+        self,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_agents, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_agents),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def get_agent(
+        self,
+        agentSymbol: str = 'FEBA66'
+    ) -> dict:
+        '''
+        Fetch agent details.
+
+        Args:
+            agentSymbol (str): The agent symbol. Default: 'FEBA66'
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/agents/{agentSymbol}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_agent')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_factions(
+        self,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Return a paginated list of all the factions in the game.
+
+        Args:
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/factions'
+
+        # Prepare the parameters
+        params = {
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_factions')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_factions(
+        self,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_factions, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_factions),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def get_faction(
+        self,
+        factionSymbol: str
+    ) -> dict:
+        '''
+        View the details of a faction.
+
+        Args:
+            factionSymbol (str): The faction symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/factions/{factionSymbol}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_faction')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_my_agent(
+        self
+    ) -> dict:
+        '''
+        Fetch your agent's details.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/agent'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_my_agent')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_contracts(
+        self,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Return a paginated list of all your contracts.
+
+        Args:
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/my/contracts'
+
+        # Prepare the parameters
+        params = {
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_contracts')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_contracts(
+        self,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_contracts, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_contracts),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def get_contract(
+        self,
+        contractId: str
+    ) -> dict:
+        '''
+        Get the details of a contract by ID.
+
+        Args:
+            contractId (str): The contract ID
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/contracts/{contractId}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_contract')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def accept_contract(
+        self,
+        contractId: str
+    ) -> dict:
+        '''
+        Accept a contract by ID. 
+        
+        You can only accept contracts that were offered to you, were not accepted yet, and whose deadlines has not passed yet.
+
+        Args:
+            contractId (str): The contract ID to accept.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/contracts/{contractId}/accept'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='accept_contract')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def deliver_contract(
+        self,
+        contractId: str,
+        body: dict
+    ) -> dict:
+        '''
+        Deliver cargo to a contract.
+        
+        In order to use this API, a ship must be at the delivery location (denoted in the delivery terms as `destinationSymbol` of a contract) and must have a number of units of a good required by this contract in its cargo.
+        
+        Cargo that was delivered will be removed from the ship's cargo.
+
+        Args:
+            contractId (str): The ID of the contract.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/contracts/{contractId}/deliver'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='deliver_contract')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def fulfill_contract(
+        self,
+        contractId: str
+    ) -> dict:
+        '''
+        Fulfill a contract. Can only be used on contracts that have all of their delivery terms fulfilled.
+
+        Args:
+            contractId (str): The ID of the contract to fulfill.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/contracts/{contractId}/fulfill'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='fulfill_contract')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_my_ships(
+        self,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Return a paginated list of all of ships under your agent's ownership.
+
+        Args:
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/my/ships'
+
+        # Prepare the parameters
+        params = {
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_my_ships')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_my_ships(
+        self,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_my_ships, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_my_ships),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def purchase_ship(
+        self,
+        body: dict
+    ) -> dict:
+        '''
+        Purchase a ship from a Shipyard. In order to use this function, a ship under your agent's ownership must be in a waypoint that has the `Shipyard` trait, and the Shipyard must sell the type of the desired ship.
+        
+        Shipyards typically offer ship types, which are predefined templates of ships that have dedicated roles. A template comes with a preset of an engine, a reactor, and a frame. It may also include a few modules and mounts.
+
+        Args:
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='purchase_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_my_ship(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Retrieve the details of a ship under your agent's ownership.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_my_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_my_ship_cargo(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Retrieve the cargo of a ship under your agent's ownership.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/cargo'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_my_ship_cargo')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def create_chart(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Command a ship to chart the waypoint at its current location.
+        
+        Most waypoints in the universe are uncharted by default. These waypoints have their traits hidden until they have been charted by a ship.
+        
+        Charting a waypoint will record your agent as the one who created the chart, and all other agents would also be able to see the waypoint's traits.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/chart'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='create_chart')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_ship_cooldown(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Retrieve the details of your ship's reactor cooldown. Some actions such as activating your jump drive, scanning, or extracting resources taxes your reactor and results in a cooldown.
+        
+        Your ship cannot perform additional actions until your cooldown has expired. The duration of your cooldown is relative to the power consumption of the related modules or mounts for the action taken.
+        
+        Response returns a 204 status code (no-content) when the ship has no cooldown.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/cooldown'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_ship_cooldown')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def dock_ship(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Attempt to dock your ship at its current location. Docking will only succeed if your ship is capable of docking at the time of the request.
+        
+        Docked ships can access elements in their current location, such as the market or a shipyard, but cannot do actions that require the ship to be above surface such as navigating or extracting.
+        
+        The endpoint is idempotent - successive calls will succeed even if the ship is already docked.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/dock'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=True, operation='dock_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def extract_resources(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Extract resources from a waypoint that can be extracted, such as asteroid fields, into your ship. Send an optional survey as the payload to target specific yields.
+        
+        The ship must be in orbit to be able to extract and must have mining equipments installed that can extract goods, such as the `Gas Siphon` mount for gas-based goods or `Mining Laser` mount for ore-based goods.
+        
+        The survey property is now deprecated. See the `extract/survey` endpoint for more details.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/extract'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='extract_resources')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def extract_resources_with_survey(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Use a survey when extracting resources from a waypoint. This endpoint requires a survey as the payload, which allows your ship to extract specific yields.
+        
+        Send the full survey object as the payload which will be validated according to the signature. If the signature is invalid, or any properties of the survey are changed, the request will fail.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/extract/survey'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='extract_resources_with_survey')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def jettison(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Jettison cargo from your ship's cargo hold.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/jettison'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='jettison')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def jump_ship(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Jump your ship instantly to a target connected waypoint. The ship must be in orbit to execute a jump.
+        
+        A unit of antimatter is purchased and consumed from the market when jumping. The price of antimatter is determined by the market and is subject to change. A ship can only jump to connected waypoints
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/jump'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='jump_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_mounts(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Get the mounts installed on a ship.
+
+        Args:
+            shipSymbol (str): The ship's symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/mounts'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_mounts')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def install_mount(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Install a mount on a ship.
+        
+        In order to install a mount, the ship must be docked and located in a waypoint that has a `Shipyard` trait. The ship also must have the mount to install in its cargo hold.
+        
+        An installation fee will be deduced by the Shipyard for installing the mount on the ship. 
+
+        Args:
+            shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/mounts/install'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='install_mount')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def remove_mount(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Remove a mount from a ship.
+        
+        The ship must be docked in a waypoint that has the `Shipyard` trait, and must have the desired mount that it wish to remove installed.
+        
+        A removal fee will be deduced from the agent by the Shipyard.
+
+        Args:
+            shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/mounts/remove'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='remove_mount')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_ship_nav(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Get the current nav status of a ship.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/nav'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_ship_nav')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def patch_ship_nav(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Update the nav configuration of a ship.
+        
+        Currently only supports configuring the Flight Mode of the ship, which affects its speed and fuel consumption.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/nav'
+
+        # Make the request
+        response = await self._patch(url=url, json=body, idempotent=True, operation='patch_ship_nav')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def navigate_ship(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Navigate to a target destination. The ship must be in orbit to use this function. The destination waypoint must be within the same system as the ship's current location. Navigating will consume the necessary fuel from the ship's manifest based on the distance to the target waypoint.
+        
+        The returned response will detail the route information including the expected time of arrival. Most ship actions are unavailable until the ship has arrived at it's destination.
+        
+        To travel between systems, see the ship's Warp or Jump actions.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/navigate'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='navigate_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def negotiateContract(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Negotiate a new contract with the HQ.
+        
+        In order to negotiate a new contract, an agent must not have ongoing or offered contracts over the allowed maximum amount. Currently the maximum contracts an agent can have at a time is 1.
+        
+        Once a contract is negotiated, it is added to the list of contracts offered to the agent, which the agent can then accept. 
+        
+        The ship must be present at any waypoint with a faction present to negotiate a contract with that faction.
+
+        Args:
+            shipSymbol (str): The ship's symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/negotiate/contract'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='negotiateContract')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def orbit_ship(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Attempt to move your ship into orbit at its current location. The request will only succeed if your ship is capable of moving into orbit at the time of the request.
+        
+        Orbiting ships are able to do actions that require the ship to be above surface such as navigating or extracting, but cannot access elements in their current waypoint, such as the market or a shipyard.
+        
+        The endpoint is idempotent - successive calls will succeed even if the ship is already in orbit.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/orbit'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=True, operation='orbit_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def purchase_cargo(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Purchase cargo from a market.
+        
+        The ship must be docked in a waypoint that has `Marketplace` trait, and the market must be selling a good to be able to purchase it.
+        
+        The maximum amount of units of a good that can be purchased in each transaction are denoted by the `tradeVolume` value of the good, which can be viewed by using the Get Market action.
+        
+        Purchased goods are added to the ship's cargo hold.
+
+        Args:
+            shipSymbol (str): The ship's symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/purchase'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='purchase_cargo')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def ship_refine(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Attempt to refine the raw materials on your ship. The request will only succeed if your ship is capable of refining at the time of the request. In order to be able to refine, a ship must have goods that can be refined and have installed a `Refinery` module that can refine it.
+        
+        When refining, 30 basic goods will be converted into 10 processed goods.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/refine'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='ship_refine')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def refuel_ship(
+        self,
+        shipSymbol: str,
+        body: dict = None
+    ) -> dict:
+        '''
+        Refuel your ship by buying fuel from the local market.
+        
+        Requires the ship to be docked in a waypoint that has the `Marketplace` trait, and the market must be selling fuel in order to refuel.
+        
+        Each fuel bought from the market replenishes 100 units in your ship's fuel.
+        
+        Ships will always be refuel to their frame's maximum fuel capacity when using this action.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json. Default: None
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/refuel'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='refuel_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def create_ship_ship_scan(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Scan for nearby ships, retrieving information for all ships in range.
+        
+        Requires a ship to have the `Sensor Array` mount installed to use.
+        
+        The ship will enter a cooldown after using this function, during which it cannot execute certain actions.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/scan/ships'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='create_ship_ship_scan')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def create_ship_system_scan(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Scan for nearby systems, retrieving information on the systems' distance from the ship and their waypoints. Requires a ship to have the `Sensor Array` mount installed to use.
+        
+        The ship will enter a cooldown after using this function, during which it cannot execute certain actions.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/scan/systems'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='create_ship_system_scan')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def create_ship_waypoint_scan(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Scan for nearby waypoints, retrieving detailed information on each waypoint in range. Scanning uncharted waypoints will allow you to ignore their uncharted state and will list the waypoints' traits.
+        
+        Requires a ship to have the `Sensor Array` mount installed to use.
+        
+        The ship will enter a cooldown after using this function, during which it cannot execute certain actions.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/scan/waypoints'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='create_ship_waypoint_scan')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def sell_cargo(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Sell cargo in your ship to a market that trades this cargo. The ship must be docked in a waypoint that has the `Marketplace` trait in order to use this function.
+
+        Args:
+            shipSymbol (str): Symbol of a ship.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/sell'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='sell_cargo')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def siphon_resources(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Siphon gases, such as hydrocarbon, from gas giants.
+        
+        The ship must be in orbit to be able to siphon and must have siphon mounts and a gas processor installed.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/siphon'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='siphon_resources')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def create_survey(
+        self,
+        shipSymbol: str
+    ) -> dict:
+        '''
+        Create surveys on a waypoint that can be extracted such as asteroid fields. A survey focuses on specific types of deposits from the extracted location. When ships extract using this survey, they are guaranteed to procure a high amount of one of the goods in the survey.
+        
+        In order to use a survey, send the entire survey details in the body of the extract request.
+        
+        Each survey may have multiple deposits, and if a symbol shows up more than once, that indicates a higher chance of extracting that resource.
+        
+        Your ship will enter a cooldown after surveying in which it is unable to perform certain actions. Surveys will eventually expire after a period of time or will be exhausted after being extracted several times based on the survey's size. Multiple ships can use the same survey for extraction.
+        
+        A ship must have the `Surveyor` mount installed in order to use this function.
+
+        Args:
+            shipSymbol (str): The symbol of the ship.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/survey'
+
+        # Make the request
+        response = await self._post(url=url, idempotent=False, operation='create_survey')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def transfer_cargo(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Transfer cargo between ships.
+        
+        The receiving ship must be in the same waypoint as the transferring ship, and it must able to hold the additional cargo after the transfer is complete. Both ships also must be in the same state, either both are docked or both are orbiting.
+        
+        The response body's cargo shows the cargo of the transferring ship after the transfer is complete.
+
+        Args:
+            shipSymbol (str): The transferring ship's symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/transfer'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='transfer_cargo')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def warp_ship(
+        self,
+        shipSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Warp your ship to a target destination in another system. The ship must be in orbit to use this function and must have the `Warp Drive` module installed. Warping will consume the necessary fuel from the ship's manifest.
+        
+        The returned response will detail the route information including the expected time of arrival. Most ship actions are unavailable until the ship has arrived at its destination.
+
+        Args:
+            shipSymbol (str): The ship symbol.
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/my/ships/{shipSymbol}/warp'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='warp_ship')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def register(
+        self,
+        body: dict
+    ) -> dict:
+        '''
+        Creates a new agent and ties it to an account. 
+        The agent symbol must consist of a 3-14 character string, and will be used to represent your agent. This symbol will prefix the symbol of every ship you own. Agent symbols will be cast to all uppercase characters.
+        
+        This new agent will be tied to a starting faction of your choice, which determines your starting location, and will be granted an authorization token, a contract with their starting faction, a command ship that can fly across space with advanced capabilities, a small probe ship that can be used for reconnaissance, and 150,000 credits.
+        
+        > #### Keep your token safe and secure
+        >
+        > Save your token during the alpha phase. There is no way to regenerate this token without starting a new agent. In the future you will be able to generate and manage your tokens from the SpaceTraders website.
+        
+        If you are new to SpaceTraders, It is recommended to register with the COSMIC faction, a faction that is well connected to the rest of the universe. After registering, you should try our interactive [quickstart guide](https://docs.spacetraders.io/quickstart/new-game) which will walk you through basic API requests in just a few minutes.
+
+        Args:
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/register'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='register')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_systems(
+        self,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Return a paginated list of all systems.
+
+        Args:
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/systems'
+
+        # Prepare the parameters
+        params = {
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_systems')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_systems(
+        self,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_systems, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_systems),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def get_system(
+        self,
+        systemSymbol: str = 'X1-OE'
+    ) -> dict:
+        '''
+        Get the details of a system.
+
+        Args:
+            systemSymbol (str): The system symbol. Default: 'X1-OE'
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_system')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_system_waypoints(
+        self,
+        systemSymbol: str,
+        type: str,
+        traits: str,
+        page: int = 1,
+        limit: int = 10
+    ) -> dict:
+        '''
+        Return a paginated list of all of the waypoints for a given system.
+        
+        If a waypoint is uncharted, it will return the `Uncharted` trait instead of its actual traits.
+
+        Args:
+            systemSymbol (str): The system symbol
+            type (str): Filter waypoints by type.
+            traits (str): Filter waypoints by one or more traits.
+            page (int): What entry offset to request. Default: 1. Must be greater than 1.
+            limit (int): How many entries to return per page. Default: 10. Must be between 1 and 20.
+
+        Returns:
+            dict: The response from the server
+        '''
+
+        assert 1 <= page, f'page must be greater than 1.'
+        assert 1 <= limit <= 20, f'limit must be between 1 and 20.'
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints'
+
+        # Prepare the parameters
+        params = {
+            'type': type,
+            'traits': traits,
+            'page': page,
+            'limit': limit,
+        }
+
+        # Make the request
+        response = await self._get(url=url, params=params, idempotent=True, operation='get_system_waypoints')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    def iter_system_waypoints(
+        self,
+        systemSymbol: str,
+        type: str,
+        traits: str,
+        workers: int = 1
+    ) -> typing.AsyncIterator[dict]:
+        '''
+        Iterates over every entry of get_system_waypoints, requesting 20 entries per page.
+        The next pages are fetched while the current one is consumed.
+
+        Args:
+            systemSymbol (str): The system symbol
+            type (str): Filter waypoints by type.
+            traits (str): Filter waypoints by one or more traits.
+            workers (int): How many pages are fetched at the same time. Default: 1
+
+        Returns:
+            AsyncIterator[dict]: The entries of every page
+        '''
+
+        return async_paginate(
+            functools.partial(self.get_system_waypoints, systemSymbol=systemSymbol, type=type, traits=traits),
+            limit=20,
+            workers=workers
+        )
+
+
+    async def get_waypoint(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str
+    ) -> dict:
+        '''
+        View the details of a waypoint.
+        
+        If the waypoint is uncharted, it will return the 'Uncharted' trait instead of its actual traits.
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_waypoint')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_construction(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str
+    ) -> dict:
+        '''
+        Get construction details for a waypoint. Requires a waypoint with a property of `isUnderConstruction` to be true.
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/construction'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_construction')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def supply_construction(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str,
+        body: dict
+    ) -> dict:
+        '''
+        Supply a construction site with the specified good. Requires a waypoint with a property of `isUnderConstruction` to be true.
+        
+        The good must be in your ship's cargo. The good will be removed from your ship's cargo and added to the construction site's materials.
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+            body (dict): The body of the request, sent as json
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/construction/supply'
+
+        # Make the request
+        response = await self._post(url=url, json=body, idempotent=False, operation='supply_construction')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_jump_gate(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str
+    ) -> dict:
+        '''
+        Get jump gate details for a waypoint. Requires a waypoint of type `JUMP_GATE` to use.
+        
+        Waypoints connected to this jump gate can be 
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/jump-gate'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_jump_gate')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_market(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str
+    ) -> dict:
+        '''
+        Retrieve imports, exports and exchange data from a marketplace. Requires a waypoint that has the `Marketplace` trait to use.
+        
+        Send a ship to the waypoint to access trade good prices and recent transactions. Refer to the [Market Overview page](https://docs.spacetraders.io/game-concepts/markets) to gain better a understanding of the market in the game.
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/market'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_market')
+
+        # Check if the request was successful
+        response.raise_for_status()
+
+        # Return the response
+        return response.json()
+
+
+    async def get_shipyard(
+        self,
+        systemSymbol: str,
+        waypointSymbol: str
+    ) -> dict:
+        '''
+        Get the shipyard for a waypoint. Requires a waypoint that has the `Shipyard` trait to use. Send a ship to the waypoint to access data on ships that are currently available for purchase and recent transactions.
+
+        Args:
+            systemSymbol (str): The system symbol
+            waypointSymbol (str): The waypoint symbol
+
+        Returns:
+            dict: The response from the server
+        '''
+
+
+        # Prepare the url
+        url = self.url + f'/systems/{systemSymbol}/waypoints/{waypointSymbol}/shipyard'
+
+        # Make the request
+        response = await self._get(url=url, idempotent=True, operation='get_shipyard')
 
         # Check if the request was successful
         response.raise_for_status()
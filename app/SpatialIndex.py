@@ -0,0 +1,198 @@
+import numpy as np
+import math
+
+
+class SpatialIndex:
+    """ Uniform grid over the coordinates of the systems.
+    The systems are sorted by grid cell, so the systems of a cell are a slice of self.order and
+    a query only looks at the cells it overlaps instead of the whole galaxy.
+
+    Args:
+        symbols (list): The symbols of the systems
+        x (list): The x coordinate of each system
+        y (list): The y coordinate of each system
+        cell_size (float): The side of a grid cell. Default: sized to hold about 4 systems per cell
+    """
+
+    def __init__(self, symbols: list, x: list, y: list, cell_size: float = None) -> None:
+        self.symbols = np.asarray(symbols, dtype=object)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.positions = {symbol: position for position, symbol in enumerate(symbols)}
+
+        # Bounds of the grid, an empty index still gets one cell
+        count = len(self.symbols)
+        self.x_min = self.x.min() if count > 0 else 0.0
+        self.y_min = self.y.min() if count > 0 else 0.0
+        x_max = self.x.max() if count > 0 else 0.0
+        y_max = self.y.max() if count > 0 else 0.0
+
+        if cell_size is None:
+            area = (x_max - self.x_min + 1) * (y_max - self.y_min + 1)
+            cell_size = max(1.0, math.sqrt(area * 4 / max(1, count)))
+
+        self.cell_size = cell_size
+        self.columns = int((x_max - self.x_min) // cell_size) + 1
+        self.rows = int((y_max - self.y_min) // cell_size) + 1
+
+        # Sort the systems by cell and keep where each cell starts
+        cells = self._column(self.x) + self._row(self.y) * self.columns
+        self.order = np.argsort(cells, kind="stable")
+        self.starts = np.searchsorted(cells[self.order], np.arange(self.columns * self.rows + 1))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _column(self, x):
+        return np.clip(((x - self.x_min) // self.cell_size).astype(np.int64), 0, self.columns - 1)
+
+    def _row(self, y):
+        return np.clip(((y - self.y_min) // self.cell_size).astype(np.int64), 0, self.rows - 1)
+
+    def _candidates(self, x_min: float, y_min: float, x_max: float, y_max: float) -> np.ndarray:
+        """ Returns the positions of the systems in the cells overlapping a rectangle
+
+        Args:
+            x_min (float): The left edge of the rectangle
+            y_min (float): The bottom edge of the rectangle
+            x_max (float): The right edge of the rectangle
+            y_max (float): The top edge of the rectangle
+
+        Returns:
+            np.ndarray: The positions of the systems
+        """
+
+        # The rectangle is outside of the grid
+        if x_max < self.x_min or y_max < self.y_min or x_min > self.x_min + self.columns * self.cell_size or y_min > self.y_min + self.rows * self.cell_size:
+            return np.empty(0, dtype=np.int64)
+
+        column_min, column_max = self._column(np.array([x_min, x_max]))
+        row_min, row_max = self._row(np.array([y_min, y_max]))
+
+        # The cells of a row are contiguous, so every row is a single slice
+        slices = [
+            self.order[self.starts[row * self.columns + column_min]:self.starts[row * self.columns + column_max + 1]]
+            for row in range(row_min, row_max + 1)
+        ]
+
+        return np.concatenate(slices)
+
+    def _describe(self, positions: np.ndarray, distances: np.ndarray = None) -> list:
+        """ Converts positions to a list of systems
+
+        Args:
+            positions (np.ndarray): The positions of the systems
+            distances (np.ndarray): The distance of each system from the query point. Default: None
+
+        Returns:
+            list: The systems with their symbol, coordinates and distance
+        """
+
+        systems = list()
+        for x, position in enumerate(positions):
+            system = {
+                "symbol": self.symbols[position],
+                "x": int(self.x[position]),
+                "y": int(self.y[position])
+            }
+
+            if distances is not None:
+                system["distance"] = float(distances[x])
+
+            systems.append(system)
+
+        return systems
+
+    def coordinates(self, symbol: str) -> tuple:
+        """ Returns the coordinates of a system
+
+        Args:
+            symbol (str): The symbol of the system
+
+        Returns:
+            tuple: The x and y coordinates, None if the system is not indexed
+        """
+
+        position = self.positions.get(symbol)
+        if position is None:
+            return None
+
+        return self.x[position], self.y[position]
+
+    def in_area(self, x_min: float, y_min: float, x_max: float, y_max: float) -> list:
+        """ Returns the systems inside a rectangle
+
+        Args:
+            x_min (float): The left edge of the rectangle
+            y_min (float): The bottom edge of the rectangle
+            x_max (float): The right edge of the rectangle
+            y_max (float): The top edge of the rectangle
+
+        Returns:
+            list: The systems inside the rectangle
+        """
+
+        candidates = self._candidates(x_min, y_min, x_max, y_max)
+        x, y = self.x[candidates], self.y[candidates]
+        inside = (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+
+        return self._describe(candidates[inside])
+
+    def _in_radius(self, x: float, y: float, radius: float) -> tuple:
+        """ Returns the positions and distances of the systems within a radius, nearest first
+
+        Args:
+            x (float): The x coordinate of the center
+            y (float): The y coordinate of the center
+            radius (float): The radius
+
+        Returns:
+            tuple: The positions and the distances of the systems
+        """
+
+        candidates = self._candidates(x - radius, y - radius, x + radius, y + radius)
+        distances = np.hypot(self.x[candidates] - x, self.y[candidates] - y)
+
+        inside = distances <= radius
+        candidates, distances = candidates[inside], distances[inside]
+
+        order = np.argsort(distances, kind="stable")
+
+        return candidates[order], distances[order]
+
+    def in_radius(self, x: float, y: float, radius: float) -> list:
+        """ Returns the systems within a radius, nearest first
+
+        Args:
+            x (float): The x coordinate of the center
+            y (float): The y coordinate of the center
+            radius (float): The radius
+
+        Returns:
+            list: The systems within the radius
+        """
+
+        return self._describe(*self._in_radius(x, y, radius))
+
+    def nearest(self, x: float, y: float, count: int) -> list:
+        """ Returns the nearest systems to a point, nearest first
+
+        Args:
+            x (float): The x coordinate of the point
+            y (float): The y coordinate of the point
+            count (int): How many systems to return
+
+        Returns:
+            list: The nearest systems
+        """
+
+        count = min(count, len(self))
+
+        # Grow the radius till it holds enough systems, every system outside it is farther away
+        radius = self.cell_size * max(1.0, math.sqrt(count / 4))
+        while True:
+            positions, distances = self._in_radius(x, y, radius)
+            if len(positions) >= count:
+                return self._describe(positions[:count], distances[:count])
+
+            radius *= 2
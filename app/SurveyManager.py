@@ -0,0 +1,174 @@
+import threading
+import time
+
+import requests
+
+from app.FleetScheduler import parse_timestamp
+
+EXPIRATION_MARGIN = 5  # Seconds before its expiration a survey is dropped, the extraction has to reach the server in time
+
+# Error codes of SpaceTraders meaning the survey can not be used again: invalid signature, expired, exhausted
+SURVEY_ERRORS = {4221, 4222, 4225}
+
+
+class SurveyManager:
+    """ Keeps the surveys of the fleet till they expire or are exhausted, and picks the most valuable one for each extraction.
+    The value of a survey is the average price of its deposits: every deposit is as likely to be extracted,
+    and a good listed twice is twice as likely.
+
+    Args:
+        margin (float): Seconds before its expiration a survey is dropped. Default: EXPIRATION_MARGIN
+    """
+
+    def __init__(self, margin: float = EXPIRATION_MARGIN) -> None:
+        self.margin = margin
+
+        self.surveys = dict()      # Signature: survey
+        self.expirations = dict()  # Signature: seconds since the epoch when the survey expires
+        self.waypoints = dict()    # Waypoint symbol: signatures of its surveys
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.surveys)
+
+    def add(self, surveys: list) -> None:
+        """ Stores some surveys, as returned by create_survey
+
+        Args:
+            surveys (list): The surveys
+        """
+
+        with self.lock:
+            for survey in surveys:
+                self.surveys[survey["signature"]] = survey
+                self.expirations[survey["signature"]] = parse_timestamp(survey["expiration"])
+                self.waypoints.setdefault(survey["symbol"], set()).add(survey["signature"])
+
+    def remove(self, signature: str) -> None:
+        """ Drops a survey, e.g. once it is exhausted
+
+        Args:
+            signature (str): The signature of the survey
+        """
+
+        with self.lock:
+            self._remove(signature)
+
+    def _remove(self, signature: str) -> None:
+        """ Drops a survey, the caller holds the lock
+
+        Args:
+            signature (str): The signature of the survey
+        """
+
+        survey = self.surveys.pop(signature, None)
+        if survey is None:
+            return
+
+        del self.expirations[signature]
+
+        signatures = self.waypoints[survey["symbol"]]
+        signatures.discard(signature)
+        if len(signatures) == 0:
+            del self.waypoints[survey["symbol"]]
+
+    def prune(self, now: float = None) -> int:
+        """ Drops the surveys expiring within the margin
+
+        Args:
+            now (float): The current time in seconds since the epoch. Default: now
+
+        Returns:
+            int: The number of surveys dropped
+        """
+
+        now = time.time() if now is None else now
+
+        with self.lock:
+            expired = [signature for signature, expiration in self.expirations.items() if expiration - self.margin <= now]
+            for signature in expired:
+                self._remove(signature)
+
+        return len(expired)
+
+    def value(self, survey: dict, prices: dict) -> float:
+        """ Returns the expected price of a unit extracted with a survey
+
+        Args:
+            survey (dict): The survey
+            prices (dict): Good symbol: price it sells for, goods without a price are worth nothing
+
+        Returns:
+            float: The average price of the deposits
+        """
+
+        deposits = survey["deposits"]
+        if len(deposits) == 0:
+            return 0.0
+
+        return sum(prices.get(deposit["symbol"], 0) for deposit in deposits) / len(deposits)
+
+    def best(self, waypoint: str, prices: dict) -> dict:
+        """ Returns the most valuable valid survey of a waypoint, dropping the expired ones first
+
+        Args:
+            waypoint (str): The symbol of the waypoint
+            prices (dict): Good symbol: price it sells for
+
+        Returns:
+            dict: The survey, None if the waypoint has no valid survey
+        """
+
+        self.prune()
+
+        with self.lock:
+            surveys = [self.surveys[signature] for signature in self.waypoints.get(waypoint, set())]
+
+        if len(surveys) == 0:
+            return None
+
+        # The survey expiring first wins a tie, the other one can still be used later
+        return max(surveys, key=lambda survey: (self.value(survey, prices), -self.expirations.get(survey["signature"], 0)))
+
+    def extract(self, api, ship: str, waypoint: str, prices: dict) -> dict:
+        """ Extracts resources with the most valuable survey of the waypoint, or without a survey if there is none.
+        A survey refused by the server as invalid, expired or exhausted is dropped and the next one is tried
+
+        Args:
+            api (SpaceTraders): The client
+            ship (str): The symbol of the ship, in orbit of the waypoint
+            waypoint (str): The symbol of the waypoint
+            prices (dict): Good symbol: price it sells for
+
+        Returns:
+            dict: The response from the server
+        """
+
+        while True:
+            survey = self.best(waypoint, prices)
+            if survey is None:
+                return api.extract_resources(ship)
+
+            try:
+                return api.extract_resources_with_survey(ship, body=survey)
+            except requests.HTTPError as error:
+                if self.error_code(error.response) not in SURVEY_ERRORS:
+                    raise
+
+            # The survey can not be used again, try the next one
+            self.remove(survey["signature"])
+
+    def error_code(self, response) -> int:
+        """ Returns the error code of SpaceTraders in a failed response
+
+        Args:
+            response (requests.Response): The response
+
+        Returns:
+            int: The code, None if the body is not an error of SpaceTraders
+        """
+
+        try:
+            return response.json()["error"]["code"]
+        except (ValueError, KeyError, TypeError):
+            return None
@@ -0,0 +1,184 @@
+import numpy as np
+
+from app.RoutePlanner import FLIGHT_MODES, system_symbol
+
+FUEL_PER_UNIT = 100  # Ship fuel refilled by a unit of FUEL bought at a market
+
+
+def flight_costs(distances: np.ndarray, mode: str, engine_speed: int) -> tuple:
+    """ Vectorised flight_cost of RoutePlanner: the fuel and the seconds needed to fly each distance
+
+    Args:
+        distances (np.ndarray): The distances between the waypoints
+        mode (str): The flight mode: BURN, CRUISE, DRIFT
+        engine_speed (int): The speed of the ship's engine
+
+    Returns:
+        tuple: The fuel burnt and the travel time in seconds of each distance
+    """
+
+    multiplier, fuel_rate = FLIGHT_MODES[mode]
+
+    # Orbitals of the same planet share the coordinates and cost no fuel
+    if fuel_rate == 0:
+        fuel = np.where(distances == 0, 0, 1)
+    else:
+        fuel = np.where(distances == 0, 0, np.maximum(1, np.round(distances)) * fuel_rate)
+
+    time = np.round(np.round(np.maximum(1, distances)) * (multiplier / engine_speed) + 15)
+
+    return fuel, time
+
+
+class TradeSolver:
+    """ Finds the most profitable trades between the known markets.
+    The last prices are laid out as goods × markets matrices, the markets sorted by system, and every
+    buy/sell pair of markets of the same system is scored at once: ships only fly between the waypoints of a system.
+    A trade buys at most one trade volume of the good, the prices move past it.
+
+    Args:
+        goods (list): (waypoint, good, purchase price, sell price, trade volume) of each good at each market, see MarketDB.get_prices
+        coordinates (dict): Waypoint symbol: (x, y), markets without coordinates are left out
+    """
+
+    def __init__(self, goods: list, coordinates: dict) -> None:
+        self.coordinates = coordinates
+
+        goods = [row for row in goods if row[0] in coordinates]
+        waypoints, symbols = zip(*[(row[0], row[1]) for row in goods]) if len(goods) > 0 else ([], [])
+
+        self.markets, market_codes = np.unique(np.asarray(waypoints, dtype=str), return_inverse=True)
+        self.goods, good_codes = np.unique(np.asarray(symbols, dtype=str), return_inverse=True)
+
+        # Unknown prices can not be traded: nothing is bought at infinity or sold at -infinity
+        shape = (len(self.goods), len(self.markets))
+        self.purchase = np.full(shape, np.inf)
+        self.sell = np.full(shape, -np.inf)
+        self.volume = np.zeros(shape)
+
+        purchase = np.asarray([np.nan if row[2] is None else row[2] for row in goods], dtype=np.float64)
+        sell = np.asarray([np.nan if row[3] is None else row[3] for row in goods], dtype=np.float64)
+        volume = np.asarray([0 if row[4] is None else row[4] for row in goods], dtype=np.float64)
+
+        self.purchase[good_codes, market_codes] = np.where(np.isnan(purchase), np.inf, purchase)
+        self.sell[good_codes, market_codes] = np.where(np.isnan(sell), -np.inf, sell)
+        self.volume[good_codes, market_codes] = volume
+
+        self.x = np.asarray([coordinates[market][0] for market in self.markets.tolist()], dtype=np.float64)
+        self.y = np.asarray([coordinates[market][1] for market in self.markets.tolist()], dtype=np.float64)
+
+        # The markets are sorted by symbol, so the markets of a system are contiguous
+        self.systems, system_codes, counts = np.unique(
+            np.asarray([system_symbol(market) for market in self.markets.tolist()], dtype=str),
+            return_inverse=True,
+            return_counts=True
+        )
+        starts = np.cumsum(counts) - counts
+
+        # Every (buy, sell) pair of different markets of the same system
+        size = counts[system_codes]
+        buy = np.repeat(np.arange(len(self.markets)), size)
+        sell_offset = np.arange(len(buy)) - np.repeat(np.cumsum(size) - size, size)
+        sell = starts[system_codes[buy]] + sell_offset
+
+        self.buy_markets = buy[buy != sell]
+        self.sell_markets = sell[buy != sell]
+        self.system_codes = system_codes
+        self.distances = np.hypot(self.x[self.sell_markets] - self.x[self.buy_markets], self.y[self.sell_markets] - self.y[self.buy_markets])
+
+        # Refuelling is paid at the usual price
+        self.fuel_price = self.median_price("FUEL")
+
+    def __len__(self) -> int:
+        return len(self.markets)
+
+    def median_price(self, good: str) -> float:
+        """ Returns the median purchase price of a good across the markets
+
+        Args:
+            good (str): The symbol of the good
+
+        Returns:
+            float: The median price, 0 if the good is not sold anywhere
+        """
+
+        position = np.searchsorted(self.goods, good)
+        if position == len(self.goods) or self.goods[position] != good:
+            return 0.0
+
+        prices = self.purchase[position]
+        prices = prices[np.isfinite(prices)]
+
+        return float(np.median(prices)) if len(prices) > 0 else 0.0
+
+    def routes(self, origin: str, cargo_capacity: int, engine_speed: int = 30, fuel_capacity: int = 0, mode: str = "CRUISE", count: int = 10, position: tuple = None) -> list:
+        """ Returns the trades with the most profit per second for a ship: fly to the buy market, buy a good, fly to the sell market and sell it.
+        Every pair of markets of the system of the ship is scored in one pass over the matrices
+
+        Args:
+            origin (str): The symbol of the waypoint of the ship
+            cargo_capacity (int): The cargo capacity of the ship
+            engine_speed (int): The speed of the ship's engine. Default: 30
+            fuel_capacity (int): The fuel capacity of the ship, 0 if it does not use fuel. Default: 0
+            mode (str): The flight mode: BURN, CRUISE, DRIFT. Default: CRUISE
+            count (int): How many trades to return. Default: 10
+            position (tuple): The (x, y) of the ship, for an origin that is not a market. Default: the coordinates of the origin
+
+        Returns:
+            list: The trades, the most profit per second first. Only trades with a profit are returned
+        """
+
+        system = np.searchsorted(self.systems, system_symbol(origin))
+        if system == len(self.systems) or self.systems[system] != system_symbol(origin):
+            return list()
+
+        pairs = np.flatnonzero(self.system_codes[self.buy_markets] == system)
+        buy, sell = self.buy_markets[pairs], self.sell_markets[pairs]
+
+        # Leg from the ship to the buy market, free if the position of the ship is not known
+        if position is None:
+            position = self.coordinates.get(origin, (self.x[buy], self.y[buy]))
+        origin_x, origin_y = position
+
+        approach_fuel, approach_time = flight_costs(np.hypot(self.x[buy] - origin_x, self.y[buy] - origin_y), mode, engine_speed)
+        trade_fuel, trade_time = flight_costs(self.distances[pairs], mode, engine_speed)
+
+        # Profit of every good on every pair: goods × pairs
+        margin = self.sell[:, sell] - self.purchase[:, buy]
+        units = np.minimum(cargo_capacity, np.minimum(self.volume[:, buy], self.volume[:, sell]))
+        with np.errstate(invalid="ignore"):
+            profit = np.where(np.isfinite(margin), margin * units, -np.inf)
+
+        best = np.argmax(profit, axis=0)
+        columns = np.arange(len(pairs))
+        fuel = approach_fuel + trade_fuel
+        net = profit[best, columns] - fuel * self.fuel_price / FUEL_PER_UNIT
+        duration = approach_time + trade_time
+        rate = net / duration
+
+        # A ship that uses fuel can not fly a leg longer than its tank
+        feasible = net > 0
+        if fuel_capacity > 0:
+            feasible &= (approach_fuel <= fuel_capacity) & (trade_fuel <= fuel_capacity)
+
+        candidates = np.flatnonzero(feasible)
+        if len(candidates) > count:
+            candidates = candidates[np.argpartition(-rate[candidates], count - 1)[:count]]
+        candidates = candidates[np.argsort(-rate[candidates], kind="stable")]
+
+        return [
+            {
+                "good": str(self.goods[best[i]]),
+                "buy": str(self.markets[buy[i]]),
+                "sell": str(self.markets[sell[i]]),
+                "units": int(units[best[i], i]),
+                "purchase_price": float(self.purchase[best[i], buy[i]]),
+                "sell_price": float(self.sell[best[i], sell[i]]),
+                "fuel": int(fuel[i]),
+                "profit": float(net[i]),
+                "seconds": float(duration[i]),
+                "profit_per_second": float(rate[i])
+            }
+            for i in candidates.tolist()
+        ]
+
@@ -0,0 +1,154 @@
+import threading
+
+import app.GalaxyDB as GalaxyDB
+
+
+class WaypointIndex:
+    """ In-memory copy of the inverted index of the traits, so a search intersects sets instead of querying the database.
+    Only the waypoints of the indexed systems are kept, the indexer adds the systems as it goes.
+
+    Args:
+        waypoints (list): (symbol, system, type, x, y) of each waypoint of the indexed systems
+        traits (list): (trait, waypoint) of each trait
+    """
+
+    def __init__(self, waypoints: list, traits: list) -> None:
+        self.waypoints = dict()  # Waypoint symbol: (symbol, system, type, x, y)
+        self.systems = dict()    # System symbol: symbols of its waypoints
+        self.traits = dict()     # Trait: symbols of the waypoints having it
+        self.lock = threading.Lock()
+
+        for row in waypoints:
+            self.waypoints[row[0]] = row
+            self.systems.setdefault(row[1], set()).add(row[0])
+
+        for trait, waypoint in traits:
+            self.traits.setdefault(trait, set()).add(waypoint)
+
+    def add_system(self, system: str, waypoints: list) -> None:
+        """ Replaces the waypoints of a system, as returned by get_system_waypoints
+
+        Args:
+            system (str): The symbol of the system
+            waypoints (list): The waypoints of the system
+        """
+
+        with self.lock:
+            # Forget the waypoints indexed before
+            for symbol in self.systems.pop(system, set()):
+                del self.waypoints[symbol]
+                for symbols in self.traits.values():
+                    symbols.discard(symbol)
+
+            for waypoint in waypoints:
+                self.waypoints[waypoint["symbol"]] = (waypoint["symbol"], system, waypoint["type"], waypoint["x"], waypoint["y"])
+                self.systems.setdefault(system, set()).add(waypoint["symbol"])
+
+                for trait in waypoint.get("traits", []):
+                    self.traits.setdefault(trait["symbol"], set()).add(waypoint["symbol"])
+
+    def find(self, traits: list, types: list = None) -> list:
+        """ Returns the waypoints having every trait and one of the types
+
+        Args:
+            traits (list): The traits the waypoints must all have
+            types (list): The types the waypoints can be of. Default: None
+
+        Returns:
+            list: (symbol, system, type, x, y) of each waypoint
+        """
+
+        with self.lock:
+            # Start from the rarest trait, the intersection only gets smaller
+            matches = sorted((self.traits.get(trait, set()) for trait in set(traits)), key=len)
+            if len(matches) == 0:
+                return list()
+
+            symbols = matches[0].intersection(*matches[1:])
+            rows = [self.waypoints[symbol] for symbol in symbols]
+
+        if types:
+            types = set(types)
+            rows = [row for row in rows if row[2] in types]
+
+        return rows
+
+
+class WaypointIndexer:
+    """ Pages through the waypoints of the known systems in the background and stores their traits in the
+    inverted index of the galaxy database, so the searches across the galaxy make no API calls.
+    The systems already indexed are skipped, so a restart resumes where the last run stopped.
+
+    Args:
+        api (SpaceTraders): The client, its rate limiter sets the pace
+        systems (list): The symbols of the systems to index, in order, e.g. nearest to the headquarters first
+        listener (callable): Called with the symbol and the waypoints of every system indexed, e.g. to update the copies in memory. Default: None
+        interval (float): Seconds to wait between two systems, to leave part of the rate limit to everything else. Default: 1
+        path (str): The path of the galaxy database. Default: data/galaxy.db
+    """
+
+    def __init__(self, api, systems: list, listener=None, interval: float = 1, path: str = GalaxyDB.GALAXY_DB_PATH) -> None:
+        self.api = api
+        self.systems = systems
+        self.listener = listener
+        self.interval = interval
+        self.path = path
+
+        self.indexed = 0   # Systems indexed by this run
+        self.failed = 0    # Systems that failed, they are tried again by the next run
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        """Indexes the systems till every one is done or stop is called. Run it in its own thread."""
+
+        # A connection of its own, only used by this thread: the writes do not get mixed with the transactions
+        # of the web app, and the shared connection is only read by the listener under Model.GALAXY_LOCK
+        connection = GalaxyDB.connect(self.path)
+        done = GalaxyDB.get_indexed_systems(connection)
+
+        try:
+            for system in self.systems:
+                if self.stopped.is_set():
+                    break
+
+                if system in done:
+                    continue
+
+                try:
+                    waypoints = list(self.api.iter_system_waypoints(
+                        systemSymbol=system,
+                        type=None,
+                        traits=None
+                    ))
+                except Exception:
+                    self.failed += 1
+                    continue
+
+                GalaxyDB.insert_waypoint_traits(connection, system, waypoints)
+                if self.listener is not None:
+                    self.listener(system, waypoints)
+                self.indexed += 1
+
+                self.stopped.wait(self.interval)
+        finally:
+            connection.close()
+            self.stopped.set()
+
+    def stop(self) -> None:
+        """Stops the indexer after the system it is indexing."""
+
+        self.stopped.set()
+
+    def stats(self) -> dict:
+        """ Returns the progress of the indexer
+
+        Returns:
+            dict: The systems to index, and how many were indexed and failed in this run
+        """
+
+        return {
+            "systems": len(self.systems),
+            "indexed": self.indexed,
+            "failed": self.failed,
+            "running": not self.stopped.is_set()
+        }
@@ -3,72 +3,77 @@ function numberWithCommas(x) {
   return x.toString().replace(/\B(?=(\d{3})+(?!\d))/g, ",");
 }
 
-// Fill contract tables
-function fill_contract_table(contracts){
+// Build the row of a contract and the table it belongs to
+function contract_row(contract){
   var table_id = "";
 
+  // Determine table
+  if (contract.accepted === false){
+    table_id = "#av_contracts";
+  }else{
+    table_id = "#ac_contracts";
+  }
+
+  console.log(contract, table_id);
+
+  // Cycle through actions (deliveries)
+  var actions = "";
+  for (var j = 0; j < contract.terms.deliver.length; j++){
+    var units = contract.terms.deliver[j].unitsRequired;
+    var trade_symbol = contract.terms.deliver[j].tradeSymbol;
+    var trade_dest = contract.terms.deliver[j].destinationSymbol;
+    actions += `${units}x ${trade_symbol} on ${trade_dest}<br>`;
+  }
+
+  // Calculate ETAs
+  var expire_at = moment(contract.deadlineToAccept);
+  var deadline = moment(contract.terms.deadline)
+  var eta_expire = expire_at.fromNow();
+  var eta_deadline = deadline.fromNow();
+
+  var table_row = "";
+
+  if (table_id === "#av_contracts"){
+    table_row = `
+      <tr id="contract_${contract.id}">
+        <td class='left aligned'>${contract.factionSymbol}</td>
+        <td>${contract.type}</td>
+        <td>${eta_expire}</td>
+        <td>${eta_deadline}</td>
+        <td>${actions}</td>
+        <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onAccepted)}</td>
+        <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onFulfilled)}</td>
+        <td><button type="button" class="btn btn-success" onclick='accept_contract("${contract.id}")'>Accept</button></td>
+      </tr>
+    `;
+  }else{
+    table_row = `
+      <tr id="contract_${contract.id}">
+        <td class='left aligned'>${contract.factionSymbol}</td>
+        <td>${contract.type}</td>
+        <td>${eta_deadline}</td>
+        <td>${actions}</td>
+        <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onFulfilled)}</td>
+      </tr>
+    `;
+  }
+
+  return {table_id: table_id, html: table_row};
+}
+
+// Fill contract tables
+function fill_contract_table(contracts){
   // Clear tables
   $("#av_contracts").empty();
   $("#ac_contracts").empty();
 
   // Fill tables
   for (var i = 0; i < contracts.length; i++){
-    var contract = contracts[i];
-
-    // Determine table
-    if (contract.accepted === false){
-      table_id = "#av_contracts";
-    }else{
-      table_id = "#ac_contracts";
-    }
-
-    console.log(contract, table_id);
-
-    // Cycle through actions (deliveries)
-    var actions = "";
-    for (var j = 0; j < contract.terms.deliver.length; j++){
-      var units = contract.terms.deliver[j].unitsRequired;
-      var trade_symbol = contract.terms.deliver[j].tradeSymbol;
-      var trade_dest = contract.terms.deliver[j].destinationSymbol;
-      actions += `${units}x ${trade_symbol} on ${trade_dest}<br>`;
-    }
-
-    // Calculate ETAs
-    var expire_at = moment(contract.deadlineToAccept);
-    var deadline = moment(contract.terms.deadline)
-    var eta_expire = expire_at.fromNow();
-    var eta_deadline = deadline.fromNow();
-
-    var table_row = "";
-
-    if (table_id === "#av_contracts"){
-      table_row = `
-        <tr>
-          <td class='left aligned'>${contract.factionSymbol}</td>
-          <td>${contract.type}</td>
-          <td>${eta_expire}</td>
-          <td>${eta_deadline}</td>
-          <td>${actions}</td>
-          <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onAccepted)}</td>
-          <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onFulfilled)}</td>
-          <td><button type="button" class="btn btn-success" onclick='accept_contract("${contract.id}")'>Accept</button></td>
-        </tr>
-      `;
-    }else{
-      table_row = `
-        <tr>
-          <td class='left aligned'>${contract.factionSymbol}</td>
-          <td>${contract.type}</td>
-          <td>${eta_deadline}</td>
-          <td>${actions}</td>
-          <td><i class="bi bi-currency-dollar"></i>${numberWithCommas(contract.terms.payment.onFulfilled)}</td>
-        </tr>
-      `;
-    }
+    var row = contract_row(contracts[i]);
 
     // Append to table
-    $(table_id).append(
-      table_row
+    $(row.table_id).append(
+      row.html
     )
 
   }
@@ -115,27 +120,141 @@ function get_contracts(){
 }
 
 function accept_contract(contract_id){
+  // The server pushes the changed contract, no need to fetch them all again
   socket.emit("accept_contract", contract_id, (response) => {
     console.log(response);
-    get_contracts();
   });
 }
 
+// Live updates: the server sends the full state on subscribe, then only what changed.
+// The server forgets the topics of a client that disconnects, so they are subscribed again on every connect
+var subscriptions = {};
+
+function subscribe(topic, callback){
+  subscriptions[topic] = callback;
+
+  if (socket.connected){
+    socket.emit("subscribe", topic, callback);
+  }
+}
+
+// Update only the rows of the contracts that changed
+function apply_contracts_delta(delta){
+  for (var i = 0; i < delta.removed.length; i++){
+    $("#contract_" + delta.removed[i]).remove();
+  }
+
+  for (var contract_id in delta.changed){
+    var row = contract_row(delta.changed[contract_id]);
+    var current_row = $("#contract_" + contract_id);
+
+    // Replace the row in place, or move it if the contract changed table
+    if (current_row.length > 0 && current_row.parent().is(row.table_id)){
+      current_row.replaceWith(row.html);
+    }else{
+      current_row.remove();
+      $(row.table_id).append(row.html);
+    }
+  }
+}
+
+// Update the agent in the navbar
+function apply_agent_delta(delta){
+  var agent = delta.changed.agent;
+  if (agent === undefined){
+    return;
+  }
+
+  $("#agent_credits").text(numberWithCommas(agent.credits));
+  $("#agent_ship_count").text(agent.shipCount);
+}
+
+// Build the row of a ship: where it is, its fuel and its cooldown
+function ship_row(symbol, ship){
+  var status = ship.nav.status;
+  if (status === "IN_TRANSIT"){
+    status += ", arrives " + moment(ship.nav.route.arrival).fromNow();
+  }
+
+  var cooldown = "Ready";
+  if (ship.cooldown.expiration !== undefined && moment(ship.cooldown.expiration).isAfter(moment())){
+    cooldown = "Ready " + moment(ship.cooldown.expiration).fromNow();
+  }
+
+  return `
+    <tr id="ship_${symbol}">
+      <td class='left aligned'>${symbol}</td>
+      <td>${status}</td>
+      <td>${ship.nav.waypointSymbol}</td>
+      <td>${ship.nav.flightMode}</td>
+      <td>${ship.fuel.current}/${ship.fuel.capacity}</td>
+      <td>${cooldown}</td>
+    </tr>
+  `;
+}
+
+// Fill the fleet table
+function fill_ship_table(ships){
+  $("#ships").empty();
+
+  for (var symbol in ships){
+    $("#ships").append(ship_row(symbol, ships[symbol]));
+  }
+}
+
+// Update only the rows of the ships that moved, refuelled or started a cooldown
+function apply_ships_delta(delta){
+  for (var i = 0; i < delta.removed.length; i++){
+    $("#ship_" + delta.removed[i]).remove();
+  }
+
+  for (var symbol in delta.changed){
+    var row = ship_row(symbol, delta.changed[symbol]);
+    var current_row = $("#ship_" + symbol);
+
+    if (current_row.length > 0){
+      current_row.replaceWith(row);
+    }else{
+      $("#ships").append(row);
+    }
+  }
+}
+
+socket.on("contracts_delta", apply_contracts_delta);
+socket.on("agent_delta", apply_agent_delta);
+socket.on("ships_delta", apply_ships_delta);
+
+socket.on("connect", function() {
+  for (var topic in subscriptions){
+    socket.emit("subscribe", topic, subscriptions[topic]);
+  }
+});
+
+subscribe("agent", (state) => {});
+
 function get_waypoints(){
   var trait = $("#trait").val();
   var system = $("#system").val();
 
   // Check if parameters are empty
-  if (trait === "" || system === ""){
+  if (trait === ""){
     $("#search_waypoint_card").append(`
     <div class="alert alert-warning alert-dismissible fade show" role="alert">
-      <strong>Warning!</strong> You must enter a trait and system.
+      <strong>Warning!</strong> You must enter a trait.
       <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
     </div>
     `);
     return;
   }
 
+  // Without a system the whole galaxy is searched in the local index, nearest to the headquarters first
+  if (system === ""){
+    socket.emit("search_waypoints", trait.split("+").map((t) => t.trim()), (waypoints) => {
+      console.log(waypoints);
+    });
+    return;
+  }
+
   socket.emit("get_waypoints", trait, system, (waypoints) => {
     console.log(waypoints);
   });
@@ -1,7 +1,9 @@
-from flask import Flask, render_template
-from flask_socketio import SocketIO, send
+from flask import Flask, render_template, request
+from flask_socketio import SocketIO, send, join_room
 import app.Model as Model
+from app.LiveUpdates import LiveUpdates
 from icecream import ic as print
+import argparse
 
 app = Flask(
     __name__,
@@ -11,6 +13,18 @@ app = Flask(
 app.config["SECRET_KEY"] = ""
 socketio = SocketIO(app)
 
+# Polls SpaceTraders once for every subscribed client and pushes the changes
+live_updates = LiveUpdates(
+    sources={
+        "agent": lambda: {"agent": Model.get_agent(force_update=True)},
+        "contracts": lambda: {contract["id"]: contract for contract in Model.get_contracts(force_update=True)},
+        # Served by the local copy of the fleet, kept current by the responses of the ship actions
+        "ships": lambda: Model.get_ship_states()
+    },
+    emit=socketio.emit,
+    sleep=socketio.sleep
+)
+
 @app.route("/")
 def index():
     response = Model.get_agent()
@@ -24,6 +38,25 @@ def waypoints():
     systems = Model.get_systems()
     return render_template("waypoints.html", agent=response, systems=systems)
 
+@app.route("/metrics")
+def metrics():
+    return Model.get_metrics()
+
+@socketio.on("subscribe")
+def subscribe_handler(topic: str):
+    # Only the topics polled by live_updates have a room
+    if topic not in live_updates.sources:
+        return {"error": f"Unknown topic: {topic}"}
+
+    join_room(topic)
+    state = live_updates.subscribe(request.sid, topic)
+
+    return state
+
+@socketio.on("disconnect")
+def disconnect_handler():
+    live_updates.unsubscribe(request.sid)
+
 @socketio.on("get_contracts")
 def get_contracts_handler():
     available_contracts = Model.get_contracts()
@@ -34,14 +67,53 @@ def get_contracts_handler():
 def accept_contracts_handler(contract_id: str):
     accepted_contract = Model.accept_contract(contract_id)
     print(accepted_contract)
+
+    # Push the accepted contract and the upfront payment to every dashboard
+    live_updates.poll("contracts")
+    live_updates.poll("agent")
     return accepted_contract
 
+@socketio.on("get_cache_stats")
+def cache_stats_handler():
+    stats = Model.get_cache_stats()
+
+    return stats
+
 @socketio.on("get_galaxy_data")
 def galaxy_handler():
     galaxy = Model.get_galaxy_data()
 
     return galaxy
 
+@socketio.on("get_nearest_systems")
+def nearest_systems_handler(system: str, count: int):
+    systems = Model.get_nearest_systems(
+        system=system,
+        count=count
+    )
+
+    return systems
+
+@socketio.on("get_systems_in_radius")
+def systems_in_radius_handler(system: str, radius: float):
+    systems = Model.get_systems_in_radius(
+        system=system,
+        radius=radius
+    )
+
+    return systems
+
+@socketio.on("get_systems_in_area")
+def systems_in_area_handler(x_min: int, y_min: int, x_max: int, y_max: int):
+    systems = Model.get_systems_in_area(
+        x_min=x_min,
+        y_min=y_min,
+        x_max=x_max,
+        y_max=y_max
+    )
+
+    return systems
+
 @socketio.on("get_waypoints")
 def get_waypoints(trait: str, system: str):
     waypoints = Model.get_waypoints(
@@ -53,6 +125,36 @@ def get_waypoints(trait: str, system: str):
 
     return waypoints
 
+@socketio.on("search_waypoints")
+def search_waypoints_handler(traits: list, types: list = None, origin: str = None):
+    waypoints = Model.search_waypoints(
+        traits=traits,
+        types=types,
+        origin=origin
+    )
+
+    return waypoints
+
+@socketio.on("get_trade_routes")
+def trade_routes_handler(ship: str, count: int = 10):
+    routes = Model.get_trade_routes(
+        ship=ship,
+        count=count
+    )
+
+    return routes
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--index-waypoints",
+        action="store_true",
+        help="Index the waypoint traits of every system in the background, it takes part of the rate limit"
+    )
+    args = parser.parse_args()
+
     Model.init()
+    if args.index_waypoints:
+        Model.start_waypoint_indexer()
+    socketio.start_background_task(live_updates.run)
     app.run(host="0.0.0.0")
\ No newline at end of file
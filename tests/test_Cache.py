@@ -0,0 +1,68 @@
+import collections
+import threading
+import time
+import unittest
+
+from app.Cache import TTLCache
+
+
+class InvalidatingGenerations(collections.Counter):
+    """ Generations of a TTLCache that start an invalidate on another thread when they are read after the fetch,
+    so the invalidate tries to run between the check of the generation and the store of the value
+    """
+
+    def __init__(self, cache: TTLCache, endpoint: str) -> None:
+        super().__init__()
+        self.cache = cache
+        self.endpoint = endpoint
+        self.fetched = threading.Event()
+        self.thread = None
+
+    def __getitem__(self, endpoint: str) -> int:
+        value = super().__getitem__(endpoint)
+
+        if self.fetched.is_set() and self.thread is None:
+            self.thread = threading.Thread(target=self.cache.invalidate, args=(self.endpoint,))
+            self.thread.start()
+
+            # Give the invalidate the time to run if nothing holds it back
+            time.sleep(0.1)
+
+        return value
+
+
+class TestInvalidate(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cache = TTLCache(ttls={"agent": 60}, stale_ttls={"agent": 60})
+        self.generations = self.cache.generations = InvalidatingGenerations(self.cache, "agent")
+
+    def fetch(self) -> str:
+        self.generations.fetched.set()
+        return "before the invalidate"
+
+    def test_miss_is_not_stored_after_invalidate(self) -> None:
+        self.assertEqual(self.cache.get_or_set("agent", (), self.fetch), "before the invalidate")
+        self.generations.thread.join()
+
+        self.assertEqual(self.cache.get("agent"), (False, None))
+
+    def test_refresh_is_not_stored_after_invalidate(self) -> None:
+        # An expired entry still within the stale time to live is refreshed in the background
+        self.cache.set("agent", (), "old")
+        key = ("agent", ())
+        value, expiration, stale_expiration = self.cache.entries[key]
+        self.cache.entries[key] = (value, time.monotonic() - 1, stale_expiration)
+
+        self.assertEqual(self.cache.get_or_set("agent", (), self.fetch), "old")
+
+        # Wait for the refresh
+        while key in self.cache.refreshing:
+            time.sleep(0.01)
+        self.generations.thread.join()
+
+        self.assertEqual(self.cache.get("agent"), (False, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,321 @@
+import os
+TOOLS_PATH = os.path.join(os.getcwd(), "tools")
+
+import sys
+sys.path.insert(1, os.getcwd())
+sys.path.insert(1, TOOLS_PATH)
+
+import app.SpaceTradersAPI as SpaceTradersAPI
+import app.Model as Model
+import MockServer
+from werkzeug.serving import make_server
+import asyncio
+import datetime
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+
+SOURCE_PATH = os.path.join("tools", "source.json")
+BENCHMARK_PATH = os.path.join("data", "benchmarks")  # One result file per run, named after the commit
+
+CLIENT_CALLS = 500                       # Calls made by each client benchmark
+GALAXY_SIZES = [1000, 10000, 100000]     # Systems in the generated galaxies
+WAYPOINTS_PER_SYSTEM = 5
+REPEAT = 50                              # Calls timed by each latency benchmark
+SYSTEM_TYPES = ["NEUTRON_STAR", "RED_STAR", "ORANGE_STAR", "BLUE_STAR", "YOUNG_STAR", "WHITE_DWARF", "BLACK_HOLE", "HYPERGIANT", "NEBULA", "UNSTABLE"]
+
+
+def latency(function, repeat: int = REPEAT) -> dict:
+    """ Calls a function several times and summarizes how long the calls took
+
+    Args:
+        function (callable): The function to time
+        repeat (int): How many times to call it. Default: REPEAT
+
+    Returns:
+        dict: The number of calls and the mean, median, 95th percentile and max latency in milliseconds
+    """
+
+    times = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    return {
+        "calls": repeat,
+        "mean_ms": statistics.mean(times),
+        "p50_ms": times[len(times) // 2],
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "max_ms": times[-1]
+    }
+
+
+def start_mock_server(**kwargs) -> tuple:
+    """ Starts the mock server in a background thread on a free port
+
+    Args:
+        **kwargs: The options of MockServer
+
+    Returns:
+        tuple: The http server, to shut it down, and the url to point the clients to
+    """
+
+    spec = MockServer.read_json(SOURCE_PATH)
+    mock = MockServer.MockServer(spec, **kwargs)
+
+    server = make_server("127.0.0.1", 0, mock.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    prefix = spec["servers"][0]["url"].split("://", 1)[-1].partition("/")[2]
+    return server, f"http://127.0.0.1:{server.server_port}/{prefix}".rstrip("/")
+
+
+def unlimited_rate_limiter() -> SpaceTradersAPI.RateLimiter:
+    """ Returns a rate limiter that never waits, so the benchmarks measure the client and not the rate limit
+
+    Returns:
+        RateLimiter: The rate limiter
+    """
+
+    return SpaceTradersAPI.RateLimiter(rate=1e9, burst=10 ** 9, burst_time=1)
+
+
+def bench_client(url: str, calls: int = CLIENT_CALLS) -> dict:
+    """ Measures the calls per second of the synchronous client and of the pooled asynchronous one
+
+    Args:
+        url (str): The url of the mock server
+        calls (int): How many calls each client makes. Default: CLIENT_CALLS
+
+    Returns:
+        dict: The calls per second of each client
+    """
+
+    results = dict()
+
+    # One call after the other on a single session
+    api = SpaceTradersAPI.SpaceTraders("benchmark", rate_limiter=unlimited_rate_limiter())
+    api.url = url
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        api.get_my_agent()
+    results["sync_calls_per_second"] = calls / (time.perf_counter() - start)
+
+    # Every call at once over the pooled connections
+    if SpaceTradersAPI.aiohttp is not None:
+        async def run() -> float:
+            async with SpaceTradersAPI.AsyncSpaceTraders("benchmark", rate_limiter=unlimited_rate_limiter()) as async_api:
+                async_api.url = url
+
+                start = time.perf_counter()
+                await asyncio.gather(*[async_api.get_my_agent() for _ in range(calls)])
+                return time.perf_counter() - start
+
+        results["pooled_calls_per_second"] = calls / asyncio.run(run())
+
+    return results
+
+
+def write_galaxy(path: str, size: int) -> None:
+    """ Writes a random galaxy file, in the format of DownloadGalaxy
+
+    Args:
+        path (str): The path of the galaxy file
+        size (int): How many systems the galaxy has
+    """
+
+    generator = random.Random(size)
+
+    with open(path, "w") as f:
+        f.write("[\n")
+        for i in range(size):
+            x, y = generator.randint(-50000, 50000), generator.randint(-50000, 50000)
+            system = {
+                "symbol": f"X1-S{i}",
+                "sectorSymbol": "X1",
+                "type": generator.choice(SYSTEM_TYPES),
+                "x": x,
+                "y": y,
+                "waypoints": [
+                    {"symbol": f"X1-S{i}-W{j}", "type": "PLANET", "x": x + j, "y": y - j}
+                    for j in range(WAYPOINTS_PER_SYSTEM)
+                ],
+                "factions": []
+            }
+            f.write(("," if i > 0 else "") + json.dumps(system) + "\n")
+        f.write("]\n")
+
+
+def reset_galaxy() -> None:
+    """Closes the galaxy database of the Model, so the next call opens it again."""
+
+    if Model.GALAXY_DB is not None:
+        Model.GALAXY_DB.close()
+
+    Model.GALAXY_DB = None
+    Model.GALAXY_COLUMNS = None
+    Model.SPATIAL_INDEX = None
+
+
+def bench_galaxy(sizes: list = GALAXY_SIZES) -> dict:
+    """ Measures the cold start of load_galaxy_data and the latency of the galaxy accessors as the galaxy grows.
+    Each size runs in its own temporary folder, the paths of the Model are relative to the working directory
+
+    Args:
+        sizes (list): The numbers of systems. Default: GALAXY_SIZES
+
+    Returns:
+        dict: The results by number of systems
+    """
+
+    results = dict()
+    cwd = os.getcwd()
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            os.chdir(folder)
+            try:
+                os.makedirs("data")
+                write_galaxy(Model.GALAXY_JSON_PATH, size)
+                reset_galaxy()
+
+                # Cold start: the galaxy file is imported into a new database.
+                # The memory is measured by a second import, tracing the allocations slows it down
+                start = time.perf_counter()
+                Model.load_galaxy_data()
+                cold_start = time.perf_counter() - start
+
+                reset_galaxy()
+                os.remove(Model.GalaxyDB.GALAXY_DB_PATH)
+
+                tracemalloc.start()
+                Model.load_galaxy_data()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+                # The columnar copy read by the accessors
+                start = time.perf_counter()
+                Model.load_galaxy_columns()
+                columns_load = time.perf_counter() - start
+                columns_size = sum(value.nbytes for value in vars(Model.GALAXY_COLUMNS).values() if hasattr(value, "nbytes"))
+
+                results[str(size)] = {
+                    "load_galaxy_data_cold_s": cold_start,
+                    "load_galaxy_data_peak_mb": peak / 2 ** 20,
+                    "load_galaxy_columns_s": columns_load,
+                    "galaxy_columns_mb": columns_size / 2 ** 20,
+                    "get_galaxy_data": latency(Model.get_galaxy_data),
+                    "get_systems": latency(Model.get_systems, repeat=max(5, REPEAT * 1000 // size))
+                }
+            finally:
+                reset_galaxy()
+                os.chdir(cwd)
+
+    return results
+
+
+def bench_socketio(url: str, size: int = GALAXY_SIZES[0]) -> dict:
+    """ Measures the latency of the Socket.IO handlers, from the emit of the client to its acknowledgement
+
+    Args:
+        url (str): The url of the mock server
+        size (int): How many systems the galaxy has. Default: GALAXY_SIZES[0]
+
+    Returns:
+        dict: The results by event
+    """
+
+    import main
+
+    Model.API = SpaceTradersAPI.SpaceTraders("benchmark", rate_limiter=unlimited_rate_limiter())
+    Model.API.url = url
+
+    results = dict()
+    cwd = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            os.makedirs("data")
+            write_galaxy(Model.GALAXY_JSON_PATH, size)
+            reset_galaxy()
+            Model.load_spatial_index()
+
+            client = main.socketio.test_client(main.app)
+
+            events = {
+                "get_galaxy_data": (),
+                "get_nearest_systems": ("X1-S0", 10),
+                "get_systems_in_radius": ("X1-S0", 5000),
+                "get_contracts": (),
+                "get_cache_stats": ()
+            }
+
+            for event, args in events.items():
+                results[event] = latency(lambda: client.emit(event, *args, callback=True))
+
+            # Served by the mock server every time
+            results["get_contracts_uncached"] = latency(lambda: (Model.CACHE.invalidate("contracts"), client.emit("get_contracts", callback=True)))
+
+            client.disconnect()
+        finally:
+            reset_galaxy()
+            os.chdir(cwd)
+
+    return results
+
+
+def commit() -> str:
+    """ Returns the commit the benchmark runs on
+
+    Returns:
+        str: The hash of the commit, unknown outside a git repository
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks() -> dict:
+    """ Runs every benchmark against a local mock server and saves the results
+
+    Returns:
+        dict: The results
+    """
+
+    # No rate limit, no latency: the numbers are the cost of the code
+    server, url = start_mock_server(rate=0)
+
+    try:
+        results = {
+            "commit": commit(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "client": bench_client(url),
+            "galaxy": bench_galaxy(),
+            "socketio": bench_socketio(url)
+        }
+    finally:
+        server.shutdown()
+
+    os.makedirs(BENCHMARK_PATH, exist_ok=True)
+    path = os.path.join(BENCHMARK_PATH, f"{results['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=4)
+
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run_benchmarks(), indent=4))
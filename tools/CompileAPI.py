@@ -24,6 +24,9 @@ from icecream import ic as print
 
 space_traders_api_file = open("app/SpaceTradersAPI.py", "w")
 
+# Actions other than get that can safely be sent twice, the server documents them as idempotent
+IDEMPOTENT_OPERATIONS = ["dock_ship", "orbit_ship", "patch_ship_nav"]
+
 
 def read_json(file: str) -> dict:
     """ Reads a json file and returns the data as a dict
@@ -50,6 +53,367 @@ def write_line(line: str) -> None:
     space_traders_api_file.write(f"{line}\n")
 
 
+def write_rate_limiter() -> None:
+    """ Writes the RateLimiter class to the SpaceTradersAPI.py file.
+    The limits match the ones published by SpaceTraders: 2 requests per second plus a burst of 30 requests every 60 seconds
+    """
+
+    write_line(f"class RateLimiter:")
+    write_line(f"    '''")
+    write_line(f"    Client side copy of the SpaceTraders rate limit.")
+    write_line(f"    Requests are taken from a sustained bucket that refills at a steady rate, when it is empty")
+    write_line(f"    they are taken from a burst bucket that slowly refills over the burst window.")
+    write_line(f"    When both buckets are empty the caller reserves the next free slot and waits for it, so")
+    write_line(f"    concurrent callers queue up in order instead of being answered with a 429.")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        rate (float): Sustained requests per second. Default: 2")
+    write_line(f"        burst (int): Requests that can be made on top of the sustained rate. Default: 30")
+    write_line(f"        burst_time (float): Seconds needed to refill the burst bucket. Default: 60")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    def __init__(self, rate: float = 2, burst: int = 30, burst_time: float = 60) -> None:")
+    write_line(f"        self.rate = rate")
+    write_line(f"        self.burst = burst")
+    write_line(f"        self.burst_time = burst_time")
+    write_line(f"")
+    write_line(f"        # Both buckets start full, the sustained one can hold a single request")
+    write_line(f"        self.tokens = 1.0")
+    write_line(f"        self.burst_tokens = float(burst)")
+    write_line(f"        self.updated = time.monotonic()")
+    write_line(f"        self.lock = threading.Lock()")
+    write_line(f"")
+    write_line(f"    def _refill(self) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Adds the tokens earned since the last update to both buckets")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        now = time.monotonic()")
+    write_line(f"        elapsed = now - self.updated")
+    write_line(f"        self.updated = now")
+    write_line(f"")
+    write_line(f"        self.tokens = min(1.0, self.tokens + elapsed * self.rate)")
+    write_line(f"        self.burst_tokens = min(self.burst, self.burst_tokens + elapsed * self.burst / self.burst_time)")
+    write_line(f"")
+    write_line(f"    def reserve(self) -> float:")
+    write_line(f"        '''")
+    write_line(f"        Reserves a request slot")
+    write_line(f"")
+    write_line(f"        Returns:")
+    write_line(f"            float: The seconds to wait before the slot can be used")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        with self.lock:")
+    write_line(f"            self._refill()")
+    write_line(f"")
+    write_line(f"            # Use the sustained bucket first")
+    write_line(f"            if self.tokens >= 1:")
+    write_line(f"                self.tokens -= 1")
+    write_line(f"                return 0.0")
+    write_line(f"")
+    write_line(f"            # Then the burst bucket, but only if nobody is already queued")
+    write_line(f"            if self.tokens >= 0 and self.burst_tokens >= 1:")
+    write_line(f"                self.burst_tokens -= 1")
+    write_line(f"                return 0.0")
+    write_line(f"")
+    write_line(f"            # Queue behind the callers that already reserved a slot")
+    write_line(f"            self.tokens -= 1")
+    write_line(f"            return -self.tokens / self.rate")
+    write_line(f"")
+    write_line(f"    def penalize(self, seconds: float) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Empties both buckets so that the next reservation waits for the given seconds.")
+    write_line(f"        Used when the server answers with a 429 anyway, e.g. because another process shares the account")
+    write_line(f"")
+    write_line(f"        Args:")
+    write_line(f"            seconds (float): The seconds the server asked to wait")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        with self.lock:")
+    write_line(f"            self._refill()")
+    write_line(f"            self.burst_tokens = 0.0")
+    write_line(f"            self.tokens = min(self.tokens, 1 - seconds * self.rate)")
+    write_line(f"")
+    write_line(f"    def acquire(self) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Blocks until a request can be sent")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        wait = self.reserve()")
+    write_line(f"        if wait > 0:")
+    write_line(f"            time.sleep(wait)")
+    write_line(f"")
+    write_line(f"    async def async_acquire(self) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Waits until a request can be sent without blocking the event loop")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        wait = self.reserve()")
+    write_line(f"        if wait > 0:")
+    write_line(f"            await asyncio.sleep(wait)")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"# The rate limiter shared by every client in this process")
+    write_line(f"RATE_LIMITER = RateLimiter()")
+
+    write_line(f"")
+    write_line(f"")
+
+
+def write_retry_helpers() -> None:
+    """ Writes the helpers used to decide if and when a failed request is sent again to the SpaceTradersAPI.py file
+    """
+
+    write_line(f"# Status codes worth retrying, the server did not handle the request (429) or failed while handling it (5xx)")
+    write_line(f"RETRY_STATUS_CODES = (429, 500, 502, 503, 504)")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30) -> float:")
+    write_line(f"    '''")
+    write_line(f"    Exponential backoff with full jitter, so retrying clients do not hit the server all at once")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        attempt (int): The number of retries already made")
+    write_line(f"        base (float): The delay of the first retry. Default: 0.5")
+    write_line(f"        cap (float): The maximum delay. Default: 30")
+    write_line(f"")
+    write_line(f"    Returns:")
+    write_line(f"        float: The seconds to wait before the next retry")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    return random.uniform(0, min(cap, base * 2 ** attempt))")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"def retry_after(headers: dict) -> float:")
+    write_line(f"    '''")
+    write_line(f"    Reads how long the server asked to wait from the Retry-After or the rate limit reset headers")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        headers (dict): The headers of the response")
+    write_line(f"")
+    write_line(f"    Returns:")
+    write_line(f"        float: The seconds to wait, None if the server did not say")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    if 'Retry-After' in headers:")
+    write_line(f"        try:")
+    write_line(f"            return max(0.0, float(headers['Retry-After']))")
+    write_line(f"        except ValueError:")
+    write_line(f"            pass")
+    write_line(f"")
+    write_line(f"    if 'X-RateLimit-Reset' in headers:")
+    write_line(f"        try:")
+    write_line(f"            reset = datetime.datetime.fromisoformat(headers['X-RateLimit-Reset'].replace('Z', '+00:00'))")
+    write_line(f"            return max(0.0, (reset - datetime.datetime.now(datetime.timezone.utc)).total_seconds())")
+    write_line(f"        except ValueError:")
+    write_line(f"            pass")
+    write_line(f"")
+    write_line(f"    return None")
+
+    write_line(f"")
+    write_line(f"")
+
+
+def write_metrics() -> None:
+    """ Writes the Metrics class to the SpaceTradersAPI.py file.
+    Every request of the clients is recorded by operation, the /metrics endpoint of the web app reads them
+    """
+
+    write_line(f"# Upper bounds in seconds of the latency histogram buckets, slower requests fall in the last bucket")
+    write_line(f"LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)")
+    write_line(f"")
+    write_line(f"# Rate limit headers kept from the last response")
+    write_line(f"RATE_LIMIT_HEADERS = ('X-RateLimit-Type', 'X-RateLimit-Limit-Sustained', 'X-RateLimit-Limit-Burst', 'X-RateLimit-Remaining', 'X-RateLimit-Reset')")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"def body_size(kwargs: dict) -> int:")
+    write_line(f"    '''")
+    write_line(f"    Returns the size of the body of a request")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        kwargs (dict): The arguments of the request")
+    write_line(f"")
+    write_line(f"    Returns:")
+    write_line(f"        int: The size in bytes")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    if kwargs.get('json') is not None:")
+    write_line(f"        return len(json.dumps(kwargs['json']).encode())")
+    write_line(f"")
+    write_line(f"    data = kwargs.get('data')")
+    write_line(f"    if data is None:")
+    write_line(f"        return 0")
+    write_line(f"")
+    write_line(f"    return len(data.encode() if isinstance(data, str) else data)")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"class Metrics:")
+    write_line(f"    '''")
+    write_line(f"    Metrics of the requests sent by the clients, by operation: a latency histogram, the count of each")
+    write_line(f"    status code and the bytes sent and received. Every attempt is recorded, so the retries and the 429s show up.")
+    write_line(f"    The rate limit headers of the last response tell how much of the budget is left.")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        buckets (tuple): The upper bounds in seconds of the latency histogram buckets. Default: LATENCY_BUCKETS")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:")
+    write_line(f"        self.buckets = buckets")
+    write_line(f"        self.operations = dict()  # Operation: its metrics")
+    write_line(f"        self.rate_limit = dict()  # The rate limit headers of the last response")
+    write_line(f"        self.lock = threading.Lock()")
+    write_line(f"")
+    write_line(f"    def record(self, operation: str, status, seconds: float, bytes_out: int = 0, bytes_in: int = 0, headers: dict = None) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Records a request")
+    write_line(f"")
+    write_line(f"        Args:")
+    write_line(f"            operation (str): The operation, e.g. get_my_agent")
+    write_line(f"            status (int): The status code of the response, error if no response was received")
+    write_line(f"            seconds (float): How long the request took")
+    write_line(f"            bytes_out (int): The size of the body sent. Default: 0")
+    write_line(f"            bytes_in (int): The size of the body received. Default: 0")
+    write_line(f"            headers (dict): The headers of the response. Default: None")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        with self.lock:")
+    write_line(f"            metrics = self.operations.get(operation)")
+    write_line(f"            if metrics is None:")
+    write_line(f"                metrics = self.operations[operation] = {{")
+    write_line(f"                    'requests': 0,")
+    write_line(f"                    'latency_sum': 0.0,")
+    write_line(f"                    'latency_buckets': [0] * (len(self.buckets) + 1),")
+    write_line(f"                    'status_codes': collections.Counter(),")
+    write_line(f"                    'bytes_out': 0,")
+    write_line(f"                    'bytes_in': 0,")
+    write_line(f"                }}")
+    write_line(f"")
+    write_line(f"            metrics['requests'] += 1")
+    write_line(f"            metrics['latency_sum'] += seconds")
+    write_line(f"            metrics['latency_buckets'][bisect.bisect_left(self.buckets, seconds)] += 1")
+    write_line(f"            metrics['status_codes'][str(status)] += 1")
+    write_line(f"            metrics['bytes_out'] += bytes_out")
+    write_line(f"            metrics['bytes_in'] += bytes_in")
+    write_line(f"")
+    write_line(f"            if headers is not None and 'X-RateLimit-Remaining' in headers:")
+    write_line(f"                self.rate_limit = {{header: headers[header] for header in RATE_LIMIT_HEADERS if header in headers}}")
+    write_line(f"                self.rate_limit['Updated'] = datetime.datetime.now(datetime.timezone.utc).isoformat()")
+    write_line(f"")
+    write_line(f"    def snapshot(self) -> dict:")
+    write_line(f"        '''")
+    write_line(f"        Returns a copy of the metrics, the histogram buckets are keyed by their upper bound")
+    write_line(f"")
+    write_line(f"        Returns:")
+    write_line(f"            dict: The metrics by operation and the last rate limit headers")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        bounds = [str(bound) for bound in self.buckets] + ['+Inf']")
+    write_line(f"")
+    write_line(f"        with self.lock:")
+    write_line(f"            return {{")
+    write_line(f"                'operations': {{")
+    write_line(f"                    operation: dict(metrics, latency_buckets=dict(zip(bounds, metrics['latency_buckets'])), status_codes=dict(metrics['status_codes']))")
+    write_line(f"                    for operation, metrics in sorted(self.operations.items())")
+    write_line(f"                }},")
+    write_line(f"                'rate_limit': dict(self.rate_limit),")
+    write_line(f"            }}")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"# The metrics shared by every client in this process")
+    write_line(f"METRICS = Metrics()")
+    write_line(f"")
+    write_line(f"")
+
+
+def write_paginators() -> None:
+    """ Writes the paginators used by the iter_* functions to the SpaceTradersAPI.py file
+    """
+
+    write_line(f"def paginate(fetch, limit: int, workers: int = 1) -> typing.Iterator[dict]:")
+    write_line(f"    '''")
+    write_line(f"    Yields every entry of a paginated endpoint.")
+    write_line(f"    The total from the first page tells how many pages there are, the following pages are fetched in")
+    write_line(f"    background threads while the current one is consumed, so the caller rarely waits for the network.")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        fetch (callable): The method of the endpoint, called with page and limit")
+    write_line(f"        limit (int): The entries to request per page")
+    write_line(f"        workers (int): How many pages are fetched at the same time. Default: 1")
+    write_line(f"")
+    write_line(f"    Returns:")
+    write_line(f"        Iterator[dict]: The entries of every page")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    first = fetch(page=1, limit=limit)")
+    write_line(f"    pages = math.ceil(first['meta']['total'] / limit)")
+    write_line(f"")
+    write_line(f"    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers))")
+    write_line(f"    futures = collections.deque()")
+    write_line(f"    next_page = 2")
+    write_line(f"    try:")
+    write_line(f"        # Keep the next pages in flight")
+    write_line(f"        while next_page <= pages and len(futures) < max(1, workers):")
+    write_line(f"            futures.append(executor.submit(fetch, page=next_page, limit=limit))")
+    write_line(f"            next_page += 1")
+    write_line(f"")
+    write_line(f"        yield from first['data']")
+    write_line(f"")
+    write_line(f"        while futures:")
+    write_line(f"            result = futures.popleft().result()")
+    write_line(f"")
+    write_line(f"            if next_page <= pages:")
+    write_line(f"                futures.append(executor.submit(fetch, page=next_page, limit=limit))")
+    write_line(f"                next_page += 1")
+    write_line(f"")
+    write_line(f"            yield from result['data']")
+    write_line(f"    finally:")
+    write_line(f"        executor.shutdown(wait=False, cancel_futures=True)")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"async def async_paginate(fetch, limit: int, workers: int = 1) -> typing.AsyncIterator[dict]:")
+    write_line(f"    '''")
+    write_line(f"    Same as paginate, but for the coroutines of AsyncSpaceTraders: the next pages are fetched by tasks")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        fetch (callable): The coroutine of the endpoint, called with page and limit")
+    write_line(f"        limit (int): The entries to request per page")
+    write_line(f"        workers (int): How many pages are fetched at the same time. Default: 1")
+    write_line(f"")
+    write_line(f"    Returns:")
+    write_line(f"        AsyncIterator[dict]: The entries of every page")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    first = await fetch(page=1, limit=limit)")
+    write_line(f"    pages = math.ceil(first['meta']['total'] / limit)")
+    write_line(f"")
+    write_line(f"    tasks = collections.deque()")
+    write_line(f"    next_page = 2")
+    write_line(f"    try:")
+    write_line(f"        # Keep the next pages in flight")
+    write_line(f"        while next_page <= pages and len(tasks) < max(1, workers):")
+    write_line(f"            tasks.append(asyncio.ensure_future(fetch(page=next_page, limit=limit)))")
+    write_line(f"            next_page += 1")
+    write_line(f"")
+    write_line(f"        for entry in first['data']:")
+    write_line(f"            yield entry")
+    write_line(f"")
+    write_line(f"        while tasks:")
+    write_line(f"            result = await tasks.popleft()")
+    write_line(f"")
+    write_line(f"            if next_page <= pages:")
+    write_line(f"                tasks.append(asyncio.ensure_future(fetch(page=next_page, limit=limit)))")
+    write_line(f"                next_page += 1")
+    write_line(f"")
+    write_line(f"            for entry in result['data']:")
+    write_line(f"                yield entry")
+    write_line(f"    finally:")
+    write_line(f"        for task in tasks:")
+    write_line(f"            task.cancel()")
+
+    write_line(f"")
+    write_line(f"")
+
+
 def write_header(data: dict) -> None:
     """ Writes the header to the SpaceTradersAPI.py file
 
@@ -64,38 +428,301 @@ def write_header(data: dict) -> None:
     write_line("#\n")
 
     # Write the header
-    libs_to_install = ["requests"]
+    libs_to_install = ["asyncio", "bisect", "collections", "concurrent.futures", "datetime", "functools", "json", "math", "random", "requests", "threading", "time", "typing"]
     for lib in libs_to_install:
         write_line(f"import {lib}")
 
+    # aiohttp is only needed by the asynchronous client
+    write_line(f"")
+    write_line(f"try:")
+    write_line(f"    import aiohttp")
+    write_line(f"except ImportError:")
+    write_line(f"    aiohttp = None")
+
+    write_line(f"")
+    write_line(f"")
+
+    # Write the rate limiter shared by the clients
+    write_rate_limiter()
+
+    # Write the retry helpers used by the clients
+    write_retry_helpers()
+
+    # Write the metrics recorded by the clients
+    write_metrics()
+
+    # Write the paginators used by the iterators
+    write_paginators()
+
     # Get the url of the server
     url = data["servers"][0]["url"]
 
-    write_line(f"")
     write_line(f"class SpaceTraders:")
-    write_line(f"    def __init__(self, token: str) -> None:")
+    write_line(f"    def __init__(self, token: str, rate_limiter: RateLimiter = None, max_retries: int = 3, max_retry_wait: float = 60, metrics: Metrics = None) -> None:")
     write_line(f"        self.token = token  # The token used to authenticate the user")
     write_line(f"        self.url = {url!r}  # The url of the server")
+    write_line(f"        self.rate_limiter = rate_limiter or RATE_LIMITER  # Every request waits for its turn here")
+    write_line(f"        self.metrics = metrics or METRICS  # Every request is recorded here")
+    write_line(f"        self.max_retries = max_retries  # How many times a failed request is sent again")
+    write_line(f"        self.max_retry_wait = max_retry_wait  # How many seconds a request can spend waiting between retries")
     write_line(f"")
     write_line(f"        # The session used to make requests and prepare the session methods for better readability")
     write_line(f"        self.session = requests.Session()")
-    write_line(f"        self._get = self.session.get")
-    write_line(f"        self._post = self.session.post")
-    write_line(f"        self._patch = self.session.patch")
+    write_line(f"        self._get = functools.partial(self._request, 'get')")
+    write_line(f"        self._post = functools.partial(self._request, 'post')")
+    write_line(f"        self._patch = functools.partial(self._request, 'patch')")
     write_line(f"        self.session.headers.update({{")
     write_line(f"            'Content-Type': 'application/json',")
     write_line(f"            'Accept': 'application/json',")
     write_line(f"            'Authorization': f'Bearer {{self.token}}',")
     write_line(f"        }})")
     write_line(f"")
+    write_line(f"    def _request(self, method: str, url: str, idempotent: bool = True, operation: str = 'unknown', **kwargs) -> requests.Response:")
+    write_line(f"        '''")
+    write_line(f"        Waits for the rate limiter and sends the request.")
+    write_line(f"        Rate limited requests (429) are always retried after the delay asked by the server, since the server did not run them.")
+    write_line(f"        Server and connection errors are retried with a jittered exponential backoff, but only if the endpoint is idempotent.")
+    write_line(f"        Every call can retry at most max_retries times and wait at most max_retry_wait seconds.")
+    write_line(f"        Every attempt is recorded in the metrics.")
+    write_line(f"")
+    write_line(f"        Args:")
+    write_line(f"            method (str): The http method: get, post, patch")
+    write_line(f"            url (str): The url of the endpoint")
+    write_line(f"            idempotent (bool): Whether the request can be sent again after a server or connection error. Default: True")
+    write_line(f"            operation (str): The name of the operation, used by the metrics. Default: unknown")
+    write_line(f"")
+    write_line(f"        Returns:")
+    write_line(f"            requests.Response: The response from the server")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        bytes_out = body_size(kwargs)")
+    write_line(f"        attempt = 0")
+    write_line(f"        waited = 0.0")
+    write_line(f"        while True:")
+    write_line(f"            self.rate_limiter.acquire()")
+    write_line(f"")
+    write_line(f"            start = time.perf_counter()")
+    write_line(f"            try:")
+    write_line(f"                response = self.session.request(method, url, **kwargs)")
+    write_line(f"            except (requests.ConnectionError, requests.Timeout) as e:")
+    write_line(f"                self.metrics.record(operation, 'error', time.perf_counter() - start, bytes_out)")
+    write_line(f"")
+    write_line(f"                # Only a connect timeout is sure to have never reached the server")
+    write_line(f"                if not idempotent and not isinstance(e, requests.ConnectTimeout):")
+    write_line(f"                    raise")
+    write_line(f"                error, response = e, None")
+    write_line(f"                delay = backoff_delay(attempt)")
+    write_line(f"            else:")
+    write_line(f"                self.metrics.record(operation, response.status_code, time.perf_counter() - start, bytes_out, len(response.content), response.headers)")
+    write_line(f"")
+    write_line(f"                if response.status_code == 429:")
+    write_line(f"                    delay = retry_after(response.headers)")
+    write_line(f"                    if delay is None:")
+    write_line(f"                        delay = backoff_delay(attempt)")
+    write_line(f"                elif response.status_code in RETRY_STATUS_CODES and idempotent:")
+    write_line(f"                    delay = backoff_delay(attempt)")
+    write_line(f"                else:")
+    write_line(f"                    return response")
+    write_line(f"")
+    write_line(f"            # Give up once the retry budget of this call is spent")
+    write_line(f"            if attempt >= self.max_retries or waited + delay > self.max_retry_wait:")
+    write_line(f"                if response is None:")
+    write_line(f"                    raise error")
+    write_line(f"                return response")
+    write_line(f"")
+    write_line(f"            attempt += 1")
+    write_line(f"            waited += delay")
+    write_line(f"")
+    write_line(f"            if response is not None and response.status_code == 429:")
+    write_line(f"                # Hold back every client sharing the rate limiter, the next acquire waits for the reset")
+    write_line(f"                self.rate_limiter.penalize(delay)")
+    write_line(f"            else:")
+    write_line(f"                time.sleep(delay)")
+    write_line(f"")
+
+
+def write_async_header(data: dict) -> None:
+    """ Writes the header of the asynchronous client to the SpaceTradersAPI.py file
+
+    Args:
+        data (dict): The data from the json file
+    """
 
+    # Get the url of the server
+    url = data["servers"][0]["url"]
 
-def write_function_header(name: str, params: dict) -> None:
+    write_line(f"class AsyncResponse:")
+    write_line(f"    '''")
+    write_line(f"    The parts of an aiohttp response used by the generated methods.")
+    write_line(f"    The body is read right away so that the connection can go back to the pool.")
+    write_line(f"")
+    write_line(f"    Args:")
+    write_line(f"        response (aiohttp.ClientResponse): The response from the server")
+    write_line(f"        body (bytes): The body of the response")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    def __init__(self, response, body: bytes) -> None:")
+    write_line(f"        self.status_code = response.status")
+    write_line(f"        self.reason = response.reason")
+    write_line(f"        self.headers = response.headers")
+    write_line(f"        self.request_info = response.request_info")
+    write_line(f"        self.history = response.history")
+    write_line(f"        self.body = body")
+    write_line(f"")
+    write_line(f"    def raise_for_status(self) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Raises an aiohttp.ClientResponseError if the request was not successful")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        if self.status_code >= 400:")
+    write_line(f"            raise aiohttp.ClientResponseError(")
+    write_line(f"                self.request_info,")
+    write_line(f"                self.history,")
+    write_line(f"                status=self.status_code,")
+    write_line(f"                message=self.reason,")
+    write_line(f"                headers=self.headers")
+    write_line(f"            )")
+    write_line(f"")
+    write_line(f"    def json(self) -> dict:")
+    write_line(f"        '''")
+    write_line(f"        Returns:")
+    write_line(f"            dict: The body of the response")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        return json.loads(self.body)")
+    write_line(f"")
+    write_line(f"")
+    write_line(f"class AsyncSpaceTraders:")
+    write_line(f"    '''")
+    write_line(f"    Same methods as SpaceTraders, but every method is a coroutine.")
+    write_line(f"    Requests share a pool of connections, so many ships can be driven at once from a single event loop.")
+    write_line(f"    Use it as an async context manager, or call close() when done.")
+    write_line(f"    '''")
+    write_line(f"")
+    write_line(f"    def __init__(self, token: str, rate_limiter: RateLimiter = None, max_retries: int = 3, max_retry_wait: float = 60, connections: int = 20, metrics: Metrics = None) -> None:")
+    write_line(f"        if aiohttp is None:")
+    write_line(f"            raise ImportError('AsyncSpaceTraders needs aiohttp, install it with: pip install aiohttp')")
+    write_line(f"")
+    write_line(f"        self.token = token  # The token used to authenticate the user")
+    write_line(f"        self.url = {url!r}  # The url of the server")
+    write_line(f"        self.rate_limiter = rate_limiter or RATE_LIMITER  # Every request waits for its turn here")
+    write_line(f"        self.metrics = metrics or METRICS  # Every request is recorded here")
+    write_line(f"        self.max_retries = max_retries  # How many times a failed request is sent again")
+    write_line(f"        self.max_retry_wait = max_retry_wait  # How many seconds a request can spend waiting between retries")
+    write_line(f"        self.connections = connections  # How many connections the pool keeps open")
+    write_line(f"")
+    write_line(f"        # The session is created inside the event loop on the first request")
+    write_line(f"        self.session = None")
+    write_line(f"        self._get = functools.partial(self._request, 'get')")
+    write_line(f"        self._post = functools.partial(self._request, 'post')")
+    write_line(f"        self._patch = functools.partial(self._request, 'patch')")
+    write_line(f"        self.headers = {{")
+    write_line(f"            'Content-Type': 'application/json',")
+    write_line(f"            'Accept': 'application/json',")
+    write_line(f"            'Authorization': f'Bearer {{self.token}}',")
+    write_line(f"        }}")
+    write_line(f"")
+    write_line(f"    async def __aenter__(self) -> 'AsyncSpaceTraders':")
+    write_line(f"        return self")
+    write_line(f"")
+    write_line(f"    async def __aexit__(self, *args) -> None:")
+    write_line(f"        await self.close()")
+    write_line(f"")
+    write_line(f"    async def close(self) -> None:")
+    write_line(f"        '''")
+    write_line(f"        Closes the session and its pooled connections")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        if self.session is not None:")
+    write_line(f"            await self.session.close()")
+    write_line(f"            self.session = None")
+    write_line(f"")
+    write_line(f"    def _get_session(self):")
+    write_line(f"        '''")
+    write_line(f"        Returns:")
+    write_line(f"            aiohttp.ClientSession: The session, created on first use")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        if self.session is None or self.session.closed:")
+    write_line(f"            self.session = aiohttp.ClientSession(")
+    write_line(f"                headers=self.headers,")
+    write_line(f"                connector=aiohttp.TCPConnector(limit=self.connections)")
+    write_line(f"            )")
+    write_line(f"")
+    write_line(f"        return self.session")
+    write_line(f"")
+    write_line(f"    async def _request(self, method: str, url: str, idempotent: bool = True, operation: str = 'unknown', **kwargs) -> AsyncResponse:")
+    write_line(f"        '''")
+    write_line(f"        Waits for the rate limiter and sends the request, retrying it like SpaceTraders._request does")
+    write_line(f"")
+    write_line(f"        Args:")
+    write_line(f"            method (str): The http method: get, post, patch")
+    write_line(f"            url (str): The url of the endpoint")
+    write_line(f"            idempotent (bool): Whether the request can be sent again after a server or connection error. Default: True")
+    write_line(f"            operation (str): The name of the operation, used by the metrics. Default: unknown")
+    write_line(f"")
+    write_line(f"        Returns:")
+    write_line(f"            AsyncResponse: The response from the server")
+    write_line(f"        '''")
+    write_line(f"")
+    write_line(f"        # aiohttp does not skip empty parameters like requests does")
+    write_line(f"        if 'params' in kwargs:")
+    write_line(f"            kwargs['params'] = {{key: value for key, value in kwargs['params'].items() if value is not None}}")
+    write_line(f"")
+    write_line(f"        bytes_out = body_size(kwargs)")
+    write_line(f"        attempt = 0")
+    write_line(f"        waited = 0.0")
+    write_line(f"        while True:")
+    write_line(f"            await self.rate_limiter.async_acquire()")
+    write_line(f"")
+    write_line(f"            start = time.perf_counter()")
+    write_line(f"            try:")
+    write_line(f"                async with self._get_session().request(method, url, **kwargs) as raw_response:")
+    write_line(f"                    response = AsyncResponse(raw_response, await raw_response.read())")
+    write_line(f"            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:")
+    write_line(f"                self.metrics.record(operation, 'error', time.perf_counter() - start, bytes_out)")
+    write_line(f"")
+    write_line(f"                # Only a failed connection is sure to have never reached the server")
+    write_line(f"                if not idempotent and not isinstance(e, aiohttp.ClientConnectorError):")
+    write_line(f"                    raise")
+    write_line(f"                error, response = e, None")
+    write_line(f"                delay = backoff_delay(attempt)")
+    write_line(f"            else:")
+    write_line(f"                self.metrics.record(operation, response.status_code, time.perf_counter() - start, bytes_out, len(response.body), response.headers)")
+    write_line(f"")
+    write_line(f"                if response.status_code == 429:")
+    write_line(f"                    delay = retry_after(response.headers)")
+    write_line(f"                    if delay is None:")
+    write_line(f"                        delay = backoff_delay(attempt)")
+    write_line(f"                elif response.status_code in RETRY_STATUS_CODES and idempotent:")
+    write_line(f"                    delay = backoff_delay(attempt)")
+    write_line(f"                else:")
+    write_line(f"                    return response")
+    write_line(f"")
+    write_line(f"            # Give up once the retry budget of this call is spent")
+    write_line(f"            if attempt >= self.max_retries or waited + delay > self.max_retry_wait:")
+    write_line(f"                if response is None:")
+    write_line(f"                    raise error")
+    write_line(f"                return response")
+    write_line(f"")
+    write_line(f"            attempt += 1")
+    write_line(f"            waited += delay")
+    write_line(f"")
+    write_line(f"            if response is not None and response.status_code == 429:")
+    write_line(f"                # Hold back every client sharing the rate limiter, the next acquire waits for the reset")
+    write_line(f"                self.rate_limiter.penalize(delay)")
+    write_line(f"            else:")
+    write_line(f"                await asyncio.sleep(delay)")
+    write_line(f"")
+
+
+def write_function_header(name: str, params: dict, is_async: bool = False) -> None:
     """ Writes the header of a function to the SpaceTradersAPI.py file
 
     Args:
         name (str): The name of the function
         params (dict): The parameters of the function
+        is_async (bool): Whether the function is a coroutine of the asynchronous client
     """
 
     # Add the parameters to the function header
@@ -112,7 +739,11 @@ def write_function_header(name: str, params: dict) -> None:
             text
         )
 
-    write_line(f"    def {name}(")
+    # Coroutines share the same signature
+    if is_async:
+        write_line(f"    async def {name}(")
+    else:
+        write_line(f"    def {name}(")
 
     # Loop over the function arguments
     for x, argument in enumerate(function_arguments):
@@ -123,6 +754,79 @@ def write_function_header(name: str, params: dict) -> None:
     
     write_line(f"    ) -> dict:")
 
+def write_iterator(name: str, params: dict, is_async: bool = False) -> None:
+    """ Writes the iterator of a paginated function to the SpaceTradersAPI.py file.
+    The iterator takes the same parameters except page and limit, and yields the entries of every page
+
+    Args:
+        name (str): The name of the paginated function
+        params (dict): The parameters of the paginated function
+        is_async (bool): Whether the function is a coroutine of the asynchronous client
+    """
+
+    # Name the iterator after the function: get_systems -> iter_systems
+    iterator_name = "iter_" + name.removeprefix("get_")
+
+    # Request as many entries per page as the API allows
+    limit = [param for param in params if param["name"] == "limit"][0]
+    max_limit = limit["maximum"] if limit["maximum"] is not None else limit["default"]
+
+    # Every parameter but page and limit is passed to the paginated function
+    params = [param for param in params if param["name"] not in ("page", "limit")]
+
+    # Add the parameters to the function header
+    function_arguments = ["self"]
+    for param in sorted(params, key=lambda x: x["has_default"]):
+        # Add the parameter to the function header
+        text = f"{param['name']}: {param['parameter_fmt']}"
+
+        # Add the default value to the function header
+        if param["has_default"]:
+            text += f" = {param['default']!r}"
+
+        function_arguments.append(
+            text
+        )
+    function_arguments.append("workers: int = 1")
+
+    write_line(f"    def {iterator_name}(")
+
+    # Loop over the function arguments
+    for x, argument in enumerate(function_arguments):
+        if x != len(function_arguments) - 1:
+            write_line(f"        {argument},")
+            continue
+        write_line(f"        {argument}")
+
+    iterator_type = "AsyncIterator" if is_async else "Iterator"
+    write_line(f"    ) -> typing.{iterator_type}[dict]:")
+
+    # Write the docstring
+    write_line(f"        '''")
+    write_line(f"        Iterates over every entry of {name}, requesting {max_limit} entries per page.")
+    write_line(f"        The next pages are fetched while the current one is consumed.")
+    write_line(f"")
+    write_line(f"        Args:")
+    for param in sorted(params, key=lambda x: x["has_default"]):
+        write_line(f"            {param['name']} ({param['parameter_fmt']}): {param['description']}")
+    write_line(f"            workers (int): How many pages are fetched at the same time. Default: 1")
+    write_line(f"")
+    write_line(f"        Returns:")
+    write_line(f"            {iterator_type}[dict]: The entries of every page")
+    write_line(f"        '''")
+    write_line(f"")
+
+    # Bind the parameters to the paginated function, the paginator adds page and limit
+    paginate = "async_paginate" if is_async else "paginate"
+    bound_arguments = "".join(f", {param['name']}={param['name']}" for param in params)
+
+    write_line(f"        return {paginate}(")
+    write_line(f"            functools.partial(self.{name}{bound_arguments}),")
+    write_line(f"            limit={max_limit},")
+    write_line(f"            workers=workers")
+    write_line(f"        )")
+
+
 def write_function_docstring(description: str, params: dict) -> None:
     """ Writes the docstring of a function to the SpaceTradersAPI.py file
 
@@ -166,7 +870,7 @@ def write_function_docstring(description: str, params: dict) -> None:
     write_line(f"        '''")
 
 
-def write_function_body(name: str, url: str, action: str, params: dict) -> None:
+def write_function_body(name: str, url: str, action: str, params: dict, is_async: bool = False) -> None:
     """ Writes the body of a function to the SpaceTradersAPI.py file
 
     Args:
@@ -174,6 +878,7 @@ def write_function_body(name: str, url: str, action: str, params: dict) -> None:
         url (str): The url of the endpoint
         action (str): The action of the function: get, post, patch
         params (dict): The parameters of the function
+        is_async (bool): Whether the function is a coroutine of the asynchronous client
     """
 
     # Validate the parameters
@@ -209,10 +914,18 @@ def write_function_body(name: str, url: str, action: str, params: dict) -> None:
 
     # Add the parameters to the function request if there are any
     text = f"        response = self._{action}(url=url"
+    if is_async:
+        text = f"        response = await self._{action}(url=url"
     if add_parameters:
-        text += ", params=params)"
-    else:
-        text += ")"
+        text += ", params=params"
+
+    # Send the body as json
+    if any(param["in"] == "body" for param in params):
+        text += ", json=body"
+
+    # Only idempotent requests are sent again after a server error
+    idempotent = action == "get" or name in IDEMPOTENT_OPERATIONS
+    text += f", idempotent={idempotent}, operation={name!r})"
 
     write_line(text)
     write_line(f"")
@@ -290,24 +1003,60 @@ def parse_parameters(parameters: list) -> list:
 
     return params
 
-def loop_over_endpoints(data: dict) -> None:
+def parse_request_body(action_data: dict) -> list:
+    """ Parses the request body of an action and returns it as a parameter named body, sent as json
+
+    Args:
+        action_data (dict): The data of the action
+
+    Returns:
+        list: The body parameter, empty if the action takes no body
+    """
+
+    if "requestBody" not in action_data:
+        return list()
+
+    request_body = action_data["requestBody"]
+    required = request_body.get("required", False)
+
+    return [{
+        "name": "body",
+        "parameter_fmt": "dict",
+        "description": request_body.get("description", "The body of the request, sent as json"),
+        "required": required,
+        "in": "body",
+        "has_default": not required,
+        "default": None,
+        "has_limits": False,
+        "minimum": None,
+        "maximum": None
+    }]
+
+def loop_over_endpoints(data: dict, is_async: bool = False) -> None:
     """ Loops over the endpoints and generates the functions
 
     Args:
         data (dict): The data from the json file
+        is_async (bool): Whether to generate the coroutines of the asynchronous client
     """
 
     for endpoint, endpoint_data in sorted(data["paths"].items(), key=lambda x: x[0]):
-        parameters = endpoint_data.pop("parameters", [])
+        # The parameters shared by every action of the endpoint, the data is read twice so it is not popped
+        parameters = endpoint_data.get("parameters", [])
         for action, action_data in sorted(endpoint_data.items(), key=lambda x: x[0]):
+            if action == "parameters":
+                continue
+
             name = action_data["operationId"].replace("-", "_")
             url = endpoint
             params = parse_parameters(parameters)
             params.extend(parse_parameters(action_data.get("parameters", [])))
+            params.extend(parse_request_body(action_data))
 
             write_function_header(
                 name=name, 
-                params=params
+                params=params,
+                is_async=is_async
             )
 
             # Get the description of the action
@@ -324,11 +1073,24 @@ def loop_over_endpoints(data: dict) -> None:
                 name=name,
                 url=url,
                 action=action,
-                params=params
+                params=params,
+                is_async=is_async
             )
 
             write_line(f"")
             write_line(f"")
+
+            # Paginated functions get an iterator over every page
+            param_names = [param["name"] for param in params]
+            if "page" in param_names and "limit" in param_names:
+                write_iterator(
+                    name=name,
+                    params=params,
+                    is_async=is_async
+                )
+
+                write_line(f"")
+                write_line(f"")
             # print(action, action_data)
 
 if __name__ == "__main__":
@@ -337,4 +1099,7 @@ if __name__ == "__main__":
     write_header(data=json_data)
     loop_over_endpoints(data=json_data)
 
+    write_async_header(data=json_data)
+    loop_over_endpoints(data=json_data, is_async=True)
+
     space_traders_api_file.close()
\ No newline at end of file
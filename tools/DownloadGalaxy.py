@@ -7,51 +7,182 @@ sys.path.insert(1, API_PATH)
 
 try:
     import app.SpaceTradersAPI as SpaceTradersAPI
+    import app.GalaxyDB as GalaxyDB
 except:
     import SpaceTradersAPI as SpaceTradersAPI
+    import GalaxyDB as GalaxyDB
 
 from Config import TOKEN
 from icecream import ic as print
+import asyncio
 import json
-import time
+import math
 
-EXPORT_GALAXY_PATH = os.path.join("data", "galaxys.json")
+EXPORT_GALAXY_PATH = os.path.join("data", "galaxy.json")
+CHECKPOINT_PATH = os.path.join("data", "galaxy_pages")  # One file per downloaded page, used to resume
+PAGE_LIMIT = 20   # Max systems per page allowed by the API
+CONCURRENCY = 10  # Pages downloaded at the same time, the rate limiter decides the real pace
 
-if __name__ == "__main__":
-    # Create a new instance of the SpaceTraders class
-    api = SpaceTradersAPI.SpaceTraders(TOKEN)
 
-    # Initialize parameters
-    systems_count = 1 # Set to 1 to start the loop
-    page = 1          # Start at page 1
-    all_systems = []  # List to store all the systems
-    max_pages = 0     # Max pages to loop through
+def page_path(page: int) -> str:
+    """ Returns the path of the checkpoint file of a page
 
-    # Loop through all the pages till we get no more systems
-    while systems_count > 0:
-        # Get the systems for the current page
-        results = api.get_systems(page=page, limit=20)
+    Args:
+        page (int): The page number
 
-        # Get the systems from the results
-        systems = results["data"]
+    Returns:
+        str: The path of the checkpoint file
+    """
 
-        # Add the systems to the list of all systems
-        all_systems.extend(systems)
+    return os.path.join(CHECKPOINT_PATH, f"page_{page}.json")
 
-        # Get the meta data from the results to print some info
-        meta = results["meta"]
-        total_records = meta["total"]
-        max_pages = total_records // 20
-        print(f"Page {page} of {max_pages} ({total_records} total records)")
 
-        # Count the number of systems we got and increment the page for the next loop
-        systems_count = len(systems)
-        page += 1
+def save_page(page: int, systems: list) -> None:
+    """ Saves the systems of a page to its checkpoint file.
+    The file is written under a temporary name and then renamed, so a crash never leaves a half written page behind
+
+    Args:
+        page (int): The page number
+        systems (list): The systems of the page
+    """
+
+    temp_path = page_path(page) + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(json.dumps(systems))
+
+    os.replace(temp_path, page_path(page))
+
+
+def meta_path() -> str:
+    """ Returns the path of the checkpoint file of the pagination, written with the first page
+
+    Returns:
+        str: The path of the checkpoint file
+    """
+
+    return os.path.join(CHECKPOINT_PATH, "meta.json")
+
+
+def save_meta(meta: dict) -> None:
+    """ Saves the pagination of the first page, so a resumed download knows how many pages there are without reading it again
+
+    Args:
+        meta (dict): The meta of the response, with the total number of systems
+    """
+
+    temp_path = meta_path() + ".tmp"
+    with open(temp_path, "w") as f:
+        f.write(json.dumps(meta))
+
+    os.replace(temp_path, meta_path())
+
+
+def load_meta() -> dict:
+    """ Loads the pagination saved by a previous run
+
+    Returns:
+        dict: The meta of the first page, None if the first page was not stored
+    """
+
+    if not os.path.exists(meta_path()) or not os.path.exists(page_path(1)):
+        return None
+
+    with open(meta_path(), "r") as f:
+        return json.loads(f.read())
+
+
+async def download_pages(api: SpaceTradersAPI.AsyncSpaceTraders, pages: list) -> None:
+    """ Downloads the pages that are not checkpointed yet
+
+    Args:
+        api (SpaceTradersAPI.AsyncSpaceTraders): The client used to download the pages
+        pages (list): The pages to download
+    """
+
+    queue = asyncio.Queue()
+    for page in pages:
+        queue.put_nowait(page)
+
+    async def worker() -> None:
+        # Keep downloading till the queue is empty
+        while not queue.empty():
+            page = queue.get_nowait()
+
+            results = await api.get_systems(page=page, limit=PAGE_LIMIT)
+            save_page(page, results["data"])
 
-        # Sleep for 1 second to avoid rate limiting
-        time.sleep(1)
-        break
+            print(f"Page {page} downloaded ({queue.qsize()} left)")
+
+    await asyncio.gather(*[worker() for _ in range(CONCURRENCY)])
+
+
+def export_galaxy(max_pages: int) -> int:
+    """ Joins the checkpointed pages into the galaxy file and the galaxy database, one page at a time
+
+    Args:
+        max_pages (int): The number of pages
+
+    Returns:
+        int: The number of systems written
+    """
+
+    systems_count = 0
+    connection = GalaxyDB.connect()
 
-    # Write the systems to a file
     with open(EXPORT_GALAXY_PATH, "w") as f:
-        f.write(json.dumps(all_systems, indent=4))
\ No newline at end of file
+        f.write("[")
+
+        for page in range(1, max_pages + 1):
+            with open(page_path(page), "r") as page_file:
+                systems = json.loads(page_file.read())
+
+            GalaxyDB.insert_systems(connection, systems)
+
+            # Write a system per line
+            for system in systems:
+                f.write(",\n" if systems_count > 0 else "\n")
+                f.write(json.dumps(system))
+                systems_count += 1
+
+        f.write("\n]\n")
+
+    connection.close()
+
+    return systems_count
+
+
+async def download_galaxy() -> None:
+    """Downloads every system of the galaxy, resuming from the checkpointed pages if there are any."""
+
+    os.makedirs(CHECKPOINT_PATH, exist_ok=True)
+
+    async with SpaceTradersAPI.AsyncSpaceTraders(TOKEN) as api:
+        # Read the first page to know how many pages there are, unless a previous run stored it
+        meta = load_meta()
+        if meta is None:
+            results = await api.get_systems(page=1, limit=PAGE_LIMIT)
+            save_page(1, results["data"])
+            save_meta(results["meta"])
+            meta = results["meta"]
+
+        total_records = meta["total"]
+        max_pages = math.ceil(total_records / PAGE_LIMIT)
+
+        # Skip the pages downloaded by a previous run
+        missing_pages = [page for page in range(1, max_pages + 1) if not os.path.exists(page_path(page))]
+        print(f"{max_pages} pages ({total_records} total records), {len(missing_pages)} to download")
+
+        await download_pages(api, missing_pages)
+
+    systems_count = export_galaxy(max_pages)
+    print(f"{systems_count} systems written to {EXPORT_GALAXY_PATH} and {GalaxyDB.GALAXY_DB_PATH}")
+
+    # The galaxy is complete, the checkpoints are not needed anymore
+    for page in range(1, max_pages + 1):
+        os.remove(page_path(page))
+    os.remove(meta_path())
+    os.rmdir(CHECKPOINT_PATH)
+
+
+if __name__ == "__main__":
+    asyncio.run(download_galaxy())
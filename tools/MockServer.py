@@ -0,0 +1,442 @@
+# Description: This script reads the same OpenAPI json file as CompileAPI.py and serves a local stand-in
+#              of SpaceTraders: every path answers with data generated from the schemas of its response.
+#              The server also copies the behaviour of the real one that matters to the clients: the rate
+#              limit headers and the 429s, the latency, the cooldowns of the ships and their travel times.
+#
+# How to use: 1. Place the OpenAPI json file in the tools folder, as for CompileAPI.py
+#             2. Run this script
+#             3. Point the client to the server: api.url = "http://127.0.0.1:5001/v2"
+#
+# Note: The request bodies are not validated and the server keeps no game state, other than the cooldowns
+#       and the arrival times of the ships.
+#
+
+import datetime
+import json
+import math
+import random
+import re
+import threading
+import time
+from flask import Flask, request
+
+HOST = "127.0.0.1"
+PORT = 5001
+
+MAX_DEPTH = 8  # Nested objects deeper than this are left empty, the schemas reference each other
+
+
+def read_json(file: str) -> dict:
+    """ Reads a json file and returns the data as a dict
+
+    Args:
+        file (str): The path to the json file
+
+    Returns:
+        dict: The data from the json file
+    """
+
+    # Open the file and return the data
+    with open(file, "r") as f:
+        return json.load(f)
+
+
+def timestamp(seconds: float) -> str:
+    """ Formats seconds since the epoch as a SpaceTraders timestamp
+
+    Args:
+        seconds (float): The seconds since the epoch
+
+    Returns:
+        str: The timestamp, e.g. 2023-12-20T23:53:45.000Z
+    """
+
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def resolve(spec: dict, schema: dict) -> dict:
+    """ Follows the references of a schema to the components of the spec
+
+    Args:
+        spec (dict): The OpenAPI spec
+        schema (dict): The schema
+
+    Returns:
+        dict: The schema referenced
+    """
+
+    while "$ref" in schema:
+        node = spec
+        for part in schema["$ref"].lstrip("#/").split("/"):
+            node = node[part]
+        schema = node
+
+    # Merge the schemas the schema is made of
+    if "allOf" in schema:
+        merged = {"type": "object", "properties": dict(), "required": list()}
+        for part in schema["allOf"]:
+            part = resolve(spec, part)
+            merged["properties"].update(part.get("properties", dict()))
+            merged["required"].extend(part.get("required", list()))
+        schema = merged
+
+    # Any of the alternatives is valid, take the first one
+    for key in ("oneOf", "anyOf"):
+        if key in schema:
+            schema = resolve(spec, schema[key][0])
+
+    return schema
+
+
+def fixture(spec: dict, schema: dict, name: str = "", index: int = 0, depth: int = 0):
+    """ Generates a value valid for a schema.
+    The index makes the items of a list different from each other, e.g. the systems of a page
+
+    Args:
+        spec (dict): The OpenAPI spec
+        schema (dict): The schema of the value
+        name (str): The name of the property holding the value. Default: ""
+        index (int): The index of the value in its list. Default: 0
+        depth (int): How deep the value is nested. Default: 0
+
+    Returns:
+        any: The value
+    """
+
+    schema = resolve(spec, schema)
+
+    if "enum" in schema:
+        return schema["enum"][index % len(schema["enum"])]
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+
+    if kind == "object":
+        if depth >= MAX_DEPTH:
+            return dict()
+
+        return {
+            key: fixture(spec, value, key, index, depth + 1)
+            for key, value in schema.get("properties", dict()).items()
+        }
+
+    if kind == "array":
+        count = max(schema.get("minItems", 0), 1 if depth < MAX_DEPTH else 0)
+        return [fixture(spec, schema.get("items", dict()), name, index + i, depth + 1) for i in range(count)]
+
+    if kind in ("integer", "number"):
+        if "minimum" in schema:
+            value = schema["minimum"] + index
+        else:
+            # Spread the values, e.g. the coordinates of the systems
+            value = (index * 7919 + sum(map(ord, name)) * 104729) % 20001 - 10000
+        value = min(value, schema.get("maximum", value))
+
+        return value if kind == "integer" else float(value)
+
+    if kind == "boolean":
+        return True
+
+    if schema.get("format") == "date-time":
+        return timestamp(time.time())
+
+    value = f"{name.upper() or 'VALUE'}-{index}"
+    return value.ljust(schema.get("minLength", 0), "0")
+
+
+class RateLimit:
+    """ The rate limit of the server: a sustained bucket and a burst bucket, per token
+
+    Args:
+        rate (float): Sustained requests per second, 0 disables the rate limit. Default: 2
+        burst (int): Requests that can be made on top of the sustained rate. Default: 30
+        burst_time (float): Seconds needed to refill the burst bucket. Default: 60
+    """
+
+    def __init__(self, rate: float = 2, burst: int = 30, burst_time: float = 60) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.burst_time = burst_time
+
+        self.buckets = dict()  # Token: [sustained tokens, burst tokens, last update]
+        self.lock = threading.Lock()
+
+    def take(self, token: str) -> tuple:
+        """ Takes a request from the buckets of a token
+
+        Args:
+            token (str): The token of the caller
+
+        Returns:
+            tuple: Whether the request is allowed, and the rate limit headers
+        """
+
+        if self.rate <= 0:
+            return True, dict()
+
+        with self.lock:
+            now = time.time()
+            bucket = self.buckets.setdefault(token, [1.0, float(self.burst), now])
+
+            elapsed = now - bucket[2]
+            bucket[0] = min(1.0, bucket[0] + elapsed * self.rate)
+            bucket[1] = min(self.burst, bucket[1] + elapsed * self.burst / self.burst_time)
+            bucket[2] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                allowed = True
+            elif bucket[1] >= 1:
+                bucket[1] -= 1
+                allowed = True
+            else:
+                allowed = False
+
+            reset = now + (1 - bucket[0]) / self.rate
+
+        headers = {
+            "X-RateLimit-Type": "IP_LIMIT",
+            "X-RateLimit-Limit-Sustained": str(self.rate),
+            "X-RateLimit-Limit-Burst": str(self.burst),
+            "X-RateLimit-Burst-Time": str(self.burst_time),
+            "X-RateLimit-Remaining": str(math.floor(bucket[1])),
+            "X-RateLimit-Reset": timestamp(reset)
+        }
+
+        if not allowed:
+            headers["Retry-After"] = f"{reset - now:.3f}"
+
+        return allowed, headers
+
+
+class MockServer:
+    """ Local stand-in of SpaceTraders, built from the OpenAPI spec.
+
+    Args:
+        spec (dict): The OpenAPI spec
+        rate (float): Sustained requests per second, 0 disables the rate limit. Default: 2
+        burst (int): Requests that can be made on top of the sustained rate. Default: 30
+        burst_time (float): Seconds needed to refill the burst bucket. Default: 60
+        latency (float): Seconds each response is delayed by, on average. Default: 0
+        cooldown (float): Seconds a ship cools down after an action with a cooldown. Default: 10
+        transit (float): Seconds a ship spends navigating. Default: 10
+        total (int): How many entries the paginated endpoints have. Default: 100
+    """
+
+    def __init__(self, spec: dict, rate: float = 2, burst: int = 30, burst_time: float = 60, latency: float = 0,
+                 cooldown: float = 10, transit: float = 10, total: int = 100) -> None:
+        self.spec = spec
+        self.rate_limit = RateLimit(rate, burst, burst_time)
+        self.latency = latency
+        self.cooldown = cooldown
+        self.transit = transit
+        self.total = total
+
+        self.cooldowns = dict()  # Ship symbol: when its cooldown expires
+        self.arrivals = dict()   # Ship symbol: when it arrives
+        self.lock = threading.Lock()
+
+        self.app = Flask(__name__)
+        self.add_routes()
+
+    def add_routes(self) -> None:
+        """Adds a route for every action of every path of the spec."""
+
+        prefix = re.sub(r"^[a-z]+://[^/]+", "", self.spec["servers"][0]["url"]).rstrip("/")
+
+        for endpoint, endpoint_data in self.spec["paths"].items():
+            # /systems/{systemSymbol} becomes /systems/<systemSymbol>
+            rule = prefix + re.sub(r"{(\w+)}", r"<\1>", endpoint)
+
+            for action, action_data in endpoint_data.items():
+                if action == "parameters":
+                    continue
+
+                self.app.add_url_rule(
+                    rule,
+                    endpoint=action_data["operationId"],
+                    view_func=self.view(action, action_data),
+                    methods=[action.upper()],
+                    strict_slashes=False
+                )
+
+    def view(self, action: str, action_data: dict):
+        """ Returns the function answering an action
+
+        Args:
+            action (str): The http method of the action
+            action_data (dict): The action from the spec
+
+        Returns:
+            callable: The view function
+        """
+
+        # The first successful response of the spec
+        status, schema = 200, None
+        for code, response in sorted(action_data.get("responses", dict()).items()):
+            if code.startswith("2"):
+                status = int(code)
+                schema = response.get("content", dict()).get("application/json", dict()).get("schema")
+                break
+
+        if schema is not None:
+            schema = resolve(self.spec, schema)
+
+        def answer(**path):
+            return self.answer(action, action_data["operationId"], status, schema, path)
+
+        return answer
+
+    def answer(self, action: str, operation: str, status: int, schema: dict, path: dict) -> tuple:
+        """ Answers a request
+
+        Args:
+            action (str): The http method of the action
+            operation (str): The operationId of the action
+            status (int): The status code of a successful response
+            schema (dict): The schema of a successful response, None if it has no body
+            path (dict): The parameters in the path
+
+        Returns:
+            tuple: The body, the status code and the headers
+        """
+
+        allowed, headers = self.rate_limit.take(request.headers.get("Authorization", ""))
+
+        if self.latency > 0:
+            time.sleep(random.uniform(0.5, 1.5) * self.latency)
+
+        if not allowed:
+            body = {"error": {"message": "You have reached your rate limit.", "code": 429, "data": {
+                "type": "IP_LIMIT",
+                "retryAfter": float(headers["Retry-After"]),
+                "limitBurst": self.rate_limit.burst,
+                "limitPerSecond": self.rate_limit.rate,
+                "remaining": 0,
+                "reset": headers["X-RateLimit-Reset"]
+            }}}
+            return body, 429, headers
+
+        if schema is None:
+            return "", status, headers
+
+        body = self.body(schema)
+        data = body.get("data")
+
+        # Echo the symbols in the path, e.g. the ship asked for
+        if isinstance(data, dict):
+            for key, value in path.items():
+                if key in data:
+                    data[key] = value
+            if len(path) > 0 and "symbol" in data:
+                data["symbol"] = list(path.values())[-1]
+
+        ship = path.get("shipSymbol")
+        if ship is not None and isinstance(data, dict):
+            conflict = self.update_ship(action, operation, ship, data)
+            if conflict is not None:
+                return conflict, 409, headers
+
+            if operation == "get-ship-cooldown" and ship not in self.cooldowns:
+                return "", 204, headers
+
+        return body, status, headers
+
+    def body(self, schema: dict) -> dict:
+        """ Generates the body of a response, the pages of the paginated endpoints follow the page and limit arguments
+
+        Args:
+            schema (dict): The schema of the response
+
+        Returns:
+            dict: The body
+        """
+
+        properties = schema.get("properties", dict())
+        if "meta" not in properties or "data" not in properties:
+            return fixture(self.spec, schema)
+
+        page = max(1, request.args.get("page", 1, type=int))
+        limit = max(1, request.args.get("limit", 10, type=int))
+        first = (page - 1) * limit
+
+        items = resolve(self.spec, properties["data"]).get("items", dict())
+        return {
+            "data": [fixture(self.spec, items, index=i) for i in range(first, min(first + limit, self.total))],
+            "meta": {"total": self.total, "page": page, "limit": limit}
+        }
+
+    def update_ship(self, action: str, operation: str, ship: str, data: dict) -> dict:
+        """ Applies the cooldown and the travel time of a ship to a response about it
+
+        Args:
+            action (str): The http method of the action
+            operation (str): The operationId of the action
+            ship (str): The symbol of the ship
+            data (dict): The data of the response, changed in place
+
+        Returns:
+            dict: The body of the error if the ship is still cooling down, None otherwise
+        """
+
+        now = time.time()
+
+        with self.lock:
+            # Actions reporting a cooldown start one, and can not be made while cooling down
+            if action == "post" and "cooldown" in data:
+                if self.cooldowns.get(ship, 0) > now:
+                    return {"error": {"message": f"Ship action is still on cooldown for {self.cooldowns[ship] - now:.0f} second(s).", "code": 4000, "data": {
+                        "cooldown": self.cooldown_data(ship, now)
+                    }}}
+                self.cooldowns[ship] = now + self.cooldown
+
+            if operation in ("navigate-ship", "warp-ship"):
+                self.arrivals[ship] = now + self.transit
+
+            # Drop what expired
+            if self.cooldowns.get(ship, now) <= now:
+                self.cooldowns.pop(ship, None)
+            if self.arrivals.get(ship, now) <= now:
+                self.arrivals.pop(ship, None)
+
+            cooldown = data.get("cooldown", data if operation == "get-ship-cooldown" else None)
+            if isinstance(cooldown, dict):
+                cooldown.update(self.cooldown_data(ship, now))
+
+            nav = data.get("nav", data if operation in ("get-ship-nav", "patch-ship-nav") else None)
+            if isinstance(nav, dict) and "status" in nav:
+                if ship in self.arrivals:
+                    nav["status"] = "IN_TRANSIT"
+                    if isinstance(nav.get("route"), dict):
+                        nav["route"]["departureTime"] = timestamp(self.arrivals[ship] - self.transit)
+                        nav["route"]["arrival"] = timestamp(self.arrivals[ship])
+                elif nav["status"] == "IN_TRANSIT":
+                    nav["status"] = "IN_ORBIT"
+
+        return None
+
+    def cooldown_data(self, ship: str, now: float) -> dict:
+        """ Returns the cooldown of a ship, as SpaceTraders reports it
+
+        Args:
+            ship (str): The symbol of the ship
+            now (float): The current time
+
+        Returns:
+            dict: The cooldown
+        """
+
+        expiration = self.cooldowns.get(ship)
+        if expiration is None:
+            return {"shipSymbol": ship, "totalSeconds": 0, "remainingSeconds": 0}
+
+        return {
+            "shipSymbol": ship,
+            "totalSeconds": round(self.cooldown),
+            "remainingSeconds": max(0, math.ceil(expiration - now)),
+            "expiration": timestamp(expiration)
+        }
+
+
+if __name__ == "__main__":
+    server = MockServer(read_json("tools/source.json"))
+    server.app.run(host=HOST, port=PORT, threaded=True)
@@ -1,5 +1,11 @@
+import os
+import sys
+sys.path.insert(1, os.getcwd())
+
+import app.GalaxyDB as GalaxyDB
+from app.GalaxyColumns import GalaxyColumns
 import matplotlib.pyplot as plt
-import json
+import numpy as np
 import time
 from PIL import Image
 import PIL.ImageOps    
@@ -17,26 +23,24 @@ TYPES = {
     "BLACK_HOLE": "#ffffff"
 }
 
-# Load the galaxy systems from the file
-with open("data/galaxy.json", "r") as f:
-    GALAXY = json.loads(f.read())
+# Open the galaxy database, importing the galaxy file if it was downloaded before the database existed
+connection = GalaxyDB.connect()
+if GalaxyDB.count_systems(connection) == 0:
+    GalaxyDB.import_json(connection, "data/galaxy.json")
 
-# Extract x and y coordinates from each system
-x_coords = []
-y_coords = []
-system_color = []
+# Load the coordinates and the types of the systems as columns, the waypoints are not needed
+GALAXY = GalaxyColumns(GalaxyDB.get_system_rows(connection), [])
+connection.close()
 
-for system in GALAXY:
-    # Set the color of the system based on its type
-    system_color.append(TYPES[system["type"]])
-    x_coords.append(system["x"])
-    y_coords.append(system["y"])
+# Set the color of each system based on its type, looked up once per type and picked by the type codes
+palette = np.array([TYPES.get(name, "#808080") for name in GALAXY.type_names.tolist()] or ["#808080"])
+system_color = palette[GALAXY.types]
 
 # Set the size of the plot
 plt.figure(figsize=(10, 10))
 
 # Plot the systems
-plt.scatter(x_coords, y_coords, s=1, c=system_color)
+plt.scatter(GALAXY.x, GALAXY.y, s=1, c=system_color)
 
 # Add labels to the plot
 plt.title("Galaxy Systems")